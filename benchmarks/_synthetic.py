@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import struct
+import zlib
+from typing import Any, Dict, Tuple
+
+
+def make_png(width: int, height: int, seed: int, noisy: bool = False) -> bytes:
+    rnd = random.Random(seed)
+    rows = []
+    base = rnd.randbytes(width * 3)
+    for y in range(height):
+        if y % 16 == 0:
+            if noisy:
+                base = rnd.randbytes(width * 3)
+            else:
+                base = rnd.randbytes(64) * (width * 3 // 64) + base[: (width * 3) % 64]
+        rows.append(b"\x00" + base)
+    raw = b"".join(rows)
+
+    def chunk(tag: bytes, payload: bytes) -> bytes:
+        return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", zlib.crc32(tag + payload) & 0xFFFFFFFF)
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw, 6)) + chunk(b"IEND", b"")
+
+
+def make_synthetic_recording(
+    out_dir: str,
+    steps: int = 500,
+    image_size: Tuple[int, int] = (1280, 720),
+    distinct_images: int = 50,
+    noisy: bool = False,
+) -> Dict[str, Any]:
+    img_dir = os.path.join(out_dir, "images")
+    os.makedirs(img_dir, exist_ok=True)
+
+    w, h = image_size
+    pngs = [make_png(w, h, seed, noisy=noisy) for seed in range(max(1, distinct_images))]
+
+    events = [{"t": 0.0, "kind": "start", "detail": "Recording started"}]
+    for i in range(steps):
+        rel = os.path.join("images", f"m1_{i:06d}.png")
+        with open(os.path.join(out_dir, rel), "wb") as f:
+            f.write(pngs[i % len(pngs)])
+        kind = ("mouse_click", "text_input", "key_press")[i % 3]
+        e: Dict[str, Any] = {
+            "t": float(i),
+            "kind": kind,
+            "detail": f"Click Button.left at ({i % w},{i % h})" if kind == "mouse_click" else ("Text entered (tab)" if kind == "text_input" else "Key: tab"),
+            "monitor_index": 1,
+            "screenshot": rel,
+            "window_title": f"Fenster {i % 7}",
+            "app_name": "app.exe",
+            "app_path": "C:\\\\app.exe",
+        }
+        if kind == "text_input":
+            e["input_text"] = f"eingabe {i}"
+        if kind == "mouse_click":
+            e.update({"x": i % w, "y": i % h, "rel_x": i % w, "rel_y": i % h})
+        events.append(e)
+    events.append({"t": float(steps), "kind": "stop", "detail": "Recording stopped"})
+
+    return {
+        "created_at": "2026-01-01T00:00:00",
+        "monitors": [{"index": 1, "left": 0, "top": 0, "width": w, "height": h}],
+        "events": events,
+        "video_enabled": False,
+        "video_dir": None,
+        "screenshot_delay_ms": 0,
+        "record_text_input": True,
+    }
+
+
+def write_steps(out_dir: str, data: Dict[str, Any]) -> None:
+    with open(os.path.join(out_dir, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
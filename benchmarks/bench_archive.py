@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from psr.archive import RecordingArchive, member_name, pack_recording, unpack_archive
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def file_count(path: str) -> int:
+    return sum(len(files) for _, _, files in os.walk(path))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Copying a recording: folder of files vs. one .psra archive")
+    ap.add_argument("--steps", type=int, nargs="+", default=[500, 2000, 5000])
+    ap.add_argument("--image-size", type=int, nargs=2, default=(320, 200), metavar=("W", "H"))
+    ap.add_argument("--dest", default=None, help="copy target, e.g. a network share (default: a temp folder)")
+    ap.add_argument("--reads", type=int, default=200, help="random screenshot reads")
+    args = ap.parse_args()
+
+    print(
+        f"{'files':>6} {'MB':>7} {'pack ms':>8} {'copy dir ms':>12} {'copy psra ms':>13} "
+        f"{'unpack ms':>10} {'read files ms':>14} {'open psra ms':>13} {'read psra ms':>13}"
+    )
+    for steps in args.steps:
+        tmp = tempfile.mkdtemp(prefix="psr_bench_")
+        dest_root = tempfile.mkdtemp(prefix="psr_bench_dest_", dir=args.dest)
+        try:
+            rec = os.path.join(tmp, "Recording")
+            data = make_synthetic_recording(rec, steps=steps, image_size=tuple(args.image_size), distinct_images=steps)
+            write_steps(rec, data)
+            files = file_count(rec)
+            mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(rec) for f in fs) / (1024 * 1024)
+
+            pack, archive = timed(lambda: pack_recording(rec))
+            copy_dir, _ = timed(lambda: shutil.copytree(rec, os.path.join(dest_root, "Recording")))
+            copy_archive, _ = timed(lambda: shutil.copyfile(archive, os.path.join(dest_root, "Recording.psra")))
+            unpack, _ = timed(lambda: unpack_archive(archive, os.path.join(tmp, "Unpacked")))
+
+            shots = [e["screenshot"] for e in data["events"] if e.get("screenshot")]
+            picks = random.Random(1).choices(shots, k=args.reads)
+
+            def read_files() -> int:
+                n = 0
+                for rel in picks:
+                    with open(os.path.join(rec, rel), "rb") as f:
+                        n += len(f.read())
+                return n
+
+            read_dir, a = timed(read_files)
+            # Opening parses the zip index once; reads are then slices of the mmap.
+            open_psra, ar = timed(lambda: RecordingArchive(archive))
+            with ar:
+                read_psra, b = timed(lambda: sum(len(ar.read(member_name(rel))) for rel in picks))
+            assert a == b
+            print(
+                f"{files:>6} {mb:>7.1f} {pack:>8.0f} {copy_dir:>12.0f} {copy_archive:>13.0f} "
+                f"{unpack:>10.0f} {read_dir:>14.1f} {open_psra:>13.1f} {read_psra:>13.1f}",
+                flush=True,
+            )
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+            shutil.rmtree(dest_root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from psr.catalog import RecordingCatalog
+from psr.recordings_store import _scan_recordings
+
+
+def make_library(root: str, count: int, start: int = 0) -> None:
+    for i in range(start, start + count):
+        p = os.path.join(root, f"Recording {i:06d}")
+        os.makedirs(p)
+        with open(os.path.join(p, "recording.meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": f"Recording {i:06d}", "created": "2024-01-01T00:00:00"}, f)
+        with open(os.path.join(p, "steps.json"), "w", encoding="utf-8") as f:
+            f.write("{}")
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return (time.perf_counter() - t0) * 1000.0, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recordings list: folder scan vs. SQLite catalog")
+    ap.add_argument("--recordings", type=int, nargs="+", default=[1000, 5000])
+    ap.add_argument("--page", type=int, default=100)
+    ap.add_argument("--changed", type=int, default=10)
+    args = ap.parse_args()
+
+    print(f"{'recordings':>10} {'scan ms':>8} {'build ms':>9} {'refresh ms':>11} {'page ms':>8} {f'+{args.changed} ms':>9} {'deep ms':>8}")
+    for n in args.recordings:
+        tmp = tempfile.mkdtemp(prefix="psr_bench_")
+        root = os.path.join(tmp, "recordings")
+        cwd = os.getcwd()
+        try:
+            make_library(root, n)
+            # _scan_recordings reads the recordings folder below the working directory.
+            os.chdir(tmp)
+            try:
+                scan, _ = timed(_scan_recordings)
+            finally:
+                os.chdir(cwd)
+
+            cat = RecordingCatalog(root)
+            build, _ = timed(cat.refresh)
+            refresh, _ = timed(cat.refresh)
+            page, _ = timed(lambda: cat.query(offset=n // 2, limit=args.page))
+            make_library(root, args.changed, start=n)
+            changed, count = timed(cat.refresh)
+            deep, _ = timed(lambda: cat.refresh(deep=True))
+            assert count == args.changed and cat.count() == n + args.changed
+            cat.close()
+            print(f"{n:>10} {scan:>8.1f} {build:>9.1f} {refresh:>11.2f} {page:>8.2f} {changed:>9.1f} {deep:>8.1f}", flush=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.docx_exporter import export_docx
+from exporters.guide import print_cache_dir
+from exporters.html_exporter import export_html
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def browser_docx_ms(html_path: str) -> float:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch()
+        page = browser.new_page(accept_downloads=True)
+        page.goto("file://" + os.path.abspath(html_path), wait_until="load")
+        page.wait_for_function("() => window.docx && window.saveAs")
+        t0 = time.perf_counter()
+        with page.expect_download(timeout=600_000):
+            page.evaluate("() => exportDocx()")
+        ms = (time.perf_counter() - t0) * 1000.0
+        browser.close()
+    return ms
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Native DOCX export versus the in-browser docx.js download")
+    ap.add_argument("--steps", type=int, default=300)
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--distinct", type=int, default=60)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps, image_size=(args.width, args.height), distinct_images=args.distinct, noisy=True)
+        write_steps(tmp, data)
+
+        serial = timed(lambda: export_docx(tmp, data=data, image_workers=1))
+        shutil.rmtree(print_cache_dir(tmp))
+        parallel = timed(lambda: export_docx(tmp, data=data))
+        warm = timed(lambda: export_docx(tmp, data=data))
+        size = os.path.getsize(os.path.join(tmp, "anleitung.docx"))
+
+        print(f"steps: {args.steps}, {args.distinct} distinct {args.width}x{args.height} screenshots")
+        print(f"python-docx, serial downscaling    {serial:9.1f} ms")
+        print(f"python-docx, parallel downscaling  {parallel:9.1f} ms  ({os.cpu_count()} CPUs)")
+        print(f"python-docx, cached images         {warm:9.1f} ms  ({size / 1e6:.1f} MB)")
+
+        try:
+            browser = browser_docx_ms(export_html(tmp, data=data))
+        except ImportError:
+            print("browser (docx.js)                  skipped: playwright is not installed")
+        except Exception as e:
+            print(f"browser (docx.js)                  failed: {e}")
+        else:
+            print(f"browser (docx.js)                  {browser:9.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
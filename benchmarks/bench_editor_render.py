@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.html_exporter import export_html
+
+_MEASURE_JS = """() => {
+  const t = () => performance.now();
+  const root = document.getElementById("steps");
+  const built = () => SLOTS.filter(s => s._built).length;
+  const out = { steps: SLOTS.length, built_on_load: built(), nodes_on_load: root.getElementsByTagName("*").length };
+
+  let t0 = t(); render(); out.render_ms = t() - t0;
+
+  const mid = Math.floor(SLOTS.length / 2);
+  t0 = t(); insertStepAt(mid); out.insert_ms = t() - t0;
+  t0 = t(); moveStep(SLOTS[mid], 1); out.move_ms = t() - t0;
+  t0 = t(); removeStep(SLOTS[mid + 1]); out.delete_ms = t() - t0;
+
+  t0 = t(); SLOTS.forEach(materialize); out.eager_ms = t() - t0;
+  out.nodes_eager = root.getElementsByTagName("*").length;
+  return out;
+}"""
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Headless load and edit timings of the HTML editor on a large guide")
+    ap.add_argument("--steps", type=int, default=1000)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--mode", choices=("single", "external"), default="external")
+    args = ap.parse_args()
+
+    try:
+        from playwright.sync_api import sync_playwright
+    except ImportError:
+        raise SystemExit("playwright is required: pip install playwright && playwright install chromium")
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps, image_size=(args.width, args.height), distinct_images=20)
+        write_steps(tmp, data)
+        out = export_html(tmp, data=data, mode=args.mode)
+        url = "file://" + os.path.abspath(out)
+
+        with sync_playwright() as pw:
+            browser = pw.chromium.launch()
+            page = browser.new_page(viewport={"width": 1366, "height": 900})
+            t0 = time.perf_counter()
+            page.goto(url, wait_until="load")
+            page.wait_for_function("() => typeof SLOTS !== 'undefined' && SLOTS.some(s => s._built)")
+            load_ms = (time.perf_counter() - t0) * 1000.0
+            r = page.evaluate(_MEASURE_JS)
+            browser.close()
+
+        print(f"steps: {r['steps']} ({args.mode} export, {os.path.getsize(out) / 1e6:.1f} MB)")
+        print(f"page load to first card      {load_ms:9.1f} ms")
+        print(f"cards built after load       {r['built_on_load']:9d}   ({r['nodes_on_load']} DOM elements in #steps)")
+        print(f"windowed render()            {r['render_ms']:9.1f} ms")
+        print(f"insert / move / delete       {r['insert_ms']:6.1f} / {r['move_ms']:.1f} / {r['delete_ms']:.1f} ms")
+        print(f"building every card eagerly  {r['eager_ms']:9.1f} ms   ({r['nodes_eager']} DOM elements)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+
+_MEASURE = r"""
+import base64, json, os, resource, sys
+out_dir, legacy = sys.argv[1], sys.argv[2] == "1"
+if legacy:
+    # Previous approach: every image base64-encoded into one in-memory document.
+    with open(os.path.join(out_dir, "steps.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    for e in data["events"]:
+        if e.get("screenshot"):
+            with open(os.path.join(out_dir, e["screenshot"]), "rb") as f:
+                e["screenshot"] = "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+    html = "<html>" + json.dumps(data, ensure_ascii=False) + "</html>"
+    with open(os.path.join(out_dir, "legacy.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+else:
+    from exporters.html_exporter import export_html
+    export_html(out_dir)
+# ru_maxrss can carry over the parent's peak across fork/exec; VmHWM belongs to this image only.
+try:
+    with open("/proc/self/status") as f:
+        hwm = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hwm = rss if sys.platform == "darwin" else rss * 1024
+print(hwm)
+"""
+
+
+def peak_rss_mb(out_dir: str, legacy: bool) -> float:
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run(
+        [sys.executable, "-c", _MEASURE, out_dir, "1" if legacy else "0"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return int(out.stdout.strip().splitlines()[-1]) / (1024 * 1024)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Peak RSS of export_html for growing step counts")
+    ap.add_argument("--steps", type=int, nargs="+", default=[50, 200, 800])
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--legacy", action="store_true", help="also measure the in-memory approach")
+    args = ap.parse_args()
+
+    if sys.platform == "win32":
+        raise SystemExit("uses resource.getrusage, not available on Windows")
+
+    print(f"{'steps':>6} {'images MB':>10} {'streaming MB':>13}" + (f" {'in-memory MB':>13}" if args.legacy else ""))
+    for n in args.steps:
+        tmp = tempfile.mkdtemp(prefix="psr_bench_")
+        try:
+            data = make_synthetic_recording(tmp, steps=n, image_size=(args.width, args.height), distinct_images=n, noisy=True)
+            write_steps(tmp, data)
+            img_dir = os.path.join(tmp, "images")
+            img_mb = sum(os.path.getsize(os.path.join(img_dir, x)) for x in os.listdir(img_dir)) / (1024 * 1024)
+
+            line = f"{n:>6} {img_mb:>10.1f} {peak_rss_mb(tmp, False):>13.1f}"
+            if args.legacy:
+                line += f" {peak_rss_mb(tmp, True):>13.1f}"
+            print(line, flush=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
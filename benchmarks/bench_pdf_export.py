@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.pdf_exporter import export_pdf
+
+_MEASURE = r"""
+import sys
+from exporters.pdf_exporter import export_pdf
+export_pdf(sys.argv[1])
+with open("/proc/self/status") as f:
+    print(next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmHWM:")))
+"""
+
+
+def run(out_dir: str, data: Dict[str, Any], workers: Optional[int]) -> Tuple[float, int, int]:
+    pages = [0]
+    t0 = time.perf_counter()
+    path = export_pdf(out_dir, data=data, image_workers=workers, on_page=lambda n: pages.__setitem__(0, n))
+    return time.perf_counter() - t0, pages[0], os.path.getsize(path)
+
+
+def peak_rss_mb(out_dir: str) -> float:
+    # A fresh process, so the peak belongs to this export alone.
+    env = dict(os.environ, PYTHONPATH=os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", _MEASURE, out_dir], check=True, capture_output=True, text=True, env=env)
+    return int(out.stdout.strip().splitlines()[-1]) / (1024 * 1024)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PDF export throughput (pages/s) on large recordings")
+    ap.add_argument("--steps", type=int, nargs="+", default=[300, 1500])
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--distinct", type=int, default=60, help="distinct screenshots; the rest repeat and share one XObject")
+    ap.add_argument("-j", "--workers", type=int, default=None, help="image downsampling processes (default: CPU count)")
+    ap.add_argument("--memory", action="store_true", help="also report peak RSS of a cached export (Linux)")
+    args = ap.parse_args()
+
+    print(f"{'steps':>6} {'pages':>6} {'cold s':>7} {'pages/s':>8} {'cached s':>9} {'pages/s':>8} {'PDF MB':>7}" + (f" {'peak MB':>8}" if args.memory else ""))
+    for n in args.steps:
+        tmp = tempfile.mkdtemp(prefix="psr_bench_")
+        try:
+            data = make_synthetic_recording(tmp, steps=n, image_size=(args.width, args.height), distinct_images=args.distinct, noisy=True)
+            write_steps(tmp, data)
+
+            cold, pages, _ = run(tmp, data, args.workers)
+            warm, _, size = run(tmp, data, args.workers)
+            line = f"{n:>6} {pages:>6} {cold:>7.2f} {pages / cold:>8.0f} {warm:>9.2f} {pages / warm:>8.0f} {size / 1e6:>7.1f}"
+            if args.memory:
+                line += f" {peak_rss_mb(tmp):>8.1f}"
+            print(line, flush=True)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
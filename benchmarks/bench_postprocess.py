@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording
+from exporters.html_exporter import export_html
+from psr.postprocess import build_postprocess_pipeline, narrate_steps, write_steps_json
+
+
+def legacy_three_pass(out_dir: str, data) -> None:
+    write_steps_json(out_dir, data)
+
+    p = os.path.join(out_dir, "steps.json")
+    with open(p, "r", encoding="utf-8") as f:
+        loaded = json.load(f)
+    loaded = narrate_steps(loaded)
+    with open(p, "w", encoding="utf-8") as f:
+        json.dump(loaded, f, ensure_ascii=False, indent=2)
+
+    export_html(out_dir)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stop-to-guide latency on a synthetic recording")
+    ap.add_argument("--steps", type=int, default=500)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps)
+
+        legacy = []
+        for _ in range(args.repeat):
+            d = copy.deepcopy(data)
+            t0 = time.perf_counter()
+            legacy_three_pass(tmp, d)
+            legacy.append((time.perf_counter() - t0) * 1000.0)
+
+        single = []
+        stages = {}
+        for _ in range(args.repeat):
+            d = copy.deepcopy(data)
+            t0 = time.perf_counter()
+            result = build_postprocess_pipeline(tmp, export_html=export_html).run(d)
+            single.append((time.perf_counter() - t0) * 1000.0)
+            stages = result.timings_ms
+            if result.errors:
+                raise SystemExit(f"pipeline failed: {result.errors}")
+
+        print(f"steps: {args.steps}")
+        print(f"three-pass   best {min(legacy):8.1f} ms")
+        print(f"single-pass  best {min(single):8.1f} ms")
+        for name, ms in stages.items():
+            print(f"  {name:<16} {ms:8.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.html_exporter import export_html
+from psr.layout import EXPORT_CACHE_DIR_NAME
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-export after a single edit in single-file and external mode")
+    ap.add_argument("--steps", type=int, default=500)
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps, image_size=(args.width, args.height), distinct_images=25, noisy=True)
+        write_steps(tmp, data)
+
+        export_html(tmp, data=data)
+        data["events"][len(data["events"]) // 2]["instruction"] = "Geänderter Schritt"
+        single = timed(lambda: export_html(tmp, data=data))
+        # Same edit without the fragment index: every screenshot is read and encoded again.
+        shutil.rmtree(os.path.join(tmp, EXPORT_CACHE_DIR_NAME), ignore_errors=True)
+        uncached = timed(lambda: export_html(tmp, data=data))
+
+        export_html(tmp, data=data, mode="external")
+
+        data["events"][1]["instruction"] = "Noch ein geänderter Schritt"
+        external = timed(lambda: export_html(tmp, data=data, mode="external"))
+
+        print(f"steps: {args.steps}")
+        print(f"single file, full export        {uncached:9.1f} ms")
+        print(f"single file, after one edit     {single:9.1f} ms")
+        print(f"external assets, after one edit {external:9.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import List, Tuple
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.html_exporter import export_html
+from exporters.image_variants import build_variants
+from psr.layout import VARIANTS_DIR_NAME
+
+# (label, CSS viewport width, device pixel ratio)
+VIEWPORTS = [("phone", 390, 3.0), ("laptop", 1366, 1.0), ("desktop", 1920, 1.0), ("hidpi", 1440, 2.0)]
+
+
+def slot_width(viewport: int) -> float:
+    return viewport - 58 if viewport <= 1120 else 1062
+
+
+def pick(candidates: List[Tuple[int, str]], needed: float) -> Tuple[int, str]:
+    # Browsers take the smallest candidate that covers the slot at the device pixel ratio.
+    for w, p in sorted(candidates):
+        if w >= needed:
+            return w, p
+    return max(candidates)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bytes transferred with and without srcset variants on a large guide")
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    ap.add_argument("--distinct", type=int, default=40)
+    ap.add_argument("--mbit", type=float, default=50.0, help="link speed used for the transfer-time estimate")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps, image_size=(args.width, args.height), distinct_images=args.distinct, noisy=True)
+        write_steps(tmp, data)
+        sources = [os.path.join(tmp, e["screenshot"]) for e in data["events"] if e.get("screenshot")]
+
+        t0 = time.perf_counter()
+        variants = build_variants(sources, os.path.join(tmp, VARIANTS_DIR_NAME))
+        cold = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        export_html(tmp, mode="external")
+        warm = time.perf_counter() - t0
+        print(f"variants: {len(sources)} screenshots, generated in {cold:.2f} s, cached re-export {warm:.2f} s")
+
+        full = sum(os.path.getsize(p) for p in sources)
+        print(f"{'viewport':<10} {'full MB':>9} {'srcset MB':>10} {'saved':>7} {'full s':>7} {'srcset s':>9}")
+        for label, vw, dpr in VIEWPORTS:
+            needed = slot_width(vw) * dpr
+            sized = sum(os.path.getsize(pick(variants.get(p, [(args.width, p)]), needed)[1]) for p in sources)
+            to_s = lambda b: b * 8 / (args.mbit * 1_000_000)  # noqa: E731
+            print(
+                f"{label:<10} {full / 1e6:>9.1f} {sized / 1e6:>10.1f} {1 - sized / full:>6.0%} "
+                f"{to_s(full):>7.1f} {to_s(sized):>9.1f}"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from psr.catalog import RecordingCatalog
+
+_APPS = [("saplogon.exe", "SAP Easy Access"), ("EXCEL.EXE", "Mappe1 - Excel"), ("OUTLOOK.EXE", "Posteingang - Outlook")]
+_WORDS = "Auftrag Kunde Material Lieferung Rechnung Buchung Beleg Konto Datei Speichern Öffnen Drucken".split()
+
+
+def make_library(root: str, count: int, steps: int, seed: int = 1) -> None:
+    rnd = random.Random(seed)
+    for i in range(count):
+        p = os.path.join(root, f"Recording {i:06d}")
+        os.makedirs(p)
+        events = []
+        for _ in range(steps):
+            app, title = rnd.choice(_APPS)
+            typed = f"VA{rnd.randrange(100):02d}" if rnd.random() < 0.2 else None
+            events.append(
+                {
+                    "kind": "text_input" if typed else "click",
+                    "instruction": f"Klicke auf '{rnd.choice(_WORDS)} {rnd.choice(_WORDS)}'",
+                    "window_title": f"{title} – {rnd.choice(_WORDS)}",
+                    "app_name": app,
+                    "input_text": typed,
+                }
+            )
+        with open(os.path.join(p, "steps.json"), "w", encoding="utf-8") as f:
+            json.dump({"events": events}, f)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Full-text search over recordings: index build and query latency")
+    ap.add_argument("--recordings", type=int, default=10000)
+    ap.add_argument("--steps", type=int, default=20)
+    ap.add_argument("--queries", nargs="+", default=["va01", "sap auftrag", "excel speichern", "outlook beleg", "kunde"])
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        make_library(tmp, args.recordings, args.steps)
+        cat = RecordingCatalog(tmp)
+        t0 = time.perf_counter()
+        cat.refresh()
+        build = time.perf_counter() - t0
+        print(f"{args.recordings} recordings, {args.recordings * args.steps} steps indexed in {build:.1f} s")
+
+        print(f"{'query':<18} {'hits':>5} {'median ms':>10} {'max ms':>8}")
+        for q in args.queries:
+            times = []
+            for _ in range(20):
+                t0 = time.perf_counter()
+                hits = cat.search(q, limit=50)
+                times.append((time.perf_counter() - t0) * 1000.0)
+            print(f"{q:<18} {len(hits):>5} {statistics.median(times):>10.2f} {max(times):>8.2f}", flush=True)
+        cat.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
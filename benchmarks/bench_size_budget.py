@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+
+from benchmarks._synthetic import make_synthetic_recording, write_steps
+from exporters.html_exporter import export_html
+
+
+def draw_ui_screens(out_dir: str, data, width: int, height: int, seed: int = 1) -> None:
+    # Flat panels and text compress like real screenshots; the noise PNGs of _synthetic do not.
+    from PIL import Image, ImageDraw
+
+    rnd = random.Random(seed)
+    for e in data["events"]:
+        if not e.get("screenshot"):
+            continue
+        img = Image.new("RGB", (width, height), (240, 240, 240))
+        d = ImageDraw.Draw(img)
+        for _ in range(40):
+            x, y = rnd.randrange(width - 100), rnd.randrange(height - 60)
+            color = tuple(rnd.randrange(256) for _ in range(3))
+            d.rectangle([x, y, x + rnd.randrange(40, 400), y + rnd.randrange(20, 200)], fill=color, outline=(0, 0, 0))
+        for _ in range(120):
+            d.text((rnd.randrange(width - 100), rnd.randrange(height - 20)), f"Eingabe {rnd.randrange(1000)}", fill=(0, 0, 0))
+        img.save(os.path.join(out_dir, e["screenshot"]))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Size-budgeted single-file export: chosen settings, prediction error and time")
+    ap.add_argument("--steps", type=int, default=200)
+    ap.add_argument("--width", type=int, default=1920)
+    ap.add_argument("--height", type=int, default=1080)
+    ap.add_argument("--budgets", type=float, nargs="+", default=[40, 15, 8, 4])
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    try:
+        data = make_synthetic_recording(tmp, steps=args.steps, image_size=(8, 8), distinct_images=1)
+        draw_ui_screens(tmp, data, args.width, args.height)
+        data["monitors"][0].update(width=args.width, height=args.height)
+        write_steps(tmp, data)
+
+        print(f"{'budget MB':>9} {'file MB':>8} {'scale':>6} {'quality':>8} {'predicted MB':>13} {'error':>6} {'time s':>7}")
+        for mb in args.budgets:
+            t0 = time.perf_counter()
+            path = export_html(tmp, max_size_mb=mb)
+            elapsed = time.perf_counter() - t0
+            with open(path, encoding="utf-8") as f:
+                m = re.search(r'"export_settings": (\{[^}]*\})', f.read())
+            s = json.loads(m.group(1)) if m else {}
+            pred, actual = s.get("predicted_bytes") or 0, s.get("image_bytes") or 1
+            print(
+                f"{mb:>9.1f} {os.path.getsize(path) / 2**20:>8.2f} {s.get('image_scale', '-'):>6} {str(s.get('image_quality')):>8} "
+                f"{pred / 2**20:>13.2f} {pred / actual - 1:>+6.1%} {elapsed:>7.1f}",
+                flush=True,
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
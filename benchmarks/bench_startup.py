@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_worker_startup import _shutdown, _spawn, _wait_for
+
+
+def gui_import_ms() -> float:
+    # main.py only imports gui.app before creating the window.
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import gui.app"], check=True)
+    return (time.perf_counter() - t0) * 1000.0
+
+
+def worker_ready_ms() -> float:
+    ctx = mp.get_context("spawn")
+    t0 = time.perf_counter()
+    proc, conn = _spawn(ctx)
+    _wait_for(conn, "ready")
+    ms = (time.perf_counter() - t0) * 1000.0
+    _shutdown(proc, conn)
+    return ms
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Startup time of the GUI entry point and the recorder worker")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--max-gui-ms", type=float, default=None, help="fail if the GUI import is slower")
+    ap.add_argument("--max-worker-ms", type=float, default=None, help="fail if spawn-to-ready is slower")
+    ap.add_argument("--skip-worker", action="store_true")
+    args = ap.parse_args()
+
+    failed = False
+
+    gui = min(gui_import_ms() for _ in range(args.repeat))
+    print(f"main.py (import gui.app)   best {gui:8.1f} ms")
+    if args.max_gui_ms is not None and gui > args.max_gui_ms:
+        print(f"   regression: above {args.max_gui_ms:.0f} ms")
+        failed = True
+
+    if not args.skip_worker:
+        tmp = tempfile.mkdtemp(prefix="psr_bench_")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            worker = min(worker_ready_ms() for _ in range(args.repeat))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp, ignore_errors=True)
+        print(f"worker spawn to ready      best {worker:8.1f} ms")
+        if args.max_worker_ms is not None and worker > args.max_worker_ms:
+            print(f"   regression: above {args.max_worker_ms:.0f} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import statistics
+import time
+from typing import Any, Dict, List
+
+import tkinter as tk
+
+from gui.dispatch import TkDispatcher, read_connection
+
+
+def _sender(conn, idle_s: float, count: int, interval_s: float) -> None:
+    # Quiet first (an idle worker between recordings), then a stream of status messages.
+    time.sleep(idle_s)
+    for _ in range(count):
+        conn.send({"type": "ping", "sent": time.time()})
+        time.sleep(interval_s)
+    conn.send({"type": "done"})
+
+
+class _Stats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.idle_wakeups = 0
+        self.wakeups = 0
+        self.finished = False
+
+    def handle(self, root: tk.Tk, msg: Dict[str, Any]) -> None:
+        if msg["type"] == "ping":
+            if not self.latencies:
+                # Not counting the wake-up that delivers this first message.
+                self.idle_wakeups = self.wakeups - 1
+            self.latencies.append((time.time() - msg["sent"]) * 1000.0)
+        elif msg["type"] == "done":
+            self.finished = True
+            root.quit()
+
+
+def _run(mode: str, args: argparse.Namespace) -> _Stats:
+    ctx = mp.get_context("spawn")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_sender, args=(child, args.idle, args.messages, args.interval / 1000.0), daemon=True)
+    proc.start()
+    child.close()
+    root = tk.Tk()
+    root.withdraw()
+    stats = _Stats()
+    try:
+        if mode == "poll":
+            # Old behaviour: RecorderGUI._poll_worker rescheduled itself every 120 ms.
+            def poll():
+                stats.wakeups += 1
+                while not stats.finished and parent.poll():
+                    stats.handle(root, parent.recv())
+                root.after(args.poll_ms, poll)
+
+            root.after(args.poll_ms, poll)
+        else:
+            dispatcher = TkDispatcher(root)
+
+            def on_message(msg: Dict[str, Any]):
+                stats.wakeups = dispatcher.wakeups
+                stats.handle(root, msg)
+
+            read_connection(parent, dispatcher, on_message)
+
+        root.mainloop()
+    finally:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+        root.destroy()
+        parent.close()
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GUI wake-ups while the recorder worker is idle, and message latency: polling vs. a reader thread")
+    ap.add_argument("--idle", type=float, default=5.0, help="seconds without messages")
+    ap.add_argument("--messages", type=int, default=200)
+    ap.add_argument("--interval", type=float, default=7.0, help="ms between messages")
+    ap.add_argument("--poll-ms", type=int, default=120)
+    args = ap.parse_args()
+
+    print(f"{'mode':>14} {'idle wakeups/s':>15} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for mode, label in (("poll", f"poll {args.poll_ms} ms"), ("event", "reader thread")):
+        stats = _run(mode, args)
+        lat = sorted(stats.latencies)
+        p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+        print(
+            f"{label:>14} {stats.idle_wakeups / args.idle:>15.1f} {statistics.median(lat):>8.2f} {p95:>8.2f} {lat[-1]:>8.2f}",
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
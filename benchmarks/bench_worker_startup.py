@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+from gui.recorder_process import recorder_worker
+
+_CONFIG: Dict[str, Any] = {
+    "screenshot_on_keys": (),
+    "enable_video": False,
+    "video_fps": 8,
+    "screenshot_delay_ms": 0,
+    "record_text_input": True,
+}
+
+
+def _wait_for(conn, msg_type: str, timeout: float = 120.0) -> Dict[str, Any]:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if conn.poll(0.01):
+            msg = conn.recv()
+            if msg.get("type") == msg_type:
+                return msg
+            if msg.get("type") in ("error", "fatal"):
+                raise RuntimeError(str(msg))
+    raise TimeoutError(msg_type)
+
+
+def _spawn(ctx):
+    parent, child = ctx.Pipe()
+    cfg = dict(_CONFIG, spawned_at=time.time())
+    proc = ctx.Process(target=recorder_worker, args=(child, cfg), daemon=True)
+    proc.start()
+    return proc, parent
+
+
+def _shutdown(proc, conn):
+    try:
+        conn.send({"type": "quit"})
+        _wait_for(conn, "quit_ack", timeout=30)
+    except Exception:
+        pass
+    proc.join(timeout=5)
+    if proc.is_alive():
+        proc.terminate()
+
+
+def _start_stop(conn, out_dir: str) -> float:
+    t0 = time.perf_counter()
+    conn.send({"type": "start", "out_dir": out_dir})
+    _wait_for(conn, "started")
+    ms = (time.perf_counter() - t0) * 1000.0
+    conn.send({"type": "stop"})
+    _wait_for(conn, "exported")
+    return ms
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time-to-first-capture for a cold versus a pre-warmed recorder worker")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    ctx = mp.get_context("spawn")
+    tmp = tempfile.mkdtemp(prefix="psr_bench_")
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        cold, warm, respawn, reconfigure = [], [], [], []
+        for i in range(args.repeat):
+            # Old behaviour: the first Start click spawns the worker.
+            t0 = time.perf_counter()
+            proc, conn = _spawn(ctx)
+            conn.send({"type": "start", "out_dir": os.path.join(tmp, f"cold_{i}")})
+            _wait_for(conn, "started")
+            cold.append((time.perf_counter() - t0) * 1000.0)
+            conn.send({"type": "stop"})
+            _wait_for(conn, "exported")
+            _shutdown(proc, conn)
+
+            # Pre-warmed worker: spawned at GUI startup, Start only sends a command.
+            proc, conn = _spawn(ctx)
+            _wait_for(conn, "ready")
+            warm.append(_start_stop(conn, os.path.join(tmp, f"warm_{i}")))
+
+            t0 = time.perf_counter()
+            conn.send({"type": "reconfigure", "config": {"screenshot_delay_ms": 100}})
+            _wait_for(conn, "reconfigured")
+            reconfigure.append((time.perf_counter() - t0) * 1000.0)
+
+            t0 = time.perf_counter()
+            _shutdown(proc, conn)
+            proc, conn = _spawn(ctx)
+            _wait_for(conn, "ready")
+            respawn.append((time.perf_counter() - t0) * 1000.0)
+            _shutdown(proc, conn)
+
+        print(f"first capture, cold worker   best {min(cold):8.1f} ms")
+        print(f"first capture, warm worker   best {min(warm):8.1f} ms")
+        print(f"apply config, respawn        best {min(respawn):8.1f} ms")
+        print(f"apply config, reconfigure    best {min(reconfigure):8.1f} ms")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
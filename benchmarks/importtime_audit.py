@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Modules that must not be loaded just by importing the given entry point.
+FORBIDDEN: Dict[str, Tuple[str, ...]] = {
+    "gui.app": ("cv2", "numpy", "mss", "PIL", "pynput", "exporters.html_exporter", "psr.recorder", "psr.video"),
+    "gui.recorder_process": ("cv2", "numpy", "exporters.html_exporter", "psr.video"),
+    "psr.recorder": ("cv2", "numpy", "psr.video"),
+}
+
+
+def importtime(module: str) -> Tuple[List[Tuple[str, int, int]], str]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    rows: List[Tuple[str, int, int]] = []
+    other: List[str] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cum_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cum_us))
+    err = "\n".join(other).strip() if proc.returncode != 0 else ""
+    return rows, err
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-time audit based on python -X importtime")
+    ap.add_argument("modules", nargs="*", default=list(FORBIDDEN))
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    failed = False
+    for module in args.modules:
+        rows, err = importtime(module)
+        print(f"== {module}")
+        if err:
+            print("   import failed:")
+            print("   " + err.splitlines()[-1])
+            failed = True
+            continue
+
+        total = next((cum for name, _, cum in rows if name == module), 0)
+        print(f"   total {total / 1000.0:8.1f} ms, {len(rows)} modules")
+        for name, _, cum in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+            print(f"   {cum / 1000.0:8.1f} ms  {name}")
+
+        loaded = {name for name, _, _ in rows}
+        bad = [m for m in FORBIDDEN.get(module, ()) if m in loaded]
+        if bad:
+            failed = True
+            print("   eagerly imported: " + ", ".join(bad))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from docx import Document
+from docx.shared import Inches, Length, Pt
+from docx.text.run import Run
+
+from exporters.guide import MAX_IMAGE_INCHES, guide_steps, output_path, print_cache_dir, print_image_box
+from exporters.image_variants import fit_images
+from psr.archive import ArchiveMember
+from psr.layout import DOCX_NAME
+from psr.recording import ImageSource, Recording, open_image_source
+
+try:
+    from docx.oxml.shape import CT_Inline
+except ImportError:
+    # python-docx internals; without them pictures go through the public Run.add_picture().
+    CT_Inline = None
+
+_SCREEN_DPI = 96
+
+
+def export_docx(
+    out_dir: str,
+    title: str = "Anleitung",
+    data: Optional[Dict[str, Any]] = None,
+    dpi: int = 150,
+    image_workers: Optional[int] = None,
+    dest: Optional[str] = None,
+) -> str:
+    with Recording(out_dir) as rec:
+        steps = guide_steps(rec.data if data is None else data, rec)
+    max_w, max_h = MAX_IMAGE_INCHES
+    images = fit_images([s.image for s in steps if s.image], print_cache_dir(out_dir, dest), print_image_box(dpi), max_workers=image_workers)
+
+    doc = Document()
+    parts: Dict[Any, Tuple[str, Any]] = {}
+    doc.add_heading(title, level=0)
+    doc.add_paragraph(" ").paragraph_format.space_after = Pt(7)
+
+    for step in steps:
+        p = doc.add_paragraph()
+        p.add_run(f"{step.number}. {step.text}").bold = True
+        p.paragraph_format.space_after = Pt(6)
+
+        if step.context:
+            doc.add_paragraph(step.context).paragraph_format.space_after = Pt(6)
+
+        fitted = images.get(step.image) if step.image else None
+        if fitted:
+            path, w, h = fitted
+            # Never enlarge beyond the on-screen size.
+            width_in = min(max_w, max_h * w / h, w / _SCREEN_DPI)
+            p = doc.add_paragraph()
+            _add_picture(p.add_run(), path, Inches(width_in), Inches(width_in * h / w), parts)
+            p.paragraph_format.space_after = Pt(12)
+
+        doc.add_paragraph(" ").paragraph_format.space_after = Pt(4)
+
+    docx_path = output_path(out_dir, DOCX_NAME, dest)
+    tmp_path = f"{docx_path}.{os.getpid()}.tmp"
+    try:
+        doc.save(tmp_path)
+        os.replace(tmp_path, docx_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return docx_path
+
+
+def _add_picture(run: Run, path: ImageSource, width: Length, height: Length, parts: Dict[Any, Tuple[str, Any]]) -> None:
+    if CT_Inline is not None:
+        try:
+            _add_shared_picture(run, path, width, height, parts)
+            return
+        except (AttributeError, TypeError):
+            # python-docx internals renamed or with another signature: the public API still works.
+            pass
+    run.add_picture(open_image_source(path) if isinstance(path, ArchiveMember) else path, width=width, height=height)
+
+
+def _add_shared_picture(run: Run, path: ImageSource, width: Length, height: Length, parts: Dict[Any, Tuple[str, Any]]) -> None:
+    # Run.add_picture() re-hashes every image part already in the package to find duplicates,
+    # which is quadratic in the number of screenshots; identical files share one part via `parts`.
+    story = run.part
+    if path not in parts:
+        parts[path] = story.get_or_add_image(open_image_source(path) if isinstance(path, ArchiveMember) else path)
+    r_id, image = parts[path]
+    cx, cy = image.scaled_dimensions(width, height)
+    run._r.add_drawing(CT_Inline.new_pic_inline(story.next_id, r_id, image.filename, cx, cy))
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, BinaryIO, Dict, List, Optional
+
+FRAGMENT_INDEX_NAME = "html_fragments.json"
+_FRAGMENT_VERSION = 1
+_COPY_CHUNK = 1024 * 1024
+
+
+def fragment_key(event_json: str, image_path: str) -> str:
+    # The step's fields plus the screenshot file as it is now; an edit to either gives a new key.
+    st = os.stat(image_path)
+    h = hashlib.sha1(event_json.encode("utf-8"))
+    h.update(f"\0{os.path.normcase(os.path.abspath(image_path))}\0{st.st_size}\0{st.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class FragmentIndex:
+    # Byte ranges of the embedded steps in the last single-file export. The page itself is the cache:
+    # unchanged steps are copied out of the previous anleitung.html instead of re-reading and re-encoding
+    # their screenshots, so nothing is stored twice. The index only applies to the exact file it was
+    # written for (size and mtime); anything else starts from scratch.
+
+    def __init__(self, cache_dir: str, html_path: str):
+        self.path = os.path.join(cache_dir, FRAGMENT_INDEX_NAME)
+        self.html_path = html_path
+        self.hits = 0
+        self.misses = 0
+        self._old: Dict[str, List[int]] = {}
+        self._new: Dict[str, List[int]] = {}
+        self._src: Optional[BinaryIO] = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            st = os.stat(html_path)
+        except (OSError, ValueError):
+            return
+        if not isinstance(index, dict) or index.get("version") != _FRAGMENT_VERSION:
+            return
+        if index.get("html") != [st.st_size, st.st_mtime_ns]:
+            return
+        self._old = {
+            k: v for k, v in (index.get("fragments") or {}).items()
+            if isinstance(v, list) and len(v) == 2 and 0 <= v[0] and 0 <= v[1] and v[0] + v[1] <= st.st_size
+        }
+        if self._old:
+            try:
+                self._src = open(html_path, "rb")
+            except OSError:
+                self._old = {}
+
+    def copy(self, key: str, out: Any) -> bool:
+        span = self._old.get(key)
+        if span is None or self._src is None:
+            self.misses += 1
+            return False
+        offset, remaining = span
+        start = out.pos
+        self._src.seek(offset)
+        while remaining:
+            chunk = self._src.read(min(remaining, _COPY_CHUNK))
+            if not chunk:
+                raise OSError(f"{self.html_path} changed during export")
+            out.write_bytes(chunk)
+            remaining -= len(chunk)
+        self._new[key] = [start, span[1]]
+        self.hits += 1
+        return True
+
+    def record(self, key: str, start: int, end: int) -> None:
+        self._new[key] = [start, end - start]
+
+    def close(self) -> None:
+        # Before the new page replaces the old one: Windows cannot replace a file that is still open.
+        if self._src is not None:
+            self._src.close()
+            self._src = None
+
+    def save(self) -> None:
+        self.close()
+        st = os.stat(self.html_path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _FRAGMENT_VERSION, "html": [st.st_size, st.st_mtime_ns], "fragments": self._new}, f)
+        os.replace(tmp, self.path)
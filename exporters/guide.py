@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from psr.archive import is_archive
+from psr.layout import EXPORT_CACHE_DIR_NAME
+from psr.recording import ImageSource, Recording, guide_events
+
+PRINT_CACHE_DIR_NAME = "print"
+
+# Largest printed screenshot (fits Letter and A4 with ~2 cm margins, leaving room for the step text).
+# DOCX and PDF share it so they also share the downsampled images in the print cache.
+MAX_IMAGE_INCHES = (6.5, 4.0)
+
+
+@dataclass
+class GuideStep:
+    number: int
+    text: str
+    context: str = ""
+    image: Optional[ImageSource] = None
+
+
+def step_text(e: Dict[str, Any]) -> str:
+    return str(e.get("instruction") or e.get("detail") or "").strip()
+
+
+def output_path(out_dir: str, name: str, dest: Optional[str]) -> str:
+    if dest:
+        return dest
+    if is_archive(out_dir):
+        raise ValueError("Packed recordings are not written in place; pass dest")
+    return os.path.join(out_dir, name)
+
+
+def guide_steps(data: Dict[str, Any], rec: Recording) -> List[GuideStep]:
+    # Same selection and numbering as the HTML editor's DOCX download.
+    steps: List[GuideStep] = []
+    for i, e in enumerate(guide_events(data.get("events") or [])):
+        text = step_text(e)
+        if not text:
+            continue
+        context = " · ".join(str(v) for v in (e.get("app_name"), e.get("window_title")) if v)
+        steps.append(GuideStep(number=i + 1, text=text, context=context, image=rec.image_source(e.get("screenshot"))))
+    return steps
+
+
+def print_cache_dir(out_dir: str, dest: Optional[str] = None) -> str:
+    # Nothing is cached inside a packed recording; its print images go next to the output.
+    base = os.path.dirname(os.path.abspath(dest)) if (dest and is_archive(out_dir)) else out_dir
+    return os.path.join(base, EXPORT_CACHE_DIR_NAME, PRINT_CACHE_DIR_NAME)
+
+
+def print_image_box(dpi: int) -> Tuple[int, int]:
+    return round(MAX_IMAGE_INCHES[0] * dpi), round(MAX_IMAGE_INCHES[1] * dpi)
@@ -1,40 +1,377 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import os
+import shutil
 from datetime import datetime
-from typing import Any, Dict
-
-
-def export_html(out_dir: str, title: str = "Anleitung"):
-    steps_path = os.path.join(out_dir, "steps.json")
-    if not os.path.exists(steps_path):
-        raise FileNotFoundError(f"steps.json not found in {out_dir}")
-
-    with open(steps_path, "r", encoding="utf-8") as f:
-        data: Dict[str, Any] = json.load(f)
-
-    data = _embed_local_screenshots_as_data_urls(data, out_dir)
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from exporters.export_cache import FragmentIndex, fragment_key
+from exporters.image_variants import Variant, build_variants
+from exporters.size_budget import BUDGET_DIR_NAME, fit_to_budget
+from psr.archive import ArchiveMember
+from psr.layout import EXPORT_CACHE_DIR_NAME, HTML_HEAD_BYTES, HTML_NAME, STATIC_DIR_NAME, STATIC_REF, VARIANTS_DIR_NAME
+from psr.recording import Recording, local_screenshot_path
+
+EXPORT_MODES = ("single", "external")
+EDITOR_ASSET_VERSION = "1"
+
+_DATA_SLOT = "\x00psr-data\x00"
+_B64_CHUNK = 3 * 256 * 1024
+
+
+def export_html(
+    out_dir: str,
+    title: str = "Anleitung",
+    data: Optional[Dict[str, Any]] = None,
+    mode: str = "single",
+    responsive: bool = True,
+    variant_workers: Optional[int] = None,
+    max_size_mb: Optional[float] = None,
+    dest: Optional[str] = None,
+):
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode: {mode}")
+    if max_size_mb and mode != "single":
+        raise ValueError("A size budget needs mode='single'")
+
+    with Recording(out_dir) as rec:
+        if rec.packed:
+            # Screenshots are streamed out of the archive, so options that need them as files do not apply.
+            if mode != "single" or max_size_mb:
+                raise ValueError("Packed recordings export as a single HTML file without a size budget; unpack them first")
+            if dest is None:
+                raise ValueError("Packed recordings are not written in place; pass dest")
+            responsive = False
+        if data is None:
+            data = rec.data
+        return _export_html(rec, title, data, mode, responsive, variant_workers, max_size_mb, dest)
+
+
+def _export_html(
+    rec: Recording,
+    title: str,
+    data: Dict[str, Any],
+    mode: str,
+    responsive: bool,
+    variant_workers: Optional[int],
+    max_size_mb: Optional[float],
+    dest: Optional[str],
+) -> str:
+    out_dir = rec.path
+    if mode == "single":
+        embed: Optional[Recording] = rec
+        css_tag = f"<style>\n{_EDITOR_CSS}</style>"
+        js_tag = f"<script>\n{_EDITOR_JS}</script>"
+    else:
+        embed = None
+        variants = _screenshot_variants(data, out_dir, variant_workers) if responsive else {}
+        data = _local_screenshots_as_relative_urls(data, out_dir, variants)
+        css_href, js_src = _ensure_static_assets(out_dir)
+        css_tag = f'<link rel="stylesheet" href="{_esc(css_href)}"/>'
+        js_tag = f'<script src="{_esc(js_src)}"></script>'
 
     created = datetime.now().strftime("%d.%m.%Y %H:%M")
-    html_path = os.path.join(out_dir, "anleitung.html")
+    html_path = dest or os.path.join(out_dir, HTML_NAME)
 
-    html = f"""<!doctype html>
+    page = f"""<!doctype html>
 <html lang="de" data-theme="auto">
 <head>
 <meta charset="utf-8"/>
 <meta name="viewport" content="width=device-width, initial-scale=1"/>
 <title>{_esc(title)}</title>
-<style>
-:root {{
+{css_tag}
+</head>
+<body>
+<div class="wrap">
+  <header>
+    <div class="hrow">
+      <div class="titlebox">
+        <h1 contenteditable="true" id="docTitle">{_esc(title)}</h1>
+        <div class="meta">Erstellt: {created}</div>
+      </div>
+      <div class="actions">
+        <button class="ghost" id="btnTheme" title="Theme wechseln">Theme</button>
+        <button class="ok" id="btnAddStep">+ Schritt</button>
+        <button class="primary" id="btnSaveLocal">Im Browser speichern</button>
+
+        <div class="dropdown">
+          <button class="ok" id="btnDownload">Herunterladen</button>
+          <div class="menu" id="downloadMenu" role="menu" aria-hidden="true">
+            <button id="mDocx" role="menuitem">Als DOCX speichern <span class="kbd">DOCX</span></button>
+            <button id="mHtml" role="menuitem">Als HTML speichern <span class="kbd">HTML</span></button>
+            <button id="mJson" role="menuitem">JSON herunterladen <span class="kbd">JSON</span></button>
+          </div>
+        </div>
+
+        <button class="danger" id="btnReset">Zurücksetzen</button>
+      </div>
+    </div>
+  </header>
+
+  <main id="steps"></main>
+  <div class="toast" id="toast"></div>
+</div>
+
+<script id="initialData" type="application/json">{_DATA_SLOT}</script>
+<script src="https://cdn.jsdelivr.net/npm/docx@8.5.0/build/index.umd.js"></script>
+<script src="https://cdn.jsdelivr.net/npm/file-saver@2.0.5/dist/FileSaver.min.js"></script>
+{js_tag}
+</body>
+</html>
+"""
+    head, tail = page.split(_DATA_SLOT, 1)
+    if max_size_mb:
+        page_bytes = len(head.encode("utf-8")) + len(tail.encode("utf-8"))
+        data = _apply_size_budget(data, out_dir, int(max_size_mb * 1024 * 1024), page_bytes, variant_workers)
+
+    # Only for pages written in place, which the next export of this recording will find again.
+    fragments = FragmentIndex(os.path.join(out_dir, EXPORT_CACHE_DIR_NAME), html_path) if embed is not None and dest is None else None
+    tmp_path = f"{html_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            out = _PageWriter(f)
+            out.write(head)
+            _write_data_json(out, data, embed, fragments)
+            out.write(tail)
+        if fragments is not None:
+            fragments.close()
+        os.replace(tmp_path, html_path)
+    finally:
+        if fragments is not None:
+            fragments.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if fragments is not None:
+        try:
+            fragments.save()
+        except OSError:
+            pass
+    return html_path
+
+
+class _PageWriter:
+    # UTF-8 output that knows its byte offset, so the fragment index can point into the page.
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.pos = 0
+
+    def write(self, s: str) -> int:
+        self.write_bytes(s.encode("utf-8"))
+        return len(s)
+
+    def write_bytes(self, b: bytes) -> None:
+        self._f.write(b)
+        self.pos += len(b)
+
+
+def _write_data_json(f: _PageWriter, data: Dict[str, Any], embed: Optional[Recording], fragments: Optional[FragmentIndex]) -> None:
+    f.write("{")
+    for i, (key, value) in enumerate(data.items()):
+        if i:
+            f.write(", ")
+        f.write(_script_json(key) + ": ")
+        if key != "events" or not isinstance(value, list):
+            f.write(_script_json(value))
+            continue
+
+        f.write("[")
+        for j, e in enumerate(value):
+            if j:
+                f.write(", ")
+            _write_event_json(f, e, embed, fragments)
+        f.write("]")
+    f.write("}")
+
+
+def _write_event_json(f: _PageWriter, e: Any, embed: Optional[Recording], fragments: Optional[FragmentIndex]) -> None:
+    src = embed.image_source(e.get("screenshot")) if (embed is not None and isinstance(e, dict)) else None
+    if not src:
+        f.write(_script_json(e))
+        return
+
+    key = None
+    if fragments is not None and isinstance(src, str):
+        try:
+            key = fragment_key(_script_json(e), src)
+        except OSError:
+            pass
+        if key is not None and fragments.copy(key, f):
+            return
+
+    try:
+        chunks = embed.image_chunks(src, _B64_CHUNK)
+    except OSError:
+        f.write(_script_json(e))
+        return
+
+    start = f.pos
+    before, after = _data_url_parts(e, _guess_mime(src.name if isinstance(src, ArchiveMember) else src))
+    f.write(before)
+    _write_base64(f, chunks)
+    f.write(after)
+    if key is not None:
+        fragments.record(key, start, f.pos)
+
+
+def _data_url_parts(e: Dict[str, Any], mime: str) -> Tuple[str, str]:
+    before, after = _script_json({**e, "screenshot": _DATA_SLOT}).split(_script_json(_DATA_SLOT), 1)
+    return f'{before}"data:{mime};base64,', f'"{after}'
+
+
+def _write_base64(f: Any, chunks: Iterable[Any]) -> None:
+    for chunk in chunks:
+        f.write(base64.b64encode(chunk).decode("ascii"))
+
+
+def _script_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/")
+
+
+def _local_screenshots_as_relative_urls(data: Dict[str, Any], out_dir: str, variants: Optional[Dict[str, List[Variant]]] = None) -> Dict[str, Any]:
+    events = [dict(e) if isinstance(e, dict) else e for e in (data.get("events") or [])]
+    for e in events:
+        if not isinstance(e, dict):
+            continue
+        p = local_screenshot_path(e.get("screenshot"), out_dir)
+        if not p:
+            continue
+        e["screenshot"] = _url_path(os.path.relpath(p, out_dir))
+        vs = (variants or {}).get(p)
+        if vs and len(vs) > 1:
+            e["screenshot_srcset"] = ", ".join(f"{_url_path(os.path.relpath(vp, out_dir))} {w}w" for w, vp in vs)
+
+    return {**data, "events": events}
+
+
+def _apply_size_budget(data: Dict[str, Any], out_dir: str, max_bytes: int, page_bytes: int, max_workers: Optional[int]) -> Dict[str, Any]:
+    events = [dict(e) if isinstance(e, dict) else e for e in (data.get("events") or [])]
+    paths = [local_screenshot_path(e.get("screenshot"), out_dir) if isinstance(e, dict) else None for e in events]
+
+    bare = {**data, "events": [{**e, "screenshot": None} if p else e for e, p in zip(events, paths)]}
+    # Data URL prefix, quotes and the re-encoded file name per embedded screenshot.
+    overhead = page_bytes + len(_script_json(bare).encode("utf-8")) + 96 * sum(1 for p in paths if p)
+
+    cache_dir = os.path.join(out_dir, EXPORT_CACHE_DIR_NAME, BUDGET_DIR_NAME)
+    mapping, result = fit_to_budget([p for p in paths if p], max_bytes, overhead, cache_dir, max_workers=max_workers)
+    for e, p in zip(events, paths):
+        if p and p in mapping:
+            e["screenshot"] = _url_path(os.path.relpath(mapping[p], out_dir))
+    return {**data, "events": events, "export_settings": result.as_metadata()}
+
+
+def _screenshot_variants(data: Dict[str, Any], out_dir: str, max_workers: Optional[int]) -> Dict[str, List[Variant]]:
+    paths = []
+    for e in data.get("events") or []:
+        p = local_screenshot_path(e.get("screenshot"), out_dir) if isinstance(e, dict) else None
+        if p:
+            paths.append(p)
+    if not paths:
+        return {}
+    try:
+        return build_variants(paths, os.path.join(out_dir, VARIANTS_DIR_NAME), max_workers=max_workers, prune=True)
+    except ImportError:
+        return {}
+
+
+def _url_path(rel: str) -> str:
+    return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+
+def static_assets_dir(out_dir: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(out_dir)), STATIC_DIR_NAME)
+
+
+def _static_assets() -> Dict[str, str]:
+    out = {}
+    for content, ext in ((_EDITOR_CSS, "css"), (_EDITOR_JS, "js")):
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:10]
+        out[f"psr-editor-v{EDITOR_ASSET_VERSION}.{digest}.{ext}"] = content
+    return out
+
+
+def _write_static_asset(path: str, content: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def _ensure_static_assets(out_dir: str) -> Tuple[str, str]:
+    static_dir = static_assets_dir(out_dir)
+    os.makedirs(static_dir, exist_ok=True)
+
+    names = []
+    for name, content in _static_assets().items():
+        path = os.path.join(static_dir, name)
+        if not os.path.exists(path):
+            _write_static_asset(path, content)
+        names.append(_url_path(os.path.relpath(path, out_dir)))
+
+    return names[0], names[1]
+
+
+# Recreates the _static/ files an external-mode page in `rec_dir` links to; returns the ones it could not.
+def restore_static_assets(rec_dir: str, source_dir: Optional[str] = None) -> List[str]:
+    try:
+        with open(os.path.join(rec_dir, HTML_NAME), "rb") as f:
+            # The script tag follows the data: no need to read the steps.
+            text = f.read(HTML_HEAD_BYTES)
+            if not STATIC_REF.search(text):
+                return []
+            f.seek(max(f.tell(), os.fstat(f.fileno()).st_size - 4096))
+            text += f.read()
+    except FileNotFoundError:
+        return []
+
+    static_dir = static_assets_dir(rec_dir)
+    current = _static_assets()
+    missing = []
+    for name in sorted({m.decode("ascii") for m in STATIC_REF.findall(text)}):
+        path = os.path.join(static_dir, name)
+        if os.path.exists(path):
+            continue
+        os.makedirs(static_dir, exist_ok=True)
+        src = os.path.join(source_dir, name) if source_dir else None
+        if src and os.path.isfile(src):
+            shutil.copy2(src, path)
+        elif name in current:
+            _write_static_asset(path, current[name])
+        else:
+            # Written by an older editor version that is no longer known; re-exporting fixes the page.
+            missing.append(name)
+    return missing
+
+
+def _guess_mime(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".png":
+        return "image/png"
+    if ext in (".jpg", ".jpeg"):
+        return "image/jpeg"
+    if ext == ".webp":
+        return "image/webp"
+    if ext == ".gif":
+        return "image/gif"
+    return "application/octet-stream"
+
+
+def _esc(s: str) -> str:
+    return (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+_EDITOR_CSS = """:root {
   --radius: 14px;
   --radius2: 12px;
   --font: system-ui, -apple-system, Segoe UI, Roboto, Arial;
   --shadow: 0 12px 30px rgba(0,0,0,.12);
   --shadow2: 0 8px 18px rgba(0,0,0,.10);
-}}
-html[data-theme="dark"] {{
+}
+html[data-theme="dark"] {
   --bg: #0b0d12;
   --bg2: #0f131a;
   --card: #141a23;
@@ -50,8 +387,8 @@ html[data-theme="dark"] {{
   --input: #0f1520;
   --toastBg: #121621;
   --toastLine: rgba(255,255,255,.14);
-}}
-html[data-theme="light"] {{
+}
+html[data-theme="light"] {
   --bg: #f6f7fb;
   --bg2: #ffffff;
   --card: #ffffff;
@@ -67,57 +404,57 @@ html[data-theme="light"] {{
   --input: #ffffff;
   --toastBg: #111318;
   --toastLine: rgba(255,255,255,.14);
-}}
-* {{ box-sizing: border-box; }}
-html, body {{ height: 100%; }}
-body {{
+}
+* { box-sizing: border-box; }
+html, body { height: 100%; }
+body {
   margin: 0;
   font-family: var(--font);
   color: var(--text);
   background: var(--bg);
-}}
-.wrap {{
+}
+.wrap {
   max-width: 1120px;
   margin: 0 auto;
   padding: 22px 16px 56px;
-}}
-header {{
+}
+header {
   border: 1px solid var(--line);
   border-radius: var(--radius);
   background: var(--card);
   padding: 14px;
   box-shadow: var(--shadow);
-}}
-.hrow {{
+}
+.hrow {
   display: flex;
   flex-wrap: wrap;
   gap: 12px;
   align-items: flex-start;
   justify-content: space-between;
-}}
-.titlebox {{
+}
+.titlebox {
   min-width: min(640px, 100%);
-}}
-h1 {{
+}
+h1 {
   margin: 0;
   font-size: 1.45rem;
   letter-spacing: .2px;
   line-height: 1.2;
   outline: none;
-}}
-.meta {{
+}
+.meta {
   margin-top: 8px;
   color: var(--muted);
   font-size: .95rem;
-}}
-.actions {{
+}
+.actions {
   display: flex;
   gap: 10px;
   flex-wrap: wrap;
   align-items: center;
   justify-content: flex-end;
-}}
-button {{
+}
+button {
   appearance: none;
   border: 1px solid var(--line);
   background: var(--btn);
@@ -128,45 +465,45 @@ button {{
   font-weight: 650;
   letter-spacing: .1px;
   transition: background .12s ease, border-color .12s ease, transform .08s ease;
-}}
-button:hover {{
+}
+button:hover {
   background: var(--btnHover);
   border-color: rgba(79,140,255,.55);
-}}
-button:active {{
+}
+button:active {
   transform: translateY(1px);
-}}
-button.primary {{
+}
+button.primary {
   border-color: rgba(79,140,255,.70);
-}}
-button.danger {{
+}
+button.danger {
   border-color: rgba(255,79,109,.55);
-}}
-button.ok {{
+}
+button.ok {
   border-color: rgba(61,220,151,.55);
-}}
-button.ghost {{
+}
+button.ghost {
   background: transparent;
-}}
-main {{
+}
+main {
   margin-top: 14px;
   display: grid;
   gap: 12px;
-}}
-.card {{
+}
+.card {
   background: var(--card);
   border: 1px solid var(--line);
   border-radius: var(--radius);
   padding: 12px;
   box-shadow: var(--shadow2);
-}}
-.stephead {{
+}
+.stephead {
   display: grid;
   grid-template-columns: 44px 1fr auto;
   gap: 12px;
   align-items: start;
-}}
-.badge {{
+}
+.badge {
   width: 42px;
   height: 42px;
   border-radius: 14px;
@@ -176,13 +513,13 @@ main {{
   background: var(--btn);
   border: 1px solid rgba(79,140,255,.55);
   color: var(--text);
-}}
-.small {{
+}
+.small {
   color: var(--muted);
   font-size: .92rem;
   margin-top: 8px;
-}}
-.input {{
+}
+.input {
   width: 100%;
   border: 1px solid var(--line);
   background: var(--input);
@@ -194,37 +531,38 @@ main {{
   line-height: 1.28rem;
   resize: vertical;
   min-height: 52px;
-}}
-.input:focus {{
+}
+.input:focus {
   border-color: rgba(79,140,255,.80);
   box-shadow: 0 0 0 3px rgba(79,140,255,.18);
-}}
-.rowbtns {{
+}
+.rowbtns {
   display: flex;
   gap: 8px;
   flex-wrap: wrap;
   justify-content: flex-end;
-}}
-.imgwrap {{
+}
+.imgwrap {
   margin-top: 12px;
   border-radius: var(--radius2);
   overflow: hidden;
   border: 1px solid var(--line);
   background: var(--card2);
-}}
-.imgwrap img {{
+}
+.imgwrap img {
   width: 100%;
+  height: auto;
   display: block;
-}}
-.imgtools {{
+}
+.imgtools {
   margin-top: 10px;
   display: flex;
   gap: 10px;
   flex-wrap: wrap;
   align-items: center;
-}}
-.file {{ display: none; }}
-label.filebtn {{
+}
+.file { display: none; }
+label.filebtn {
   display: inline-flex;
   align-items: center;
   gap: 8px;
@@ -236,15 +574,15 @@ label.filebtn {{
   cursor: pointer;
   font-weight: 650;
   transition: background .12s ease, border-color .12s ease, transform .08s ease;
-}}
-label.filebtn:hover {{
+}
+label.filebtn:hover {
   background: var(--btnHover);
   border-color: rgba(79,140,255,.55);
-}}
-label.filebtn:active {{
+}
+label.filebtn:active {
   transform: translateY(1px);
-}}
-.toast {{
+}
+.toast {
   position: fixed;
   left: 16px;
   bottom: 16px;
@@ -260,15 +598,15 @@ label.filebtn:active {{
   max-width: min(560px, calc(100vw - 32px));
   white-space: pre-wrap;
   box-shadow: var(--shadow2);
-}}
-.toast.show {{
+}
+.toast.show {
   opacity: 1;
   transform: translateY(0);
-}}
-.dropdown {{
+}
+.dropdown {
   position: relative;
-}}
-.menu {{
+}
+.menu {
   position: absolute;
   right: 0;
   top: calc(100% + 10px);
@@ -279,11 +617,11 @@ label.filebtn:active {{
   box-shadow: var(--shadow);
   padding: 8px;
   display: none;
-}}
-.menu.show {{
+}
+.menu.show {
   display: block;
-}}
-.menu button {{
+}
+.menu button {
   width: 100%;
   text-align: left;
   display: flex;
@@ -294,146 +632,385 @@ label.filebtn:active {{
   background: transparent;
   border: 1px solid transparent;
   font-weight: 650;
-}}
-.menu button:hover {{
+}
+.menu button:hover {
   background: var(--btnHover);
   border-color: var(--line);
-}}
-.kbd {{
+}
+.kbd {
   font-size: .85rem;
   color: var(--muted);
-}}
-@media (max-width: 860px) {{
-  .titlebox {{ min-width: 100%; }}
-}}
-</style>
-</head>
-<body>
-<div class="wrap">
-  <header>
-    <div class="hrow">
-      <div class="titlebox">
-        <h1 contenteditable="true" id="docTitle">{_esc(title)}</h1>
-        <div class="meta">Erstellt: {created}</div>
-      </div>
-      <div class="actions">
-        <button class="ghost" id="btnTheme" title="Theme wechseln">Theme</button>
-        <button class="ok" id="btnAddStep">+ Schritt</button>
-        <button class="primary" id="btnSaveLocal">Im Browser speichern</button>
-
-        <div class="dropdown">
-          <button class="ok" id="btnDownload">Herunterladen</button>
-          <div class="menu" id="downloadMenu" role="menu" aria-hidden="true">
-            <button id="mDocx" role="menuitem">Als DOCX speichern <span class="kbd">DOCX</span></button>
-            <button id="mHtml" role="menuitem">Als HTML speichern <span class="kbd">HTML</span></button>
-            <button id="mJson" role="menuitem">JSON herunterladen <span class="kbd">JSON</span></button>
-          </div>
-        </div>
-
-        <button class="danger" id="btnReset">Zurücksetzen</button>
-      </div>
-    </div>
-  </header>
-
-  <main id="steps"></main>
-  <div class="toast" id="toast"></div>
-</div>
-
-<script id="initialData" type="application/json">{json.dumps(data, ensure_ascii=False)}</script>
-<script src="https://cdn.jsdelivr.net/npm/docx@8.5.0/build/index.umd.js"></script>
-<script src="https://cdn.jsdelivr.net/npm/file-saver@2.0.5/dist/FileSaver.min.js"></script>
-<script>
-const ORIGINAL = JSON.parse(document.getElementById("initialData").textContent || "{{}}");
-const STORAGE_KEY = "psrlike_editor_state_" + location.pathname;
+}
+@media (max-width: 860px) {
+  .titlebox { min-width: 100%; }
+}
+"""
 
-function deepCopy(x) {{ return JSON.parse(JSON.stringify(x)); }}
+_EDITOR_JS = """const STORAGE_KEY = "psrlike_editor_state_" + location.pathname;
+const DB_NAME = "psrlike_editor";
+const SAVE_DELAY_MS = 400;
 
-function preferTheme() {{
-  try {{
+function preferTheme() {
+  try {
     return window.matchMedia && window.matchMedia("(prefers-color-scheme: dark)").matches ? "dark" : "light";
-  }} catch (e) {{
+  } catch (e) {
     return "dark";
-  }}
-}}
+  }
+}
 
-function applyTheme(theme) {{
+function applyTheme(theme) {
   const root = document.documentElement;
   if (theme === "auto") theme = preferTheme();
   root.setAttribute("data-theme", theme);
-}}
+}
 
-function loadTheme() {{
-  try {{
+function loadTheme() {
+  try {
     const t = localStorage.getItem("psrlike_theme");
     if (!t) return "auto";
     return t;
-  }} catch (e) {{
+  } catch (e) {
     return "auto";
-  }}
-}}
+  }
+}
 
-function saveTheme(t) {{
-  try {{ localStorage.setItem("psrlike_theme", t); }} catch(e) {{}}
-}}
+function saveTheme(t) {
+  try { localStorage.setItem("psrlike_theme", t); } catch(e) {}
+}
 
 let THEME = loadTheme();
 applyTheme(THEME);
 
-try {{
+try {
   const mq = window.matchMedia("(prefers-color-scheme: dark)");
-  mq.addEventListener("change", () => {{
+  mq.addEventListener("change", () => {
     if ((loadTheme() || "auto") === "auto") applyTheme("auto");
-  }});
-}} catch(e) {{}}
-
-function loadState() {{
-  try {{
-    const s = localStorage.getItem(STORAGE_KEY);
-    if (!s) return deepCopy(ORIGINAL);
-    const parsed = JSON.parse(s);
-    if (!parsed || typeof parsed !== "object") return deepCopy(ORIGINAL);
-    return parsed;
-  }} catch(e) {{
-    return deepCopy(ORIGINAL);
-  }}
-}}
-
-function saveState(state) {{
-  localStorage.setItem(STORAGE_KEY, JSON.stringify(state));
-}}
+  });
+} catch(e) {}
 
-function toast(msg) {{
+function toast(msg) {
   const el = document.getElementById("toast");
   el.textContent = msg;
   el.classList.add("show");
   clearTimeout(toast._t);
   toast._t = setTimeout(() => el.classList.remove("show"), 1500);
-}}
+}
 
-function normalizeEvents(state) {{
+function normalizeEvents(state) {
   const allowed = new Set(["mouse_click","key_press","text_input","custom_step"]);
   const ev = (state.events || []).filter(e => allowed.has((e.kind||"")));
   state.events = ev;
   return state;
-}}
-
-let STATE = normalizeEvents(loadState());
+}
 
-function getStepText(e) {{
+function getStepText(e) {
   return (e.instruction || e.detail || "").trim();
-}}
+}
 
-async function fileToDataUrl(file) {{
-  return new Promise((resolve, reject) => {{
+async function fileToDataUrl(file) {
+  return new Promise((resolve, reject) => {
     const r = new FileReader();
     r.onload = () => resolve(r.result);
     r.onerror = reject;
     r.readAsDataURL(file);
-  }});
-}}
+  });
+}
+
+let STATE = { events: [] };
+let BASE = new Map();
+let ORIGIN = "";
+let DB = null;
+let DOC_SAVED = false;
+let LEGACY_PENDING = false;
+let UID_SEQ = 0;
+
+const DIRTY = new Set();
+const REMOVED = new Set();
+const OBJECT_URLS = new Map();
+let ORDER_DIRTY = false;
+let SAVE_TIMER = null;
+let SAVING = Promise.resolve();
+
+function assignUid(e, uid) {
+  Object.defineProperty(e, "_uid", {
+    value: uid || ("c" + Date.now().toString(36) + "_" + (UID_SEQ++)),
+    configurable: true
+  });
+  return e;
+}
+
+function originalState() {
+  const text = document.getElementById("initialData").textContent || "{}";
+  const state = normalizeEvents(JSON.parse(text));
+  state.events.forEach((e, i) => assignUid(e, "o" + i));
+  BASE = new Map(state.events.map(e => [e._uid, e]));
+  ORIGIN = [text.length, state.created_at || "", state.events.length].join(":");
+  return state;
+}
 
-function download(filename, text, mime) {{
-  const blob = new Blob([text], {{type: mime}});
+function readLegacyState() {
+  try {
+    const s = localStorage.getItem(STORAGE_KEY);
+    const parsed = s ? JSON.parse(s) : null;
+    if (!parsed || typeof parsed !== "object") return null;
+    normalizeEvents(parsed).events.forEach(e => assignUid(e));
+    return parsed;
+  } catch(e) {
+    return null;
+  }
+}
+
+function idbRequest(req) {
+  return new Promise((resolve, reject) => {
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+  });
+}
+
+function idbDone(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = tx.onabort = () => reject(tx.error);
+  });
+}
+
+function openDb() {
+  return new Promise((resolve, reject) => {
+    if (!window.indexedDB) {
+      reject(new Error("IndexedDB nicht verfügbar"));
+      return;
+    }
+    const req = indexedDB.open(DB_NAME, 1);
+    req.onupgradeneeded = () => {
+      const db = req.result;
+      db.createObjectStore("docs");
+      db.createObjectStore("steps");
+      db.createObjectStore("images");
+    };
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+  });
+}
+
+function docRange() {
+  return IDBKeyRange.bound([STORAGE_KEY], [STORAGE_KEY, []]);
+}
+
+async function blobHash(blob) {
+  const buf = await blob.arrayBuffer();
+  if (window.crypto && crypto.subtle) {
+    const d = new Uint8Array(await crypto.subtle.digest("SHA-256", buf));
+    return Array.from(d.slice(0, 16), b => b.toString(16).padStart(2, "0")).join("");
+  }
+  const bytes = new Uint8Array(buf);
+  let h = 0x811c9dc5;
+  for (let i = 0; i < bytes.length; i++) h = Math.imul(h ^ bytes[i], 0x01000193);
+  return "f" + (h >>> 0).toString(16) + "_" + bytes.length;
+}
+
+function blobUrl(blob, hash) {
+  const url = URL.createObjectURL(blob);
+  OBJECT_URLS.set(url, { blob: blob, hash: hash || null });
+  return url;
+}
+
+function revokeBlobUrls() {
+  OBJECT_URLS.forEach((_, url) => URL.revokeObjectURL(url));
+  OBJECT_URLS.clear();
+}
+
+async function storeImage(src) {
+  const ent = OBJECT_URLS.get(src);
+  if (ent && ent.hash) return ent.hash;
+  const blob = ent ? ent.blob : await (await fetch(src)).blob();
+  const hash = await blobHash(blob);
+  if (ent) ent.hash = hash;
+
+  const tx = DB.transaction("images", "readwrite");
+  const store = tx.objectStore("images");
+  const key = [STORAGE_KEY, hash];
+  const req = store.getKey(key);
+  req.onsuccess = () => { if (req.result === undefined) store.put(blob, key); };
+  await idbDone(tx);
+  return hash;
+}
+
+async function stepRecord(e) {
+  const rec = Object.assign({}, e);
+  const base = BASE.get(e._uid);
+  if (e.screenshot && base && e.screenshot === base.screenshot) {
+    rec.screenshot = null;
+    rec.screenshot_ref = "original";
+  } else if (typeof e.screenshot === "string" && (e.screenshot.startsWith("data:") || e.screenshot.startsWith("blob:"))) {
+    rec.screenshot = null;
+    rec.screenshot_ref = await storeImage(e.screenshot);
+  }
+  return rec;
+}
+
+async function loadState() {
+  const state = originalState();
+  try {
+    DB = await openDb();
+  } catch(err) {
+    DB = null;
+    return readLegacyState() || state;
+  }
+
+  const doc = await idbRequest(DB.transaction("docs").objectStore("docs").get(STORAGE_KEY));
+  if (!doc || doc.origin !== ORIGIN) {
+    if (doc) await clearStoredState();
+    const legacy = readLegacyState();
+    if (!legacy) return state;
+    legacy.events.forEach(e => DIRTY.add(e));
+    ORDER_DIRTY = true;
+    LEGACY_PENDING = true;
+    scheduleSave();
+    return legacy;
+  }
+  DOC_SAVED = true;
+
+  const steps = DB.transaction("steps").objectStore("steps");
+  const [keys, values] = await Promise.all([
+    idbRequest(steps.getAllKeys(docRange())),
+    idbRequest(steps.getAll(docRange()))
+  ]);
+  const records = new Map(keys.map((k, i) => [k[1], values[i]]));
+
+  const hashes = new Set();
+  records.forEach(rec => { if (rec.screenshot_ref && rec.screenshot_ref !== "original") hashes.add(rec.screenshot_ref); });
+  const urls = new Map();
+  if (hashes.size) {
+    const images = DB.transaction("images").objectStore("images");
+    const list = Array.from(hashes);
+    const blobs = await Promise.all(list.map(h => idbRequest(images.get([STORAGE_KEY, h]))));
+    list.forEach((h, i) => { if (blobs[i]) urls.set(h, blobUrl(blobs[i], h)); });
+  }
+
+  const events = [];
+  (doc.order || []).forEach(uid => {
+    const rec = records.get(uid);
+    if (!rec) {
+      if (BASE.has(uid)) events.push(BASE.get(uid));
+      return;
+    }
+    const ref = rec.screenshot_ref;
+    delete rec.screenshot_ref;
+    if (ref === "original") rec.screenshot = BASE.has(uid) ? BASE.get(uid).screenshot : null;
+    else if (ref) rec.screenshot = urls.get(ref) || null;
+    events.push(assignUid(rec, uid));
+  });
+  state.events = events;
+
+  pruneImages(hashes);
+  return state;
+}
+
+async function pruneImages(keep) {
+  try {
+    const tx = DB.transaction("images", "readwrite");
+    const store = tx.objectStore("images");
+    const req = store.getAllKeys(docRange());
+    req.onsuccess = () => req.result.forEach(k => { if (!keep.has(k[1])) store.delete(k); });
+    await idbDone(tx);
+  } catch(e) {}
+}
+
+async function clearStoredState() {
+  DOC_SAVED = false;
+  try { localStorage.removeItem(STORAGE_KEY); } catch(e) {}
+  if (!DB) return;
+  const tx = DB.transaction(["docs", "steps", "images"], "readwrite");
+  tx.objectStore("docs").delete(STORAGE_KEY);
+  tx.objectStore("steps").delete(docRange());
+  tx.objectStore("images").delete(docRange());
+  await idbDone(tx);
+}
+
+function saveLegacyState() {
+  DIRTY.clear();
+  REMOVED.clear();
+  ORDER_DIRTY = false;
+  try {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(STATE));
+  } catch(err) {
+    toast("Speichern fehlgeschlagen: Speicherplatz im Browser voll");
+  }
+}
+
+async function flushState() {
+  if (!DB) return saveLegacyState();
+  const dirty = Array.from(DIRTY);
+  const removed = Array.from(REMOVED);
+  const orderDirty = ORDER_DIRTY || (!DOC_SAVED && dirty.length > 0);
+  DIRTY.clear();
+  REMOVED.clear();
+  ORDER_DIRTY = false;
+  if (!dirty.length && !removed.length && !orderDirty) return;
+
+  try {
+    const recs = [];
+    for (const e of dirty) recs.push([e._uid, await stepRecord(e)]);
+
+    const tx = DB.transaction(["docs", "steps"], "readwrite");
+    const steps = tx.objectStore("steps");
+    recs.forEach(([uid, rec]) => steps.put(rec, [STORAGE_KEY, uid]));
+    removed.forEach(uid => steps.delete([STORAGE_KEY, uid]));
+    if (orderDirty) {
+      tx.objectStore("docs").put({
+        origin: ORIGIN,
+        order: (STATE.events || []).map(e => e._uid),
+        saved_at: new Date().toISOString()
+      }, STORAGE_KEY);
+    }
+    await idbDone(tx);
+    if (orderDirty) DOC_SAVED = true;
+    if (LEGACY_PENDING) {
+      LEGACY_PENDING = false;
+      try { localStorage.removeItem(STORAGE_KEY); } catch(e) {}
+    }
+  } catch(err) {
+    dirty.forEach(e => DIRTY.add(e));
+    removed.forEach(uid => REMOVED.add(uid));
+    if (orderDirty) ORDER_DIRTY = true;
+    toast("Speichern fehlgeschlagen: " + (err && err.message ? err.message : err));
+  }
+}
+
+function saveNow() {
+  clearTimeout(SAVE_TIMER);
+  SAVING = SAVING.then(flushState);
+  return SAVING;
+}
+
+function scheduleSave() {
+  clearTimeout(SAVE_TIMER);
+  SAVE_TIMER = setTimeout(saveNow, SAVE_DELAY_MS);
+}
+
+function touchStep(e) {
+  DIRTY.add(e);
+  scheduleSave();
+}
+
+function touchOrder() {
+  ORDER_DIRTY = true;
+  scheduleSave();
+}
+
+async function portableState() {
+  const copy = Object.assign({}, STATE);
+  copy.events = await Promise.all((STATE.events || []).map(async e => {
+    if (typeof e.screenshot !== "string" || !e.screenshot.startsWith("blob:")) return e;
+    const ent = OBJECT_URLS.get(e.screenshot);
+    const blob = ent ? ent.blob : await (await fetch(e.screenshot)).blob();
+    return Object.assign({}, e, { screenshot: await fileToDataUrl(blob) });
+  }));
+  return copy;
+}
+
+function download(filename, text, mime) {
+  const blob = new Blob([text], {type: mime});
   const url = URL.createObjectURL(blob);
   const a = document.createElement("a");
   a.href = url;
@@ -442,22 +1019,24 @@ function download(filename, text, mime) {{
   a.click();
   a.remove();
   URL.revokeObjectURL(url);
-}}
+}
 
-function buildHtmlFromCurrent() {{
+async function buildHtmlFromCurrent() {
   const title = (document.getElementById("docTitle").textContent || "Anleitung").trim();
   const doc = document.documentElement.cloneNode(true);
   const scriptData = doc.querySelector("#initialData");
-  if (scriptData) scriptData.textContent = JSON.stringify(STATE);
+  if (scriptData) scriptData.textContent = JSON.stringify(await portableState());
   const t = doc.querySelector("title");
   if (t) t.textContent = title;
   const h1 = doc.querySelector("#docTitle");
   if (h1) h1.textContent = title;
+  const steps = doc.querySelector("#steps");
+  if (steps) steps.textContent = "";
   return "<!doctype html>\\n" + doc.outerHTML;
-}}
+}
 
-function makeCustomEvent() {{
-  return {{
+function makeCustomEvent() {
+  return assignUid({
     kind: "custom_step",
     instruction: "Neuer Schritt",
     detail: "",
@@ -465,395 +1044,494 @@ function makeCustomEvent() {{
     screenshot: null,
     app_name: "",
     window_title: ""
-  }};
-}}
-
-function insertStepAt(index) {{
+  });
+}
+
+const IMG_SIZES = "(max-width: 1120px) calc(100vw - 58px), 1062px";
+const HAS_IO = "IntersectionObserver" in window;
+
+let SLOTS = [];
+let MONITORS = new Map();
+
+const cardObserver = HAS_IO ? new IntersectionObserver(onCardsVisible, { rootMargin: "1500px 0px" }) : null;
+const imgObserver = HAS_IO ? new IntersectionObserver(onImagesVisible, { rootMargin: "600px 0px" }) : null;
+
+function onCardsVisible(entries) {
+  entries.forEach(entry => {
+    if (entry.isIntersecting) materialize(entry.target);
+    else release(entry.target);
+  });
+}
+
+function onImagesVisible(entries) {
+  entries.forEach(entry => {
+    if (entry.isIntersecting) attachImage(entry.target);
+  });
+}
+
+function attachImage(img) {
+  if (imgObserver) imgObserver.unobserve(img);
+  const e = img._event;
+  if (!e || !e.screenshot) return;
+  if (e.screenshot_srcset) {
+    img.srcset = e.screenshot_srcset;
+    img.sizes = IMG_SIZES;
+  }
+  img.src = e.screenshot;
+}
+
+function estimateHeight(e) {
+  const root = document.getElementById("steps");
+  const col = Math.max(240, Math.min(root.clientWidth || 1088, 1088) - 26);
+  let h = 150;
+  if (e.screenshot) {
+    const mon = e.monitor_index != null ? MONITORS.get(e.monitor_index) : null;
+    const ratio = (mon && mon.width && mon.height) ? mon.height / mon.width : 9 / 16;
+    h += Math.round(col * ratio) + 14;
+  }
+  return h;
+}
+
+function slotIndex(slot) {
+  return SLOTS.indexOf(slot);
+}
+
+function makeSlot(e) {
+  const slot = document.createElement("section");
+  slot.className = "card";
+  slot._event = e;
+  slot._built = false;
+  slot.style.minHeight = estimateHeight(e) + "px";
+  return slot;
+}
+
+function observeSlot(slot) {
+  if (cardObserver) cardObserver.observe(slot);
+  else materialize(slot);
+}
+
+function clearSlot(slot) {
+  if (slot._img && imgObserver) imgObserver.unobserve(slot._img);
+  slot.textContent = "";
+  slot._built = false;
+  slot._badge = slot._input = slot._up = slot._down = slot._img = null;
+}
+
+function release(slot) {
+  if (!slot._built) return;
+  if (slot.contains(document.activeElement)) return;
+  const h = slot.offsetHeight;
+  clearSlot(slot);
+  slot.style.minHeight = h + "px";
+}
+
+function refreshSlot(slot) {
+  clearSlot(slot);
+  slot.style.minHeight = estimateHeight(slot._event) + "px";
+  materialize(slot);
+}
+
+function renumber(from, to) {
+  const n = SLOTS.length;
+  const end = to == null ? n - 1 : Math.min(to, n - 1);
+  for (let i = Math.max(0, from); i <= end; i++) {
+    const s = SLOTS[i];
+    if (!s._built) continue;
+    s._badge.textContent = i + 1;
+    s._up.disabled = i === 0;
+    s._down.disabled = i === n - 1;
+    if (s._img) s._img.alt = "Schritt " + (i + 1);
+  }
+}
+
+function insertStepAt(index) {
   const e = makeCustomEvent();
   const arr = STATE.events || (STATE.events = []);
   if (index < 0) index = 0;
   if (index > arr.length) index = arr.length;
   arr.splice(index, 0, e);
-  saveState(STATE);
-  render();
-  setTimeout(() => {{
-    const ta = document.querySelector('textarea[data-step="' + index + '"]');
-    if (ta) {{ ta.focus(); ta.setSelectionRange(0, ta.value.length); }}
-  }}, 0);
-}}
 
-function render() {{
+  const slot = makeSlot(e);
+  document.getElementById("steps").insertBefore(slot, SLOTS[index] || null);
+  SLOTS.splice(index, 0, slot);
+  materialize(slot);
+  observeSlot(slot);
+  renumber(index - 1);
+  touchStep(e);
+  touchOrder();
+  setTimeout(() => {
+    materialize(slot);
+    const ta = slot._input;
+    if (ta) {
+      slot.scrollIntoView({ block: "nearest" });
+      ta.focus();
+      ta.setSelectionRange(0, ta.value.length);
+    }
+  }, 0);
+}
+
+function removeStep(slot) {
+  const idx = slotIndex(slot);
+  if (idx < 0) return;
+  const e = STATE.events[idx];
+  STATE.events.splice(idx, 1);
+  SLOTS.splice(idx, 1);
+  if (cardObserver) cardObserver.unobserve(slot);
+  clearSlot(slot);
+  slot.remove();
+  renumber(idx - 1);
+  DIRTY.delete(e);
+  REMOVED.add(e._uid);
+  touchOrder();
+}
+
+function moveStep(slot, delta) {
+  const idx = slotIndex(slot);
+  const to = idx + delta;
+  if (idx < 0 || to < 0 || to >= SLOTS.length) return;
+  const arr = STATE.events;
+  const tmp = arr[to];
+  arr[to] = arr[idx];
+  arr[idx] = tmp;
+  SLOTS[idx] = SLOTS[to];
+  SLOTS[to] = slot;
+  const a = Math.min(idx, to);
+  document.getElementById("steps").insertBefore(SLOTS[a], SLOTS[a + 1]);
+  renumber(a, a + 1);
+  touchOrder();
+}
+
+function materialize(slot) {
+  if (slot._built) return;
+  const e = slot._event;
+  const card = slot;
+  const idx = slotIndex(slot);
+  const badgeNo = idx + 1;
+
+  const mon = e.monitor_index != null ? MONITORS.get(e.monitor_index) : null;
+  const ctxParts = [];
+  if (e.app_name) ctxParts.push(e.app_name);
+  if (e.window_title) ctxParts.push(e.window_title);
+  if (mon && mon.width && mon.height) ctxParts.push("Monitor " + mon.index + " (" + mon.width + "×" + mon.height + ")");
+  const ctx = ctxParts.join(" · ");
+
+  const head = document.createElement("div");
+  head.className = "stephead";
+
+  const badge = document.createElement("div");
+  badge.className = "badge";
+  badge.textContent = badgeNo;
+
+  const mid = document.createElement("div");
+  const input = document.createElement("textarea");
+  input.className = "input";
+  input.rows = 2;
+  input.value = getStepText(e);
+  input.addEventListener("input", () => {
+    e.instruction = input.value;
+    touchStep(e);
+  });
+
+  const meta = document.createElement("div");
+  meta.className = "small";
+  meta.textContent = ctx ? ctx : "";
+
+  mid.appendChild(input);
+  if (ctx) mid.appendChild(meta);
+
+  const btns = document.createElement("div");
+  btns.className = "rowbtns";
+
+  const addBelow = document.createElement("button");
+  addBelow.textContent = "+";
+  addBelow.title = "Neuen Schritt darunter einfügen";
+  addBelow.addEventListener("click", () => insertStepAt(slotIndex(slot) + 1));
+
+  const up = document.createElement("button");
+  up.textContent = "↑";
+  up.title = "Schritt nach oben";
+  up.disabled = idx === 0;
+  up.addEventListener("click", () => moveStep(slot, -1));
+
+  const down = document.createElement("button");
+  down.textContent = "↓";
+  down.title = "Schritt nach unten";
+  down.disabled = idx === SLOTS.length - 1;
+  down.addEventListener("click", () => moveStep(slot, 1));
+
+  const del = document.createElement("button");
+  del.className = "danger";
+  del.textContent = "Löschen";
+  del.addEventListener("click", () => removeStep(slot));
+
+  btns.appendChild(addBelow);
+  btns.appendChild(up);
+  btns.appendChild(down);
+  btns.appendChild(del);
+
+  head.appendChild(badge);
+  head.appendChild(mid);
+  head.appendChild(btns);
+
+  card.appendChild(head);
+
+  const shot = e.screenshot;
+  let img = null;
+  if (shot) {
+    const imgwrap = document.createElement("div");
+    imgwrap.className = "imgwrap";
+    img = document.createElement("img");
+    img.decoding = "async";
+    if (mon && mon.width && mon.height) {
+      img.width = mon.width;
+      img.height = mon.height;
+    }
+    img.alt = "Schritt " + badgeNo;
+    img._event = e;
+    imgwrap.appendChild(img);
+    card.appendChild(imgwrap);
+  }
+
+  const tools = document.createElement("div");
+  tools.className = "imgtools";
+
+  const rm = document.createElement("button");
+  rm.textContent = shot ? "Bild entfernen" : "Kein Bild";
+  rm.className = shot ? "danger" : "";
+  rm.disabled = !shot;
+  rm.addEventListener("click", () => {
+    e.screenshot = null;
+    e.screenshot_srcset = null;
+    touchStep(e);
+    refreshSlot(slot);
+  });
+
+  const fileId = "file_" + idx + "_" + Math.random().toString(16).slice(2);
+  const file = document.createElement("input");
+  file.type = "file";
+  file.accept = "image/*";
+  file.className = "file";
+  file.id = fileId;
+
+  file.addEventListener("change", async () => {
+    const f = file.files && file.files[0];
+    if (!f) return;
+    e.screenshot = blobUrl(f);
+    e.screenshot_srcset = null;
+    touchStep(e);
+    refreshSlot(slot);
+    toast("Bild hinzugefügt");
+  });
+
+  const lbl = document.createElement("label");
+  lbl.className = "filebtn";
+  lbl.setAttribute("for", fileId);
+  lbl.textContent = shot ? "Bild ersetzen" : "Bild hinzufügen";
+
+  tools.appendChild(rm);
+  tools.appendChild(lbl);
+  tools.appendChild(file);
+
+  card.appendChild(tools);
+
+  slot._built = true;
+  slot._badge = badge;
+  slot._input = input;
+  slot._up = up;
+  slot._down = down;
+  slot._img = img;
+  slot.style.minHeight = "";
+
+  if (img) {
+    if (imgObserver) imgObserver.observe(img);
+    else attachImage(img);
+  }
+}
+
+function render() {
   const root = document.getElementById("steps");
-  root.innerHTML = "";
-  const events = STATE.events || [];
-  const monitors = new Map((STATE.monitors || []).map(m => [m.index, m]));
-
-  events.forEach((e, idx) => {{
-    const card = document.createElement("section");
-    card.className = "card";
-    const badgeNo = idx + 1;
-
-    const mon = e.monitor_index != null ? monitors.get(e.monitor_index) : null;
-    const ctxParts = [];
-    if (e.app_name) ctxParts.push(e.app_name);
-    if (e.window_title) ctxParts.push(e.window_title);
-    if (mon && mon.width && mon.height) ctxParts.push("Monitor " + mon.index + " (" + mon.width + "×" + mon.height + ")");
-    const ctx = ctxParts.join(" · ");
-
-    const head = document.createElement("div");
-    head.className = "stephead";
-
-    const badge = document.createElement("div");
-    badge.className = "badge";
-    badge.textContent = badgeNo;
-
-    const mid = document.createElement("div");
-    const input = document.createElement("textarea");
-    input.className = "input";
-    input.rows = 2;
-    input.value = getStepText(e);
-    input.dataset.step = String(idx);
-    input.addEventListener("input", () => {{
-      e.instruction = input.value;
-      saveState(STATE);
-    }});
-
-    const meta = document.createElement("div");
-    meta.className = "small";
-    meta.textContent = ctx ? ctx : "";
-
-    mid.appendChild(input);
-    if (ctx) mid.appendChild(meta);
-
-    const btns = document.createElement("div");
-    btns.className = "rowbtns";
-
-    const addBelow = document.createElement("button");
-    addBelow.textContent = "+";
-    addBelow.title = "Neuen Schritt darunter einfügen";
-    addBelow.addEventListener("click", () => insertStepAt(idx + 1));
-
-    const up = document.createElement("button");
-    up.textContent = "↑";
-    up.title = "Schritt nach oben";
-    up.disabled = idx === 0;
-    up.addEventListener("click", () => {{
-      if (idx <= 0) return;
-      const arr = STATE.events;
-      const tmp = arr[idx-1];
-      arr[idx-1] = arr[idx];
-      arr[idx] = tmp;
-      saveState(STATE);
-      render();
-    }});
-
-    const down = document.createElement("button");
-    down.textContent = "↓";
-    down.title = "Schritt nach unten";
-    down.disabled = idx === events.length - 1;
-    down.addEventListener("click", () => {{
-      if (idx >= events.length - 1) return;
-      const arr = STATE.events;
-      const tmp = arr[idx+1];
-      arr[idx+1] = arr[idx];
-      arr[idx] = tmp;
-      saveState(STATE);
-      render();
-    }});
-
-    const del = document.createElement("button");
-    del.className = "danger";
-    del.textContent = "Löschen";
-    del.addEventListener("click", () => {{
-      STATE.events.splice(idx, 1);
-      saveState(STATE);
-      render();
-    }});
-
-    btns.appendChild(addBelow);
-    btns.appendChild(up);
-    btns.appendChild(down);
-    btns.appendChild(del);
-
-    head.appendChild(badge);
-    head.appendChild(mid);
-    head.appendChild(btns);
-
-    card.appendChild(head);
-
-    const shot = e.screenshot;
-    if (shot) {{
-      const imgwrap = document.createElement("div");
-      imgwrap.className = "imgwrap";
-      const img = document.createElement("img");
-      img.src = shot;
-      img.alt = "Schritt " + badgeNo;
-      imgwrap.appendChild(img);
-      card.appendChild(imgwrap);
-    }}
-
-    const tools = document.createElement("div");
-    tools.className = "imgtools";
-
-    const rm = document.createElement("button");
-    rm.textContent = shot ? "Bild entfernen" : "Kein Bild";
-    rm.className = shot ? "danger" : "";
-    rm.disabled = !shot;
-    rm.addEventListener("click", () => {{
-      e.screenshot = null;
-      saveState(STATE);
-      render();
-    }});
-
-    const fileId = "file_" + idx + "_" + Math.random().toString(16).slice(2);
-    const file = document.createElement("input");
-    file.type = "file";
-    file.accept = "image/*";
-    file.className = "file";
-    file.id = fileId;
-
-    file.addEventListener("change", async () => {{
-      const f = file.files && file.files[0];
-      if (!f) return;
-      const url = await fileToDataUrl(f);
-      e.screenshot = url;
-      saveState(STATE);
-      render();
-      toast("Bild hinzugefügt");
-    }});
-
-    const lbl = document.createElement("label");
-    lbl.className = "filebtn";
-    lbl.setAttribute("for", fileId);
-    lbl.textContent = shot ? "Bild ersetzen" : "Bild hinzufügen";
-
-    tools.appendChild(rm);
-    tools.appendChild(lbl);
-    tools.appendChild(file);
-
-    card.appendChild(tools);
-    root.appendChild(card);
-  }});
-}}
-
-async function imgSrcToBytes(src) {{
-  try {{
+  if (cardObserver) cardObserver.disconnect();
+  if (imgObserver) imgObserver.disconnect();
+  root.textContent = "";
+  MONITORS = new Map((STATE.monitors || []).map(m => [m.index, m]));
+
+  SLOTS = (STATE.events || []).map(makeSlot);
+  const frag = document.createDocumentFragment();
+  SLOTS.forEach(slot => frag.appendChild(slot));
+  root.appendChild(frag);
+  SLOTS.forEach(observeSlot);
+}
+
+async function imgSrcToBytes(src) {
+  try {
     if (!src) return null;
-    if (src.startsWith("data:")) {{
+    if (src.startsWith("data:")) {
       const res = await fetch(src);
       const ab = await res.arrayBuffer();
       return new Uint8Array(ab);
-    }}
+    }
     const res = await fetch(src);
     const ab = await res.arrayBuffer();
     return new Uint8Array(ab);
-  }} catch(e) {{
+  } catch(e) {
     return null;
-  }}
-}}
+  }
+}
 
-function scaleToFit(w, h, maxW, maxH) {{
+function scaleToFit(w, h, maxW, maxH) {
   const s = Math.min(maxW / w, maxH / h, 1);
   return [Math.round(w*s), Math.round(h*s)];
-}}
+}
 
-async function exportDocx() {{
-  if (!window.docx || !window.saveAs) {{
+async function exportDocx() {
+  if (!window.docx || !window.saveAs) {
     toast("DOCX-Export benötigt Internet (docx.js/file-saver).");
     return;
-  }}
+  }
   const title = (document.getElementById("docTitle").textContent || "Anleitung").trim();
   const events = STATE.events || [];
   const docxApi = window.docx;
 
   const children = [];
-  children.push(new docxApi.Paragraph({{ text: title, heading: docxApi.HeadingLevel.TITLE }}));
-  children.push(new docxApi.Paragraph({{ text: " ", spacing: {{ after: 140 }} }}));
+  children.push(new docxApi.Paragraph({ text: title, heading: docxApi.HeadingLevel.TITLE }));
+  children.push(new docxApi.Paragraph({ text: " ", spacing: { after: 140 } }));
 
-  for (let i = 0; i < events.length; i++) {{
+  for (let i = 0; i < events.length; i++) {
     const e = events[i];
     const text = getStepText(e);
     if (!text) continue;
 
-    children.push(new docxApi.Paragraph({{
-      children: [new docxApi.TextRun({{ text: (i + 1) + ". " + text, bold: true }})],
-      spacing: {{ after: 120 }}
-    }}));
+    children.push(new docxApi.Paragraph({
+      children: [new docxApi.TextRun({ text: (i + 1) + ". " + text, bold: true })],
+      spacing: { after: 120 }
+    }));
 
     const ctxParts = [];
     if (e.app_name) ctxParts.push(e.app_name);
     if (e.window_title) ctxParts.push(e.window_title);
     const ctx = ctxParts.join(" · ");
-    if (ctx) {{
-      children.push(new docxApi.Paragraph({{ text: ctx, spacing: {{ after: 120 }} }}));
-    }}
+    if (ctx) {
+      children.push(new docxApi.Paragraph({ text: ctx, spacing: { after: 120 } }));
+    }
 
-    if (e.screenshot) {{
+    if (e.screenshot) {
       const bytes = await imgSrcToBytes(e.screenshot);
-      if (bytes) {{
+      if (bytes) {
         let iw = 1200, ih = 800;
-        try {{
+        try {
           const img = new Image();
           img.decoding = "async";
           img.src = e.screenshot;
-          await new Promise((resolve) => {{ img.onload = resolve; img.onerror = resolve; }});
+          await new Promise((resolve) => { img.onload = resolve; img.onerror = resolve; });
           iw = img.naturalWidth || img.width || iw;
           ih = img.naturalHeight || img.height || ih;
-        }} catch(ex) {{}}
+        } catch(ex) {}
 
         const [tw, th] = scaleToFit(iw, ih, 620, 380);
-        children.push(new docxApi.Paragraph({{
-          children: [new docxApi.ImageRun({{
+        children.push(new docxApi.Paragraph({
+          children: [new docxApi.ImageRun({
             data: bytes,
-            transformation: {{ width: tw, height: th }}
-          }})],
-          spacing: {{ after: 240 }}
-        }}));
-      }}
-    }}
+            transformation: { width: tw, height: th }
+          })],
+          spacing: { after: 240 }
+        }));
+      }
+    }
 
-    children.push(new docxApi.Paragraph({{ text: " ", spacing: {{ after: 80 }} }}));
-  }}
+    children.push(new docxApi.Paragraph({ text: " ", spacing: { after: 80 } }));
+  }
 
-  const doc = new docxApi.Document({{ sections: [{{ properties: {{}}, children: children }}] }});
+  const doc = new docxApi.Document({ sections: [{ properties: {}, children: children }] });
   const blob = await docxApi.Packer.toBlob(doc);
   window.saveAs(blob, (title || "Anleitung") + ".docx");
-}}
+}
 
-function closeMenu() {{
+function closeMenu() {
   const m = document.getElementById("downloadMenu");
   m.classList.remove("show");
   m.setAttribute("aria-hidden", "true");
-}}
+}
 
-function toggleMenu() {{
+function toggleMenu() {
   const m = document.getElementById("downloadMenu");
   const open = m.classList.contains("show");
-  if (open) {{
+  if (open) {
     closeMenu();
-  }} else {{
+  } else {
     m.classList.add("show");
     m.setAttribute("aria-hidden", "false");
-  }}
-}}
+  }
+}
 
-document.getElementById("btnTheme").addEventListener("click", () => {{
+document.getElementById("btnTheme").addEventListener("click", () => {
   const current = loadTheme() || "auto";
   const next = current === "auto" ? "dark" : (current === "dark" ? "light" : "auto");
   saveTheme(next);
   THEME = next;
   applyTheme(next);
   toast(next === "auto" ? "Theme: automatisch" : ("Theme: " + (next === "dark" ? "dunkel" : "hell")));
-}});
+});
 
-document.getElementById("btnAddStep").addEventListener("click", () => {{
+document.getElementById("btnAddStep").addEventListener("click", () => {
   insertStepAt((STATE.events || []).length);
-}});
+});
 
-document.getElementById("btnSaveLocal").addEventListener("click", () => {{
-  saveState(STATE);
+document.getElementById("btnSaveLocal").addEventListener("click", async () => {
+  await saveNow();
   toast("Gespeichert");
-}});
+});
 
-document.getElementById("btnDownload").addEventListener("click", (e) => {{
+document.getElementById("btnDownload").addEventListener("click", (e) => {
   e.stopPropagation();
   toggleMenu();
-}});
+});
 
-document.getElementById("mJson").addEventListener("click", () => {{
+document.getElementById("mJson").addEventListener("click", async () => {
   closeMenu();
-  const payload = deepCopy(STATE);
+  const payload = await portableState();
   const t = (document.getElementById("docTitle").textContent || "Anleitung").trim();
   payload.title = t;
   download("steps.edited.json", JSON.stringify(payload, null, 2), "application/json");
-}});
+});
 
-document.getElementById("mHtml").addEventListener("click", () => {{
+document.getElementById("mHtml").addEventListener("click", async () => {
   closeMenu();
-  const html = buildHtmlFromCurrent();
+  const html = await buildHtmlFromCurrent();
   download("anleitung.edited.html", html, "text/html");
-}});
+});
 
-document.getElementById("mDocx").addEventListener("click", () => {{
+document.getElementById("mDocx").addEventListener("click", () => {
   closeMenu();
   exportDocx();
-}});
-
-document.getElementById("btnReset").addEventListener("click", () => {{
-  STATE = normalizeEvents(deepCopy(ORIGINAL));
-  saveState(STATE);
+});
+
+document.getElementById("btnReset").addEventListener("click", async () => {
+  clearTimeout(SAVE_TIMER);
+  DIRTY.clear();
+  REMOVED.clear();
+  ORDER_DIRTY = false;
+  LEGACY_PENDING = false;
+  await SAVING;
+  try { await clearStoredState(); } catch(e) {}
+  revokeBlobUrls();
+  STATE = originalState();
   toast("Zurückgesetzt");
   render();
-}});
+});
 
 document.addEventListener("click", () => closeMenu());
-document.addEventListener("keydown", (e) => {{
+document.addEventListener("visibilitychange", () => {
+  if (document.visibilityState === "hidden") saveNow();
+});
+window.addEventListener("pagehide", () => saveNow());
+document.addEventListener("keydown", (e) => {
   if (e.key === "Escape") closeMenu();
-}});
-
-render();
-</script>
-</body>
-</html>
+});
+
+loadState()
+  .catch(() => originalState())
+  .then(state => {
+    STATE = state;
+    render();
+  });
 """
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
-
-    return html_path
-
-
-def _embed_local_screenshots_as_data_urls(data: Dict[str, Any], out_dir: str) -> Dict[str, Any]:
-    events = data.get("events") or []
-    for e in events:
-        if not isinstance(e, dict):
-            continue
-        shot = e.get("screenshot")
-        if not shot or not isinstance(shot, str):
-            continue
-        if shot.startswith("data:"):
-            continue
-        if shot.startswith("http://") or shot.startswith("https://"):
-            continue
-
-        p = shot
-        if not os.path.isabs(p):
-            p = os.path.join(out_dir, shot)
-        p = os.path.normpath(p)
-
-        try:
-            out_root = os.path.abspath(out_dir)
-            if not os.path.abspath(p).startswith(out_root):
-                continue
-        except Exception:
-            continue
-
-        if not os.path.exists(p):
-            continue
-
-        mime = _guess_mime(p)
-        try:
-            with open(p, "rb") as f:
-                b = f.read()
-            e["screenshot"] = f"data:{mime};base64," + base64.b64encode(b).decode("ascii")
-        except Exception:
-            continue
-
-    data["events"] = events
-    return data
-
-
-def _guess_mime(path: str) -> str:
-    ext = os.path.splitext(path)[1].lower()
-    if ext == ".png":
-        return "image/png"
-    if ext in (".jpg", ".jpeg"):
-        return "image/jpeg"
-    if ext == ".webp":
-        return "image/webp"
-    if ext == ".gif":
-        return "image/gif"
-    return "application/octet-stream"
-
-
-def _esc(s: str) -> str:
-    return (s or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
\ No newline at end of file
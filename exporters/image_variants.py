@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from psr.recording import ImageSource, open_image_source
+
+VARIANT_WIDTHS = (640, 1120, 2240)
+
+Variant = Tuple[int, str]
+FittedImage = Tuple[ImageSource, int, int]
+
+
+def file_digest(path: ImageSource) -> str:
+    h = hashlib.sha1()
+    with open_image_source(path) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()[:20]
+
+
+def variant_format() -> Tuple[str, str]:
+    from PIL import features
+
+    if features.check("webp"):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+def _variant_path(cache_dir: str, digest: str, width: int, ext: str) -> str:
+    return os.path.join(cache_dir, f"{digest}_{width}.{ext}")
+
+
+def _render_variants(src: str, cache_dir: str, digest: str, widths: Sequence[int], fmt: str, ext: str, quality: int) -> List[Variant]:
+    from PIL import Image
+
+    out: List[Variant] = []
+    with Image.open(src) as img:
+        img = img.convert("RGB")
+        for w in widths:
+            dst = _variant_path(cache_dir, digest, w, ext)
+            if not os.path.exists(dst):
+                h = max(1, round(img.height * w / img.width))
+                resized = img.resize((w, h), Image.LANCZOS)
+                tmp = f"{dst}.{os.getpid()}.tmp"
+                if fmt == "WEBP":
+                    resized.save(tmp, format=fmt, quality=quality, method=4)
+                else:
+                    resized.save(tmp, format=fmt, quality=quality, optimize=True, progressive=True)
+                os.replace(tmp, dst)
+            out.append((w, dst))
+    return out
+
+
+def build_variants(
+    sources: Iterable[str],
+    cache_dir: str,
+    widths: Sequence[int] = VARIANT_WIDTHS,
+    quality: int = 80,
+    max_workers: Optional[int] = None,
+    prune: bool = False,
+) -> Dict[str, List[Variant]]:
+    from PIL import Image
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fmt, ext = variant_format()
+
+    result: Dict[str, List[Variant]] = {}
+    todo: Dict[str, Tuple[str, List[int]]] = {}
+    by_digest: Dict[str, List[str]] = {}
+
+    for src in dict.fromkeys(sources):
+        try:
+            digest = file_digest(src)
+            with Image.open(src) as img:
+                src_w = img.width
+        except Exception:
+            continue
+
+        by_digest.setdefault(digest, []).append(src)
+        if len(by_digest[digest]) > 1:
+            continue
+
+        wanted = [w for w in widths if w < src_w]
+        missing = [w for w in wanted if not os.path.exists(_variant_path(cache_dir, digest, w, ext))]
+        result[src] = [(w, _variant_path(cache_dir, digest, w, ext)) for w in wanted] + [(src_w, src)]
+        if missing:
+            todo[src] = (digest, missing)
+
+    if todo:
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(todo) <= 1:
+            for src, (digest, missing) in todo.items():
+                _render_variants(src, cache_dir, digest, missing, fmt, ext, quality)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                futures = [
+                    pool.submit(_render_variants, src, cache_dir, digest, missing, fmt, ext, quality)
+                    for src, (digest, missing) in todo.items()
+                ]
+                for fut in futures:
+                    fut.result()
+
+    for srcs in by_digest.values():
+        first = srcs[0]
+        if first not in result:
+            continue
+        for other in srcs[1:]:
+            result[other] = result[first][:-1] + [(result[first][-1][0], other)]
+
+    if prune:
+        keep = {os.path.normcase(p) for vs in result.values() for _, p in vs}
+        for entry in os.listdir(cache_dir):
+            p = os.path.join(cache_dir, entry)
+            if os.path.isfile(p) and os.path.normcase(p) not in keep:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    return result
+
+
+def _fitted_size(width: int, height: int, max_size: Tuple[int, int]) -> Tuple[int, int]:
+    scale = min(1.0, max_size[0] / width, max_size[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _render_fitted(src: ImageSource, dst: str, size: Tuple[int, int], quality: int) -> None:
+    from PIL import Image
+
+    with open_image_source(src) as f, Image.open(f) as img:
+        img = img.convert("RGB").resize(size, Image.LANCZOS, reducing_gap=3.0)
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        # 4:4:4 keeps UI text and click markers crisp.
+        img.save(tmp, format="JPEG", quality=quality, subsampling=0, optimize=True)
+        os.replace(tmp, dst)
+
+
+def fit_images(
+    sources: Iterable[ImageSource],
+    cache_dir: str,
+    max_size: Tuple[int, int],
+    quality: int = 85,
+    max_workers: Optional[int] = None,
+) -> Dict[ImageSource, FittedImage]:
+    from PIL import Image
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    result: Dict[ImageSource, FittedImage] = {}
+    todo: Dict[str, Tuple[ImageSource, Tuple[int, int]]] = {}
+    by_digest: Dict[str, ImageSource] = {}
+
+    for src in dict.fromkeys(sources):
+        try:
+            digest = file_digest(src)
+            if digest in by_digest:
+                result[src] = result[by_digest[digest]]
+                continue
+            with open_image_source(src) as f, Image.open(f) as img:
+                w, h = img.size
+        except Exception:
+            continue
+
+        by_digest[digest] = src
+        tw, th = _fitted_size(w, h, max_size)
+        if (tw, th) == (w, h):
+            result[src] = (src, w, h)
+            continue
+        dst = os.path.join(cache_dir, f"{digest}_{tw}x{th}.jpg")
+        result[src] = (dst, tw, th)
+        if not os.path.exists(dst):
+            todo[dst] = (src, (tw, th))
+
+    if todo:
+        workers = max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(todo) <= 1:
+            for dst, (src, size) in todo.items():
+                _render_fitted(src, dst, size, quality)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                futures = [pool.submit(_render_fitted, src, dst, size, quality) for dst, (src, size) in todo.items()]
+                for fut in futures:
+                    fut.result()
+
+    return result
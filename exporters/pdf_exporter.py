@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch, mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from exporters.guide import MAX_IMAGE_INCHES, GuideStep, guide_steps, output_path, print_cache_dir, print_image_box
+from exporters.image_variants import FittedImage, fit_images
+from exporters.pdf_writer import PageContent, PdfWriter
+from psr.layout import PDF_NAME
+from psr.recording import ImageSource, Recording
+
+_MARGIN = 20 * mm
+_FOOTER = 10 * mm
+_SCREEN_DPI = 96
+_MUTED = HexColor("#5b6275")
+
+
+def _rgb(color: Any) -> Tuple[float, float, float]:
+    return color.red, color.green, color.blue
+
+
+class _PageWriter:
+    # Lays steps out top to bottom; each finished page goes to the file right away.
+
+    def __init__(self, writer: PdfWriter, on_page: Optional[Callable[[int], None]] = None):
+        self.writer = writer
+        self.on_page = on_page
+        self.page_width, self.page_height = writer.page_size
+        self.frame_width = self.page_width - 2 * _MARGIN
+        self.pages = 0
+        self._top = self.page_height - _MARGIN
+        self._bottom = _MARGIN + _FOOTER
+        self.y = self._top
+        self.content = PageContent()
+
+    def _empty(self) -> bool:
+        return self.y >= self._top
+
+    def ensure(self, height: float) -> None:
+        if self.y - height < self._bottom and not self._empty():
+            self.new_page()
+
+    def new_page(self) -> None:
+        footer = f"Seite {self.pages + 1}"
+        x = (self.page_width - stringWidth(footer, "Helvetica", 8)) / 2
+        self.content.text(x, _MARGIN, footer, "Helvetica", 8, _rgb(_MUTED))
+        self.writer.add_page(self.content)
+        self.content = PageContent()
+        self.pages += 1
+        if self.on_page is not None:
+            self.on_page(self.pages)
+        self.y = self._top
+
+    def finish(self) -> None:
+        if not self._empty() or self.pages == 0:
+            self.new_page()
+
+    def lines(self, text: str, font: str, size: float) -> List[str]:
+        return simpleSplit(text, font, size, self.frame_width)
+
+    def draw_lines(self, lines: List[str], font: str, size: float, leading: float, color: Any = None) -> None:
+        rgb = _rgb(color or HexColor("#0a1022"))
+        for line in lines:
+            self.ensure(leading)
+            self.content.text(_MARGIN, self.y - size, line, font, size, rgb)
+            self.y -= leading
+
+    def draw_image(self, path: ImageSource, width: float, height: float) -> None:
+        self.ensure(height)
+        # Same path -> same image XObject, embedded once however many steps show it.
+        self.content.image(self.writer.image(path), _MARGIN, self.y - height, width, height)
+        self.y -= height
+
+
+def _image_points(fitted: FittedImage) -> Tuple[float, float]:
+    _, w, h = fitted
+    max_w, max_h = MAX_IMAGE_INCHES
+    width_in = min(max_w, max_h * w / h, w / _SCREEN_DPI)
+    return width_in * inch, width_in * h / w * inch
+
+
+def _write_step(page: _PageWriter, step: GuideStep, fitted: Optional[FittedImage]) -> None:
+    head = page.lines(f"{step.number}. {step.text}", "Helvetica-Bold", 11)
+    ctx = page.lines(step.context, "Helvetica", 9) if step.context else []
+    img_w, img_h = _image_points(fitted) if fitted else (0.0, 0.0)
+
+    # Keep a step's text together with its screenshot whenever it fits on one page.
+    page.ensure(len(head) * 14 + len(ctx) * 12 + (img_h + 6 if fitted else 0))
+    page.draw_lines(head, "Helvetica-Bold", 11, 14)
+    page.draw_lines(ctx, "Helvetica", 9, 12, _MUTED)
+    if fitted:
+        page.y -= 6
+        page.draw_image(fitted[0], img_w, img_h)
+    page.y -= 16
+
+
+def export_pdf(
+    out_dir: str,
+    title: str = "Anleitung",
+    data: Optional[Dict[str, Any]] = None,
+    dpi: int = 150,
+    image_workers: Optional[int] = None,
+    on_page: Optional[Callable[[int], None]] = None,
+    dest: Optional[str] = None,
+) -> str:
+    with Recording(out_dir) as rec:
+        steps = guide_steps(rec.data if data is None else data, rec)
+    images = fit_images([s.image for s in steps if s.image], print_cache_dir(out_dir, dest), print_image_box(dpi), max_workers=image_workers)
+
+    pdf_path = output_path(out_dir, PDF_NAME, dest)
+    tmp_path = f"{pdf_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = PdfWriter(f, A4)
+            page = _PageWriter(writer, on_page)
+            page.draw_lines(page.lines(title, "Helvetica-Bold", 20), "Helvetica-Bold", 20, 26)
+            page.y -= 14
+
+            for step in steps:
+                _write_step(page, step, images.get(step.image) if step.image else None)
+
+            page.finish()
+            writer.close(title, creator="PSRLike")
+        os.replace(tmp_path, pdf_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return pdf_path
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import zlib
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from psr.recording import ImageSource, open_image_source
+
+# Standard Type 1 fonts: every PDF viewer has them, so nothing is embedded.
+_FONT_ENCODING = "cp1252"
+_CATALOG, _PAGES, _INFO = 1, 2, 3
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode(_FONT_ENCODING, errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)").replace(b"\r", b"\\r") + b")"
+
+
+def _pdf_text(text: str) -> bytes:
+    # Document info strings: UTF-16 with BOM, so titles keep any character.
+    return b"<" + ("\ufeff" + text).encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _num(v: float) -> bytes:
+    return (f"{v:.3f}".rstrip("0").rstrip(".") or "0").encode("ascii")
+
+
+class PageContent:
+    # Drawing operators of one page; handed to PdfWriter.add_page when the page is done.
+
+    def __init__(self) -> None:
+        self.ops: List[bytes] = []
+        self.fonts: Set[str] = set()
+        self.images: Set[str] = set()
+
+    def text(self, x: float, y: float, s: str, font: str, size: float, rgb: Tuple[float, float, float]) -> None:
+        self.fonts.add(font)
+        self.ops.append(
+            b"BT /" + font.encode("ascii") + b" " + _num(size) + b" Tf "
+            + b" ".join(_num(c) for c in rgb) + b" rg "
+            + _num(x) + b" " + _num(y) + b" Td " + _pdf_string(s) + b" Tj ET"
+        )
+
+    def image(self, name: str, x: float, y: float, width: float, height: float) -> None:
+        self.images.add(name)
+        self.ops.append(b"q " + b" ".join(map(_num, (width, 0, 0, height, x, y))) + b" cm /" + name.encode("ascii") + b" Do Q")
+
+
+class PdfWriter:
+    # Writes each object to the file as soon as it is complete. Only the object offsets, the page list and
+    # the names of embedded images stay in memory, so peak memory is one page and one image regardless of
+    # the document's length. Streams are binary (Flate or the JPEG file as is), never ASCII85.
+
+    def __init__(self, f: BinaryIO, page_size: Tuple[float, float], compress: bool = True):
+        self._f = f
+        self.page_size = page_size
+        self.compress = compress
+        self._offsets: Dict[int, int] = {}
+        self._next = _INFO + 1
+        self._pages: List[int] = []
+        self._fonts: Dict[str, int] = {}
+        self._images: Dict[ImageSource, Tuple[str, int]] = {}
+        f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def pages(self) -> int:
+        return len(self._pages)
+
+    def _reserve(self) -> int:
+        num = self._next
+        self._next += 1
+        return num
+
+    def _object(self, num: int, body: bytes) -> None:
+        self._offsets[num] = self._f.tell()
+        self._f.write(b"%d 0 obj\n" % num + body + b"\nendobj\n")
+
+    def _stream(self, num: int, attrs: bytes, data: bytes) -> None:
+        self._object(num, b"<< " + attrs + b" /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+
+    def font(self, name: str) -> str:
+        if name not in self._fonts:
+            num = self._reserve()
+            self._object(num, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name.encode("ascii") + b" /Encoding /WinAnsiEncoding >>")
+            self._fonts[name] = num
+        return name
+
+    def image(self, src: ImageSource) -> str:
+        # One XObject per source, however many pages show it.
+        known = self._images.get(src)
+        if known is not None:
+            return known[0]
+        from PIL import Image
+
+        num = self._reserve()
+        with open_image_source(src) as f, Image.open(f) as img:
+            w, h = img.size
+            if img.format == "JPEG" and img.mode in ("RGB", "L"):
+                f.seek(0)
+                space = b"/DeviceRGB" if img.mode == "RGB" else b"/DeviceGray"
+                data, filt = f.read(), b"/DCTDecode"
+            else:
+                space = b"/DeviceRGB"
+                data, filt = zlib.compress(img.convert("RGB").tobytes(), 6), b"/FlateDecode"
+        attrs = b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s /BitsPerComponent 8 /Filter %s" % (w, h, space, filt)
+        self._stream(num, attrs, data)
+        name = f"Im{len(self._images) + 1}"
+        self._images[src] = (name, num)
+        return name
+
+    def add_page(self, content: PageContent) -> None:
+        for name in content.fonts:
+            self.font(name)
+        data = b"\n".join(content.ops)
+        contents = self._reserve()
+        if self.compress:
+            self._stream(contents, b"/Filter /FlateDecode", zlib.compress(data, 6))
+        else:
+            self._stream(contents, b"", data)
+
+        fonts = b" ".join(b"/%s %d 0 R" % (n.encode("ascii"), self._fonts[n]) for n in sorted(content.fonts))
+        nums = {name: num for name, num in self._images.values()}
+        images = b" ".join(b"/%s %d 0 R" % (n.encode("ascii"), nums[n]) for n in sorted(content.images))
+        page = self._reserve()
+        self._object(
+            page,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Contents %d 0 R /Resources << /Font << %s >> /XObject << %s >> >> >>"
+            % (_PAGES, _num(self.page_size[0]), _num(self.page_size[1]), contents, fonts, images),
+        )
+        self._pages.append(page)
+        self._f.flush()
+
+    def close(self, title: str = "", creator: Optional[str] = None) -> None:
+        kids = b" ".join(b"%d 0 R" % p for p in self._pages)
+        self._object(_PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._object(_CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % _PAGES)
+        info = b"/Title " + _pdf_text(title)
+        if creator:
+            info += b" /Creator " + _pdf_text(creator)
+        self._object(_INFO, b"<< " + info + b" >>")
+
+        xref = self._f.tell()
+        self._f.write(b"xref\n0 %d\n0000000000 65535 f \n" % self._next)
+        for num in range(1, self._next):
+            self._f.write(b"%010d 00000 n \n" % self._offsets[num])
+        self._f.write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next, _CATALOG, _INFO, xref))
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from exporters.image_variants import file_digest
+
+BUDGET_DIR_NAME = "budget"
+BUDGET_SCALES = (1.0, 0.8, 0.65, 0.5, 0.4)
+BUDGET_QUALITIES = (90, 80, 70, 60, 50, 40)
+
+# Below this JPEG quality UI text gets visibly blotchy, so shrinking the image is preferred first.
+_MIN_PREFERRED_QUALITY = 60
+_CALIBRATION_SAMPLES = 4
+_COMPLEXITY_FLOOR = 0.02
+_B64 = 4 / 3
+
+Setting = Tuple[float, int]
+
+
+@dataclass
+class BudgetResult:
+    max_bytes: int
+    image_format: str
+    image_scale: float
+    image_quality: Optional[int]
+    predicted_bytes: int
+    image_bytes: int
+    budget_met: bool
+
+    def as_metadata(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["max_size_mb"] = round(d.pop("max_bytes") / (1024 * 1024), 3)
+        return d
+
+
+def image_stats(path: str) -> Tuple[int, int, float]:
+    # Mean absolute luminance gradient of a 1/4-size copy; flat UI areas compress to almost nothing.
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(path) as img:
+        w, h = img.size
+        small = img.convert("L").reduce(4) if min(w, h) >= 64 else img.convert("L")
+    a = np.asarray(small, dtype=np.int16)
+    if a.size == 0:
+        return w, h, 0.0
+    dx = np.abs(np.diff(a, axis=1)).mean() if a.shape[1] > 1 else 0.0
+    dy = np.abs(np.diff(a, axis=0)).mean() if a.shape[0] > 1 else 0.0
+    return w, h, float(dx + dy) / 255.0
+
+
+def _scaled(img: Any, scale: float) -> Any:
+    from PIL import Image
+
+    if scale >= 1.0:
+        return img
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def _calibrate(path: str, scales: Sequence[float], qualities: Sequence[int]) -> Dict[Setting, int]:
+    from PIL import Image
+
+    out: Dict[Setting, int] = {}
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        for s in scales:
+            scaled = _scaled(img, s)
+            for q in qualities:
+                buf = io.BytesIO()
+                scaled.save(buf, format="JPEG", quality=q, optimize=True)
+                out[(s, q)] = buf.tell()
+    return out
+
+
+def _encode(src: str, dst: str, scale: float, quality: int) -> int:
+    from PIL import Image
+
+    if not os.path.exists(dst):
+        with Image.open(src) as img:
+            img = _scaled(img.convert("RGB"), scale)
+            tmp = f"{dst}.{os.getpid()}.tmp"
+            img.save(tmp, format="JPEG", quality=quality, optimize=True)
+            os.replace(tmp, dst)
+    return os.path.getsize(dst)
+
+
+def _map(fn: Callable[..., Any], args: List[Tuple[Any, ...]], max_workers: Optional[int]) -> List[Any]:
+    workers = min(max_workers or os.cpu_count() or 1, len(args))
+    if workers <= 1:
+        return [fn(*a) for a in args]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fn, *a) for a in args]
+        return [f.result() for f in futures]
+
+
+def _ladder() -> List[Setting]:
+    settings = [(s, q) for s in BUDGET_SCALES for q in BUDGET_QUALITIES]
+    return sorted(settings, key=lambda sq: (sq[1] >= _MIN_PREFERRED_QUALITY, sq[0], sq[1]), reverse=True)
+
+
+def _encoded_path(cache_dir: str, digest: str, setting: Setting) -> str:
+    s, q = setting
+    return os.path.join(cache_dir, f"{digest}_s{round(s * 100)}_q{q}.jpg")
+
+
+def fit_to_budget(
+    sources: Iterable[str],
+    max_bytes: int,
+    overhead_bytes: int,
+    cache_dir: str,
+    max_workers: Optional[int] = None,
+) -> Tuple[Dict[str, str], BudgetResult]:
+    # One scale/quality for all screenshots. `sources` lists every embedded occurrence, since repeated
+    # screenshots are embedded again. Returns an empty mapping when the originals already fit.
+    occurrences: Dict[str, int] = {}
+    for src in sources:
+        occurrences[src] = occurrences.get(src, 0) + 1
+
+    original = int(sum(os.path.getsize(p) * n for p, n in occurrences.items()) * _B64)
+    available = max_bytes - overhead_bytes
+    if original <= available:
+        return {}, BudgetResult(max_bytes, "original", 1.0, None, original, original, True)
+
+    digests: Dict[str, str] = {}
+    counts: Dict[str, int] = {}
+    first: Dict[str, str] = {}
+    for src, n in occurrences.items():
+        d = file_digest(src)
+        digests[src] = d
+        counts[d] = counts.get(d, 0) + n
+        first.setdefault(d, src)
+
+    distinct = list(first.items())
+    stats = dict(zip((d for d, _ in distinct), _map(image_stats, [(p,) for _, p in distinct], max_workers)))
+
+    import numpy as np
+
+    keys = [d for d, _ in distinct]
+    pixels = np.array([stats[d][0] * stats[d][1] for d in keys], dtype=np.float64)
+    complexity = np.array([stats[d][2] for d in keys], dtype=np.float64) + _COMPLEXITY_FLOOR
+    weight = np.array([counts[d] for d in keys], dtype=np.float64)
+    basis = pixels * complexity
+
+    # Calibrate bytes per (pixel x complexity) on a few images spread over the complexity range.
+    order = np.argsort(complexity)
+    picks = sorted({int(order[round(i * (len(order) - 1) / max(1, _CALIBRATION_SAMPLES - 1))]) for i in range(_CALIBRATION_SAMPLES)})
+    measured = _map(_calibrate, [(first[keys[i]], BUDGET_SCALES, BUDGET_QUALITIES) for i in picks], max_workers)
+    sample_basis = basis[picks]
+
+    ladder = _ladder()
+    predicted: Dict[Setting, float] = {}
+    for setting in ladder:
+        s, _ = setting
+        sizes = np.array([m[setting] for m in measured], dtype=np.float64)
+        rate = float(np.median(sizes / (sample_basis * s * s)))
+        predicted[setting] = float((basis * s * s * rate * weight).sum()) * _B64
+
+    os.makedirs(cache_dir, exist_ok=True)
+    correction = 1.0
+    chosen = ladder[-1]
+    actual = 0
+    for setting in ladder:
+        if predicted[setting] * correction > available and setting != ladder[-1]:
+            continue
+        sizes = _map(_encode, [(first[d], _encoded_path(cache_dir, d, setting), setting[0], setting[1]) for d in keys], max_workers)
+        actual = int(sum(size * counts[d] for d, size in zip(keys, sizes)) * _B64)
+        chosen = setting
+        if actual <= available:
+            break
+        correction = actual / max(1.0, predicted[setting])
+
+    keep = {os.path.basename(_encoded_path(cache_dir, d, chosen)) for d in keys}
+    for entry in os.listdir(cache_dir):
+        if entry not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, entry))
+            except OSError:
+                pass
+
+    mapping = {src: _encoded_path(cache_dir, digests[src], chosen) for src in occurrences}
+    result = BudgetResult(
+        max_bytes=max_bytes,
+        image_format="JPEG",
+        image_scale=chosen[0],
+        image_quality=chosen[1],
+        predicted_bytes=int(predicted[chosen]),
+        image_bytes=actual,
+        budget_met=actual <= available,
+    )
+    return mapping, result
@@ -1,19 +1,55 @@
 from __future__ import annotations
 
 import os
+import queue
 import sys
+import tempfile
+import threading
 import time
 import webbrowser
+from collections import OrderedDict
 import multiprocessing as mp
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, filedialog, messagebox, simpledialog
 
+from gui.dispatch import TkDispatcher, read_connection
 from gui.recorder_process import recorder_worker
-from psr.recordings_store import list_recordings, rename_recording, delete_recording, create_recording_dir
+from psr.archive import ARCHIVE_EXT, is_archive
+from psr.layout import HTML_HEAD_BYTES, HTML_NAME, STEPS_NAME, is_external_html
+from psr.recordings_store import (
+    JobEvent,
+    JobQueue,
+    create_recording_dir,
+    list_recordings_page,
+    search_recordings,
+)
 from psr.paths import recordings_root_dir
+from psr.recording import Recording
+from psr.retention import RetentionEngine, RetentionPolicy
+from psr.thumbnails import PREVIEW_SIZE, StepThumbnail, step_thumbnails
+
+
+_EXPORT_STAGE_LABELS = {
+    "narrate": "Beschreibungen",
+    "save_steps": STEPS_NAME,
+    "cleanup_images": "Bilder aufräumen",
+    "export_html": "HTML",
+    "export_docx": "DOCX",
+    "export_pdf": "PDF",
+    "dedupe_images": "Bilder deduplizieren",
+}
+
+_JOB_LABELS = {
+    "delete": "Löschen",
+    "rename": "Umbenennen",
+    "move": "Verschieben",
+    "export": "Export",
+    "retention": "Aufräumen",
+    "open": "HTML erzeugen",
+}
 
 
 @dataclass
@@ -22,13 +58,42 @@ class AppConfig:
     video_fps: int = 8
     screenshot_delay_ms: int = 0
     record_text_input: bool = True
+    export_mode: str = "single"
+    export_docx: bool = False
+    export_pdf: bool = False
+    dedupe_images: bool = False
+    key_screenshots: bool = False
+
+
+# Rows are paged into the tree as the user scrolls; each page reaches the Tk thread in smaller batches.
+_LIST_PAGE_SIZE = 200
+_LIST_BATCH_SIZE = 50
+
+# Retention runs a few recordings at a time in the background; sooner again while work is left.
+_RETENTION_INTERVAL_MS = 30 * 60 * 1000
+_RETENTION_BACKLOG_MS = 60 * 1000
+_RETENTION_BATCH = 5
+
+# On close, a running export gets this long to finish; the Tk loop keeps running while it waits.
+_CLOSE_WAIT_S = 60.0
+_CLOSE_POLL_MS = 200
+
+# Step thumbnails of the selected recording reach the preview pane in batches. Decoded images are
+# kept across selections, the least recently shown dropped first.
+_PREVIEW_BATCH = 8
+_PREVIEW_CACHE_SIZE = 300
+
+_EXPORT_MODE_LABELS = {
+    "single": "Einzeldatei (zum Versenden)",
+    "external": "Bilder extern (schnell)",
+}
 
 
 class RecorderGUI:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("PSR Recorder")
-        self.root.geometry("1020x640")
+        self.root.geometry("1260x640")
 
         self.cfg = AppConfig()
         self._proc: Optional[mp.Process] = None
@@ -37,12 +102,50 @@ class RecorderGUI:
 
         self._recording_out_dir: Optional[str] = None
         self._last_html_path: Optional[str] = None
+        self._pending_exports: Set[str] = set()
+        self._closing = False
+
+        self._start_clicked_at: Optional[float] = None
+        self.last_start_latency_ms: Optional[float] = None
+        self._search_after: Optional[str] = None
+
+        # Listing state: the loader thread serves requests tagged with a generation; batches of an
+        # outdated generation are dropped on both sides. A request with a query runs a search instead.
+        self._list_requests: "queue.Queue[Tuple[int, int, int, bool, Optional[str]]]" = queue.Queue()
+        self._list_generation = 0
+        self._list_wanted = _LIST_PAGE_SIZE
+        self._list_loaded = 0
+        self._list_total = 0
+        self._list_loading = False
+        self._list_seen: Set[str] = set()
+        self._list_reload = False
+        self._pending_select: Optional[str] = None
+        self._tree_mode = "list"
+
+        self._preview_requests: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._preview_generation = 0
+        self._preview_path: Optional[str] = None
+        self._preview_y = 0
+        self._preview_shown: List[tk.PhotoImage] = []
+        self._photos: "OrderedDict[Tuple[Any, ...], tk.PhotoImage]" = OrderedDict()
+
+        self._dispatch = TkDispatcher(self.root)
+        self._jobs = JobQueue(on_event=lambda ev: self._dispatch.post(self._on_job_event, ev))
+        # Started from the Tk loop, like the worker reader: posting to Tk fails until mainloop runs.
+        self.root.after(0, lambda: threading.Thread(target=self._list_loader, name="recordings-list", daemon=True).start())
+        self.root.after(0, lambda: threading.Thread(target=self._preview_loader, name="recording-preview", daemon=True).start())
 
         self._build_ui()
-        self.refresh_recordings()
+        self.refresh_recordings(deep=True)
+
+        try:
+            self._ensure_worker()
+            self.status_var.set("Recorder wird vorbereitet …")
+        except Exception as e:
+            self.status_var.set(f"Recorder konnte nicht gestartet werden: {e}")
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
-        self.root.after(150, self._poll_worker)
+        self.root.after(_RETENTION_BACKLOG_MS, self._schedule_retention)
 
     def _build_ui(self):
         self.root.columnconfigure(0, weight=1)
@@ -69,13 +172,19 @@ class RecorderGUI:
         self.btn_open_folder = ttk.Button(btns, text="Ordner öffnen", command=self.open_selected_folder)
         self.btn_rename = ttk.Button(btns, text="Umbenennen", command=self.rename_selected)
         self.btn_delete = ttk.Button(btns, text="Löschen", command=self.delete_selected)
+        self.btn_move = ttk.Button(btns, text="Verschieben …", command=self.move_selected)
+        self.btn_export = ttk.Button(btns, text="Exportieren", command=self.export_selected)
+        self.btn_cancel_jobs = ttk.Button(btns, text="Abbrechen", command=self.cancel_jobs, state="disabled")
 
         self.btn_start.grid(row=0, column=0, padx=(0, 6))
         self.btn_stop.grid(row=0, column=1, padx=(0, 12))
         self.btn_open.grid(row=0, column=2, padx=(0, 6))
         self.btn_open_folder.grid(row=0, column=3, padx=(0, 12))
         self.btn_rename.grid(row=0, column=4, padx=(0, 6))
-        self.btn_delete.grid(row=0, column=5)
+        self.btn_delete.grid(row=0, column=5, padx=(0, 6))
+        self.btn_move.grid(row=0, column=6, padx=(0, 6))
+        self.btn_export.grid(row=0, column=7, padx=(0, 12))
+        self.btn_cancel_jobs.grid(row=0, column=8)
 
         cfg = ttk.LabelFrame(outer, text="Aufnahme-Einstellungen", padding=10)
         cfg.grid(row=1, column=0, sticky="ew", pady=(0, 10))
@@ -103,6 +212,33 @@ class RecorderGUI:
             row=0, column=5, sticky="w", padx=(6, 14)
         )
 
+        self.var_export_mode = tk.StringVar(value=_EXPORT_MODE_LABELS[self.cfg.export_mode])
+        ttk.Label(cfg, text="HTML-Export").grid(row=1, column=0, sticky="w", pady=(8, 0))
+        ttk.Combobox(
+            cfg,
+            textvariable=self.var_export_mode,
+            values=list(_EXPORT_MODE_LABELS.values()),
+            state="readonly",
+            width=28,
+        ).grid(row=1, column=1, columnspan=3, sticky="w", pady=(8, 0))
+
+        self.var_export_docx = tk.BooleanVar(value=self.cfg.export_docx)
+        ttk.Checkbutton(cfg, text="Zusätzlich DOCX erzeugen", variable=self.var_export_docx).grid(
+            row=1, column=4, columnspan=2, sticky="w", pady=(8, 0)
+        )
+        self.var_export_pdf = tk.BooleanVar(value=self.cfg.export_pdf)
+        ttk.Checkbutton(cfg, text="Zusätzlich PDF erzeugen", variable=self.var_export_pdf).grid(
+            row=1, column=6, sticky="w", pady=(8, 0)
+        )
+        self.var_dedupe_images = tk.BooleanVar(value=self.cfg.dedupe_images)
+        ttk.Checkbutton(cfg, text="Gleiche Screenshots nur einmal speichern", variable=self.var_dedupe_images).grid(
+            row=2, column=0, columnspan=4, sticky="w", pady=(8, 0)
+        )
+        self.var_key_screenshots = tk.BooleanVar(value=self.cfg.key_screenshots)
+        ttk.Checkbutton(cfg, text="Screenshots bei Enter/Tab", variable=self.var_key_screenshots).grid(
+            row=2, column=4, columnspan=2, sticky="w", pady=(8, 0)
+        )
+
         self.btn_apply_cfg = ttk.Button(cfg, text="Übernehmen", command=self.apply_config)
         self.btn_apply_cfg.grid(row=0, column=6, sticky="e")
 
@@ -111,10 +247,19 @@ class RecorderGUI:
         main.columnconfigure(0, weight=1)
         main.rowconfigure(1, weight=1)
 
-        ttk.Label(main, text="Recordings (Historie)").grid(row=0, column=0, sticky="w", pady=(0, 6))
+        head = ttk.Frame(main)
+        head.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 6))
+        head.columnconfigure(0, weight=1)
+        ttk.Label(head, text="Recordings (Historie)").grid(row=0, column=0, sticky="w")
+        ttk.Label(head, text="Suche").grid(row=0, column=1, sticky="e", padx=(0, 6))
+        self.var_search = tk.StringVar()
+        search_entry = ttk.Entry(head, textvariable=self.var_search, width=40)
+        search_entry.grid(row=0, column=2, sticky="e")
+        search_entry.bind("<Escape>", lambda e: self.var_search.set(""))
+        self.var_search.trace_add("write", lambda *_: self._schedule_search())
 
         cols = ("name", "created", "has_steps", "has_html")
-        self.tree = ttk.Treeview(main, columns=cols, show="headings", selectmode="browse")
+        self.tree = ttk.Treeview(main, columns=cols, show="headings", selectmode="extended")
         self.tree.heading("name", text="Name")
         self.tree.heading("created", text="Geändert")
         self.tree.heading("has_steps", text="Steps")
@@ -126,13 +271,32 @@ class RecorderGUI:
         self.tree.column("has_html", width=60, anchor="center")
 
         ysb = ttk.Scrollbar(main, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=ysb.set)
+
+        def on_yscroll(first: str, last: str):
+            ysb.set(first, last)
+            if float(last) > 0.9:
+                self._load_more_recordings()
+
+        self.tree.configure(yscrollcommand=on_yscroll)
 
         self.tree.grid(row=1, column=0, sticky="nsew")
         ysb.grid(row=1, column=1, sticky="ns")
 
         self.tree.bind("<Double-1>", lambda e: self.open_selected())
-
+        self.tree.bind("<<TreeviewSelect>>", lambda e: self._request_preview(self._selected_path()))
+
+        pane = ttk.Frame(main)
+        pane.grid(row=0, column=2, rowspan=2, sticky="ns", padx=(10, 0))
+        pane.rowconfigure(1, weight=1)
+        ttk.Label(pane, text="Vorschau").grid(row=0, column=0, sticky="w", pady=(0, 6))
+        self.preview = tk.Canvas(pane, width=PREVIEW_SIZE[0] + 16, highlightthickness=0, background="white")
+        psb = ttk.Scrollbar(pane, orient="vertical", command=self.preview.yview)
+        self.preview.configure(yscrollcommand=psb.set)
+        self.preview.grid(row=1, column=0, sticky="ns")
+        psb.grid(row=1, column=1, sticky="ns")
+        self.preview.bind("<MouseWheel>", lambda e: self.preview.yview_scroll(-1 if e.delta > 0 else 1, "units"))
+        self.preview.bind("<Button-4>", lambda e: self.preview.yview_scroll(-1, "units"))
+        self.preview.bind("<Button-5>", lambda e: self.preview.yview_scroll(1, "units"))
 
     def apply_config(self):
         try:
@@ -144,15 +308,30 @@ class RecorderGUI:
             if delay < 0:
                 delay = 0
 
+            export_mode = next(
+                (k for k, v in _EXPORT_MODE_LABELS.items() if v == self.var_export_mode.get()),
+                "single",
+            )
+
             self.cfg = AppConfig(
                 enable_video=bool(self.var_enable_video.get()),
                 video_fps=fps,
                 screenshot_delay_ms=delay,
                 record_text_input=bool(self.var_record_text.get()),
+                export_mode=export_mode,
+                export_docx=bool(self.var_export_docx.get()),
+                export_pdf=bool(self.var_export_pdf.get()),
+                dedupe_images=bool(self.var_dedupe_images.get()),
+                key_screenshots=bool(self.var_key_screenshots.get()),
             )
 
-            if self._proc and self._proc.is_alive():
-                self._restart_worker()
+            if self._proc and self._proc.is_alive() and self._parent_conn:
+                try:
+                    self._parent_conn.send({"type": "reconfigure", "config": self._worker_config()})
+                except Exception:
+                    self._restart_worker()
+            else:
+                self._ensure_worker()
 
             self.status_var.set("Einstellungen übernommen.")
         except Exception as e:
@@ -192,23 +371,199 @@ class RecorderGUI:
 
         self._ensure_worker()
 
-    def refresh_recordings(self):
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-
-        items = list_recordings()
-        for it in items:
-            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(it.created_ts))
+    def _schedule_search(self):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(200, self.refresh_recordings)
+
+    def _request_search(self, query: str, deep: bool):
+        self._list_generation += 1
+        self._list_loading = False
+        self._tree_mode = "search"
+        self.tree.delete(*self.tree.get_children())
+        self.status_var.set(f"Suche nach „{query}“ …")
+        self._list_requests.put((self._list_generation, 0, 0, deep, query))
+
+    def _show_search_hits(self, gen: int, query: str, hits: List[Any]):
+        if gen != self._list_generation or self._tree_mode != "search":
+            return
+        for hit in hits:
             self.tree.insert(
                 "",
                 "end",
-                values=(it.name, created, "✓" if it.has_steps else "", "✓" if it.has_html else ""),
-                tags=(it.path,),
+                values=(f"{hit.name} – Schritt {hit.step}: {hit.snippet}", "", "✓", ""),
+                tags=(hit.path,),
             )
+        self.status_var.set(f"{len(hits)} Treffer für „{query}“" if hits else f"Keine Treffer für „{query}“")
+
+    def refresh_recordings(self, deep: bool = False):
+        self._search_after = None
+        query = self.var_search.get().strip()
+        if query:
+            self._request_search(query, deep)
+            return
 
-        if items:
-            first = self.tree.get_children()[0]
-            self.tree.selection_set(first)
+        if self._tree_mode != "list":
+            self.tree.delete(*self.tree.get_children())
+            self._tree_mode = "list"
+            self._list_wanted = _LIST_PAGE_SIZE
+        # Reload everything paged in so far; rows are updated in place, not rebuilt.
+        self._request_listing(0, max(self._list_wanted, _LIST_PAGE_SIZE), deep)
+
+    def _load_more_recordings(self):
+        if self._tree_mode != "list" or self._list_loading or self._list_loaded >= self._list_total:
+            return
+        self._list_wanted = self._list_loaded + _LIST_PAGE_SIZE
+        self._request_listing(self._list_loaded, _LIST_PAGE_SIZE, False)
+
+    def _request_listing(self, offset: int, limit: int, deep: bool):
+        self._list_generation += 1
+        self._list_loading = True
+        # A reload from the top ends by deleting the rows it did not see; a further page adds rows only.
+        self._list_reload = offset == 0
+        if self._list_reload:
+            self._list_seen = set()
+        self._list_requests.put((self._list_generation, offset, limit, deep, None))
+
+    def _list_loader(self):
+        while True:
+            gen, offset, limit, deep, query = self._list_requests.get()
+            pos, end = offset, offset + limit
+            try:
+                if query:
+                    if gen == self._list_generation:
+                        self._dispatch.post(self._show_search_hits, gen, query, search_recordings(query, limit=200, deep=deep))
+                    continue
+                while pos < end and gen == self._list_generation:
+                    n = min(_LIST_BATCH_SIZE, end - pos)
+                    items, total = list_recordings_page(pos, n, deep=deep and pos == offset)
+                    last = len(items) < n or pos + len(items) >= end
+                    self._dispatch.post(self._apply_listing_batch, gen, pos, items, total, last)
+                    pos += len(items)
+                    if last:
+                        break
+            except Exception as e:
+                self._dispatch.post(self._listing_failed, gen, str(e))
+
+    def _listing_failed(self, gen: int, message: str):
+        if gen == self._list_generation:
+            self._list_loading = False
+            self.status_var.set(f"Recordings konnten nicht geladen werden: {message}")
+
+    def _apply_listing_batch(self, gen: int, offset: int, items: List[Any], total: int, last: bool):
+        if gen != self._list_generation or self._tree_mode != "list":
+            return
+        self._list_total = total
+        for i, it in enumerate(items):
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(it.created_ts))
+            values = (it.name, created, "✓" if it.has_steps else "", "✓" if it.has_html else "")
+            iid = it.path
+            self._list_seen.add(iid)
+            if not self.tree.exists(iid):
+                self.tree.insert("", offset + i, iid=iid, values=values, tags=(it.path,))
+                continue
+            if tuple(str(v) for v in self.tree.item(iid, "values")) != values:
+                self.tree.item(iid, values=values)
+            if self.tree.index(iid) != offset + i:
+                self.tree.move(iid, "", offset + i)
+
+        if not last:
+            return
+        self._list_loading = False
+        end = offset + len(items)
+        self._list_loaded = end
+        if self._list_reload:
+            stale = [iid for iid in self.tree.get_children() if iid not in self._list_seen]
+            if stale:
+                self.tree.delete(*stale)
+
+        if self._pending_select and self.tree.exists(self._pending_select):
+            self.tree.selection_set(self._pending_select)
+            self.tree.see(self._pending_select)
+            self._pending_select = None
+        elif self._list_reload:
+            self._pending_select = None
+            children = self.tree.get_children()
+            if children and not self.tree.selection():
+                self.tree.selection_set(children[0])
+
+    def _request_preview(self, path: Optional[str]):
+        if path == self._preview_path:
+            return
+        self._preview_path = path
+        self._preview_generation += 1
+        self._preview_shown = []
+        self._preview_y = 8
+        self.preview.delete("all")
+        self.preview.yview_moveto(0)
+        if path:
+            self._preview_requests.put((self._preview_generation, path))
+
+    def _preview_loader(self):
+        while True:
+            gen, path = self._preview_requests.get()
+            if gen != self._preview_generation:
+                continue
+            batch: List[StepThumbnail] = []
+            try:
+                for item in step_thumbnails(path):
+                    if gen != self._preview_generation:
+                        break
+                    batch.append(item)
+                    if len(batch) >= _PREVIEW_BATCH:
+                        self._dispatch.post(self._add_preview_items, gen, batch)
+                        batch = []
+                self._dispatch.post(self._add_preview_items, gen, batch, True)
+            except Exception as e:
+                # Still recording (no steps.json yet), deleted meanwhile, or unreadable.
+                self._dispatch.post(self._preview_message, gen, f"Keine Vorschau: {e}")
+
+    def _preview_photo(self, item: StepThumbnail) -> Optional[tk.PhotoImage]:
+        photo = self._photos.get(item.key)
+        if photo is not None:
+            self._photos.move_to_end(item.key)
+            return photo
+        try:
+            photo = tk.PhotoImage(file=item.path) if item.path else tk.PhotoImage(data=item.data)
+        except tk.TclError:
+            return None
+        self._photos[item.key] = photo
+        # Images on screen stay alive through _preview_shown even when evicted here.
+        while len(self._photos) > _PREVIEW_CACHE_SIZE:
+            self._photos.popitem(last=False)
+        return photo
+
+    def _add_preview_items(self, gen: int, items: List[StepThumbnail], last: bool = False):
+        if gen != self._preview_generation:
+            return
+        c = self.preview
+        for item in items:
+            photo = self._preview_photo(item)
+            if photo is None:
+                continue
+            self._preview_shown.append(photo)
+            c.create_image(8, self._preview_y, image=photo, anchor="nw")
+            self._preview_y += photo.height() + 4
+            label = c.create_text(8, self._preview_y, text=f"{item.number}. {item.text}", anchor="nw", width=PREVIEW_SIZE[0])
+            self._preview_y = c.bbox(label)[3] + 12
+        c.configure(scrollregion=(0, 0, PREVIEW_SIZE[0] + 16, self._preview_y))
+        if last and not self._preview_shown:
+            self._preview_message(gen, "Keine Screenshots in diesem Recording.")
+
+    def _preview_message(self, gen: int, text: str):
+        if gen == self._preview_generation:
+            self.preview.create_text(8, self._preview_y, text=text, anchor="nw", width=PREVIEW_SIZE[0])
+
+    def _is_recording(self) -> bool:
+        return str(self.btn_stop.cget("state")) == "normal"
+
+    def _selected_paths(self) -> List[str]:
+        paths: List[str] = []
+        for iid in self.tree.selection():
+            tags = self.tree.item(iid, "tags")
+            if tags and tags[0] not in paths:
+                paths.append(tags[0])
+        return paths
 
     def _selected_path(self) -> Optional[str]:
         sel = self.tree.selection()
@@ -236,18 +591,32 @@ class RecorderGUI:
                 pass
 
         self._parent_conn, self._child_conn = mp.Pipe()
+        conn = self._parent_conn
+        # Started from the Tk loop: posting to Tk from another thread fails until mainloop runs.
+        # Messages sent before that wait in the pipe.
+        self.root.after(0, lambda: read_connection(conn, self._dispatch, lambda msg: self._on_worker_msg(conn, msg), name="recorder-worker-reader"))
+
+        cfg_dict = self._worker_config()
+        cfg_dict["spawned_at"] = time.time()
+
+        self._proc = mp.Process(target=recorder_worker, args=(self._child_conn, cfg_dict), daemon=True)
+        self._proc.start()
 
-        cfg_dict: Dict[str, Any] = {
-            "screenshot_on_keys": (),
+    def _worker_config(self) -> Dict[str, Any]:
+        return {
+            # Off by default: clicks and text input already show each screen. When on, the capture planner
+            # shares or skips the key screenshots that would repeat the previous one.
+            "screenshot_on_keys": ("enter", "tab") if self.cfg.key_screenshots else (),
             "enable_video": self.cfg.enable_video,
             "video_fps": self.cfg.video_fps,
             "screenshot_delay_ms": self.cfg.screenshot_delay_ms,
             "record_text_input": self.cfg.record_text_input,
+            "export_mode": self.cfg.export_mode,
+            "export_docx": self.cfg.export_docx,
+            "export_pdf": self.cfg.export_pdf,
+            "dedupe_images": self.cfg.dedupe_images,
         }
 
-        self._proc = mp.Process(target=recorder_worker, args=(self._child_conn, cfg_dict), daemon=True)
-        self._proc.start()
-
     def start_recording(self):
         try:
             self._ensure_worker()
@@ -255,6 +624,7 @@ class RecorderGUI:
             out_dir = create_recording_dir()
             self._recording_out_dir = out_dir
 
+            self._start_clicked_at = time.perf_counter()
             self._parent_conn.send({"type": "start", "out_dir": out_dir})
             self.status_var.set("Starte Recording …")
             self.btn_start.configure(state="disabled")
@@ -280,19 +650,22 @@ class RecorderGUI:
         if not path:
             return
 
-        html = os.path.join(path, "anleitung.html")
-        steps = os.path.join(path, "steps.json")
+        with Recording(path) as rec:
+            if rec.packed:
+                self._open_archived_html(rec)
+                return
 
-        if os.path.exists(html):
-            self._last_html_path = html
-            webbrowser.open("file://" + os.path.abspath(html))
-            self.status_var.set("Öffne HTML …")
-            return
+            if rec.has(HTML_NAME):
+                html = os.path.join(path, HTML_NAME)
+                self._last_html_path = html
+                webbrowser.open("file://" + os.path.abspath(html))
+                self.status_var.set("Öffne HTML …")
+                return
 
-        if os.path.exists(steps):
-            self._open_folder(path)
-            self.status_var.set("HTML fehlt – Ordner geöffnet.")
-            return
+            if rec.has(STEPS_NAME):
+                self._open_folder(path)
+                self.status_var.set("HTML fehlt – Ordner geöffnet.")
+                return
 
         messagebox.showwarning(
             "Hinweis",
@@ -300,10 +673,35 @@ class RecorderGUI:
             parent=self.root,
         )
 
+    def _open_archived_html(self, rec: Recording):
+        from exporters.html_exporter import export_html
+
+        if not rec.has(HTML_NAME):
+            messagebox.showwarning("Hinweis", "Dieses Archiv enthält noch kein HTML. Bitte zuerst exportieren.", parent=self.root)
+            return
+        name = os.path.basename(rec.path)[: -len(ARCHIVE_EXT)]
+        html = os.path.join(tempfile.gettempdir(), f"psr-{name}.html")
+        if is_external_html(bytes(rec.archive.view(HTML_NAME)[:HTML_HEAD_BYTES])):
+            # Its images, variants and ../_static/ files are not next to a copy: render a single file instead.
+            path = rec.path
+            self._jobs.submit("open", lambda job: export_html(path, mode="single", dest=html))
+            return
+        # The single-file HTML needs nothing else from the archive; a copy in the temp folder is enough.
+        with open(html, "wb") as f:
+            rec.archive.copy_to(HTML_NAME, f)
+        self._open_html_copy(html)
+
+    def _open_html_copy(self, html: str):
+        self._last_html_path = html
+        webbrowser.open("file://" + html)
+        self.status_var.set("Öffne HTML aus dem Archiv …")
+
     def open_selected_folder(self):
         path = self._selected_path()
         if not path:
             path = recordings_root_dir()
+        elif is_archive(path):
+            path = os.path.dirname(path)
         self._open_folder(path)
         self.status_var.set("Ordner geöffnet.")
 
@@ -313,35 +711,127 @@ class RecorderGUI:
             return
 
         current_name = os.path.basename(path.rstrip("/\\"))
+        if is_archive(path):
+            current_name = current_name[: -len(ARCHIVE_EXT)]
         new_name = simpledialog.askstring("Umbenennen", "Neuer Name:", initialvalue=current_name, parent=self.root)
         if not new_name:
             return
 
-        try:
-            new_path = rename_recording(path, new_name)
-            self.status_var.set("Umbenannt.")
-            self.refresh_recordings()
-            self._select_by_path(new_path)
-        except Exception as e:
-            messagebox.showerror("Fehler", str(e), parent=self.root)
+        self._jobs.rename(path, new_name)
 
     def delete_selected(self):
-        path = self._selected_path()
-        if not path:
+        paths = self._selected_paths()
+        if not paths:
             return
 
-        name = os.path.basename(path.rstrip("/\\"))
-        if not messagebox.askyesno("Löschen", f"Recording wirklich löschen?\n\n{name}", parent=self.root):
+        if len(paths) == 1:
+            name = os.path.basename(paths[0].rstrip("/\\"))
+            question = f"Recording wirklich löschen?\n\n{name}"
+        else:
+            question = f"{len(paths)} Recordings wirklich löschen?"
+        if not messagebox.askyesno("Löschen", question, parent=self.root):
             return
 
-        try:
-            delete_recording(path)
+        if self._tree_mode == "list":
+            self.tree.delete(*[p for p in paths if self.tree.exists(p)])
+        self._jobs.delete(paths)
+
+    def move_selected(self):
+        paths = self._selected_paths()
+        if not paths:
+            return
+        dest = filedialog.askdirectory(title="Recordings verschieben nach …", parent=self.root)
+        if not dest:
+            return
+        for p in paths:
+            self._jobs.move(p, dest)
+
+    def export_selected(self):
+        paths = self._selected_paths()
+        if not paths:
+            return
+        options: Dict[str, Any] = {"mode": self.cfg.export_mode}
+        formats = ("html",) + (("docx",) if self.cfg.export_docx else ()) + (("pdf",) if self.cfg.export_pdf else ())
+        if formats != ("html",):
+            options["formats"] = formats
+        self._jobs.export(paths, options)
+
+    def cancel_jobs(self):
+        self._jobs.cancel()
+        self.status_var.set("Wird abgebrochen …")
+
+    def _schedule_retention(self):
+        policy = RetentionPolicy.load(recordings_root_dir())
+        if not policy.enabled:
+            self.root.after(_RETENTION_INTERVAL_MS, self._schedule_retention)
+            return
+        # Compaction competes with the recorder for disk and CPU; wait until it is idle.
+        if self._is_recording() or self._pending_exports or self._jobs.active():
+            self.root.after(_RETENTION_BACKLOG_MS, self._schedule_retention)
+            return
+        self._jobs.submit("retention", lambda job: RetentionEngine(policy).run(max_items=_RETENTION_BATCH, check=job.check))
+
+    def _on_job_event(self, ev: JobEvent):
+        self.btn_cancel_jobs.configure(state="normal" if self._jobs.active() else "disabled")
+        label = _JOB_LABELS.get(ev.kind, ev.kind)
+        if ev.kind == "retention":
+            self._on_retention_event(ev)
+            return
+        if ev.state in ("running", "progress"):
+            count = f" ({ev.done + 1}/{ev.total})" if ev.total > 1 else ""
+            self.status_var.set(f"{label} läuft{count} … {ev.message}".rstrip())
+            return
+        if ev.state == "cancelled":
+            self.status_var.set(f"{label} abgebrochen.")
+            self.refresh_recordings()
+            return
+        if ev.state == "failed":
+            self.status_var.set(f"{label} fehlgeschlagen.")
+            messagebox.showerror("Fehler", ev.error or label, parent=self.root)
+            self.refresh_recordings()
+            return
+        if ev.state != "done":
+            return
+
+        if ev.kind == "export":
+            failed = [r for r in ev.result or [] if r.error]
+            self.status_var.set(f"{len(ev.result or []) - len(failed)} exportiert, {len(failed)} fehlgeschlagen." if failed else "Exportiert.")
+        elif ev.kind == "delete":
             self.status_var.set("Gelöscht.")
+        elif ev.kind == "move":
+            self.status_var.set(f"Verschoben nach {ev.result}.")
+        elif ev.kind == "open":
+            self._open_html_copy(ev.result)
+            return
+        else:
+            self.status_var.set("Umbenannt.")
+            self._select_by_path(ev.result)
+        self.refresh_recordings()
+
+    def _on_retention_event(self, ev: JobEvent):
+        # Background housekeeping: only report when something was freed.
+        if ev.state not in ("done", "failed", "cancelled"):
+            return
+        report = ev.result
+        if ev.state == "done" and report is not None and report.actions:
+            freed = report.reclaimed_bytes / (1024 * 1024)
+            self.status_var.set(f"Alte Aufnahmen verkleinert, {freed:.0f} MB frei geworden.")
             self.refresh_recordings()
-        except Exception as e:
-            messagebox.showerror("Fehler", str(e), parent=self.root)
+        if ev.state == "done" and report is not None and report.quota_exhausted:
+            self.status_var.set("Speicherlimit überschritten, nichts mehr zu verkleinern. Aufnahmen werden nicht gelöscht – bitte selbst löschen oder verschieben.")
+        pending = ev.state == "done" and report is not None and report.pending > 0
+        self.root.after(_RETENTION_BACKLOG_MS if pending else _RETENTION_INTERVAL_MS, self._schedule_retention)
 
     def _select_by_path(self, path: str):
+        if self._tree_mode == "list":
+            iid = os.path.abspath(path)
+            if self.tree.exists(iid):
+                self.tree.selection_set(iid)
+                self.tree.see(iid)
+            else:
+                # Not listed yet: selected when the refresh that is under way delivers it.
+                self._pending_select = iid
+            return
         for iid in self.tree.get_children():
             tags = self.tree.item(iid, "tags")
             if tags and os.path.abspath(tags[0]) == os.path.abspath(path):
@@ -360,47 +850,84 @@ class RecorderGUI:
         except Exception:
             pass
 
-    # ---------------- Worker polling ----------------
+    # ---------------- Worker messages ----------------
 
-    def _poll_worker(self):
-        try:
-            if self._parent_conn and self._parent_conn.poll():
-                msg = self._parent_conn.recv()
-                self._handle_worker_msg(msg)
-        except Exception:
-            pass
-        finally:
-            self.root.after(120, self._poll_worker)
+    def _on_worker_msg(self, conn: Any, msg: Dict[str, Any]):
+        # Messages of a worker that has since been restarted may still be queued.
+        if conn is self._parent_conn:
+            self._handle_worker_msg(msg)
 
     def _handle_worker_msg(self, msg: Dict[str, Any]):
         t = msg.get("type")
 
         if t == "ready":
-            self.status_var.set("Bereit.")
+            if msg.get("warmup_error"):
+                self.status_var.set("Bereit (Vorbereitung unvollständig: " + str(msg.get("warmup_error")) + ").")
+            else:
+                self.status_var.set("Bereit.")
             return
 
         if t == "started":
+            if self._start_clicked_at is not None:
+                self.last_start_latency_ms = (time.perf_counter() - self._start_clicked_at) * 1000.0
+                self._start_clicked_at = None
             self.status_var.set("Recording läuft … (Stop zum Beenden)")
             return
 
+        if t == "reconfigured":
+            if msg.get("applies") == "next_start":
+                self.status_var.set("Einstellungen übernommen (gilt ab der nächsten Aufnahme).")
+            else:
+                self.status_var.set("Einstellungen übernommen.")
+            return
+
         if t == "stopped":
             out_dir = msg.get("out_dir")
-            out_path = msg.get("out_path")
-            export_error = msg.get("export_error")
 
             self.btn_start.configure(state="normal")
             self.btn_stop.configure(state="disabled")
+            if out_dir:
+                self._pending_exports.add(out_dir)
+
+            self.status_var.set("Recording gestoppt. Export läuft …")
+            self.refresh_recordings()
+            if out_dir:
+                self._select_by_path(out_dir)
+            return
+
+        if t == "export_progress":
+            if self._is_recording():
+                return
+            stage = _EXPORT_STAGE_LABELS.get(str(msg.get("stage") or ""), str(msg.get("stage") or ""))
+            index = int(msg.get("index") or 0)
+            total = int(msg.get("total") or 0)
+            self.status_var.set(f"Export läuft … {stage} ({index + 1}/{total})")
+            return
+
+        if t == "exported":
+            out_dir = msg.get("out_dir")
+            out_path = msg.get("out_path")
+            export_error = msg.get("export_error")
+            timings = msg.get("timings_ms") or {}
 
+            if out_dir:
+                self._pending_exports.discard(out_dir)
+
+            recording = self._is_recording()
             if export_error:
-                self.status_var.set(f"Recording gestoppt, Export-Fehler: {export_error}")
+                self.status_var.set(f"Export-Fehler: {export_error}")
             else:
-                self.status_var.set("Recording gestoppt. HTML erstellt.")
+                if not recording:
+                    total_s = sum(timings.values()) / 1000.0
+                    formats = " + ".join(k.upper() for k in (msg.get("outputs") or {"html": out_path}))
+                    self.status_var.set(f"Recording gestoppt. {formats} erstellt ({total_s:.1f} s).")
                 if out_path and os.path.exists(out_path):
                     self._last_html_path = out_path
-                    webbrowser.open("file://" + os.path.abspath(out_path))
+                    if not recording:
+                        webbrowser.open("file://" + os.path.abspath(out_path))
 
             self.refresh_recordings()
-            if out_dir:
+            if out_dir and not recording:
                 self._select_by_path(out_dir)
             return
 
@@ -415,21 +942,43 @@ class RecorderGUI:
             self.btn_stop.configure(state="disabled")
             return
 
-
     def on_close(self):
+        if self._closing:
+            return
+        self._closing = True
+        self._jobs.shutdown()
         try:
             if self._parent_conn:
-                try:
-                    self._parent_conn.send({"type": "quit"})
-                except Exception:
-                    pass
-        finally:
-            try:
-                if self._proc and self._proc.is_alive():
-                    self._proc.terminate()
-            except Exception:
-                pass
-            self.root.destroy()
+                self._parent_conn.send({"type": "quit"})
+        except Exception:
+            pass
+        try:
+            waiting = bool(self._proc and self._proc.is_alive() and self._pending_exports)
+        except Exception:
+            waiting = False
+        if waiting:
+            self.status_var.set("Warte auf laufenden Export …")
+            self._close_after_worker(time.monotonic() + _CLOSE_WAIT_S)
+        else:
+            self._finish_close()
+
+    def _close_after_worker(self, deadline: float):
+        try:
+            alive = bool(self._proc and self._proc.is_alive())
+        except Exception:
+            alive = False
+        if alive and time.monotonic() < deadline:
+            self.root.after(_CLOSE_POLL_MS, lambda: self._close_after_worker(deadline))
+            return
+        self._finish_close()
+
+    def _finish_close(self):
+        try:
+            if self._proc and self._proc.is_alive():
+                self._proc.terminate()
+        except Exception:
+            pass
+        self.root.destroy()
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+import traceback
+from collections import deque
+from typing import Any, Callable, Deque, Tuple
+
+import tkinter as tk
+
+
+# Runs callables posted from any thread on the Tk thread; a burst of posts costs one `after` wake-up.
+class TkDispatcher:
+    def __init__(self, root: tk.Misc):
+        self._root = root
+        self._items: Deque[Tuple[Callable[..., Any], Tuple[Any, ...]]] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self.wakeups = 0
+
+    def post(self, fn: Callable[..., Any], *args: Any) -> bool:
+        with self._lock:
+            self._items.append((fn, args))
+        return self.wake()
+
+    # Schedules delivery of what is queued; False while Tk cannot take the `after` call.
+    def wake(self) -> bool:
+        with self._lock:
+            if self._scheduled or not self._items:
+                return True
+            self._scheduled = True
+        try:
+            self._root.after(0, self._drain)
+            return True
+        except (RuntimeError, tk.TclError):
+            # Tk is gone, or not in mainloop yet; the next post or wake tries again.
+            with self._lock:
+                self._scheduled = False
+            return False
+
+    def _drain(self) -> None:
+        with self._lock:
+            items = list(self._items)
+            self._items.clear()
+            self._scheduled = False
+        self.wakeups += 1
+        for fn, args in items:
+            try:
+                fn(*args)
+            except Exception:
+                traceback.print_exc()
+
+
+_WAKE_RETRY_S = 0.1
+
+
+# Hands everything received on `conn` to `on_message` on the Tk thread; ends at EOF or close.
+def read_connection(
+    conn: Any,
+    dispatcher: TkDispatcher,
+    on_message: Callable[[Any], Any],
+    name: str = "connection-reader",
+) -> threading.Thread:
+    def run() -> None:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError, ValueError):
+                return
+            if dispatcher.post(on_message, msg):
+                continue
+            # Tk cannot take it yet; the message stays queued. Retry the wake-up until Tk does or more
+            # arrives, so the last message is not stranded.
+            try:
+                while not conn.poll(_WAKE_RETRY_S) and not dispatcher.wake():
+                    pass
+            except (EOFError, OSError, ValueError):
+                return
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -1,16 +1,48 @@
 # gui/recorder_process.py
 from __future__ import annotations
 
-import json
+import io
 import os
+import threading
+import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import asdict
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from exporters.html_exporter import export_html
-from psr.narrator import enrich_steps_json
+from psr.catalog import notify_changed
+from psr.postprocess import build_postprocess_pipeline, write_steps_json
 from psr.recordings_store import ensure_recordings_root, resolve_recording_dir
-from psr.recorder import PSRLikeRecorder
+
+_RECONFIGURABLE_KEYS = (
+    "screenshot_on_keys",
+    "enable_video",
+    "video_fps",
+    "screenshot_delay_ms",
+    "record_text_input",
+    "export_mode",
+    "export_docx",
+    "export_pdf",
+    "dedupe_images",
+)
+# How long "quit" waits for the export that is already running; the GUI gives up on the worker a bit later.
+_QUIT_EXPORT_WAIT_S = 45.0
+
+
+def _warm_up(config: Dict[str, Any]) -> None:
+    from PIL import Image
+
+    from psr.monitor import list_monitors
+    from psr.recorder import PSRLikeRecorder  # noqa: F401
+
+    list_monitors()
+    Image.new("RGB", (8, 8)).save(io.BytesIO(), format="PNG")
+    if config.get("enable_video"):
+        _warm_up_video()
+
+
+def _warm_up_video() -> None:
+    from psr.video import MultiMonitorVideoWriter  # noqa: F401
 
 
 def recorder_worker(conn, config: Dict[str, Any]):
@@ -18,9 +50,25 @@ def recorder_worker(conn, config: Dict[str, Any]):
     out_dir: Optional[str] = None
     exclude_rect: Optional[Tuple[int, int, int, int]] = None
 
+    send_lock = threading.Lock()
+    exports = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psr-export")
+    # Written by the export thread as well as the command loop.
+    pending_lock = threading.Lock()
+    pending_exports: Set[str] = set()
+    export_jobs: List[Tuple[Future, str]] = []
+
+    def exporting() -> List[str]:
+        with pending_lock:
+            return sorted(pending_exports)
+
+    def export_done(job_dir: str) -> None:
+        with pending_lock:
+            pending_exports.discard(job_dir)
+
     def send(msg: Dict[str, Any]):
         try:
-            conn.send(msg)
+            with send_lock:
+                conn.send(msg)
         except Exception:
             pass
 
@@ -52,43 +100,67 @@ def recorder_worker(conn, config: Dict[str, Any]):
                 ms.append({"left": int(d["left"]), "top": int(d["top"]), "right": int(d["right"]), "bottom": int(d["bottom"])})
         return ms
 
-    def apply_narration(_out_dir: str):
-        p = os.path.join(_out_dir, "steps.json")
-        if not os.path.exists(p):
-            return
-        with open(p, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        if not data.get("monitors"):
-            data["monitors"] = _monitors_to_jsonable()
-
-        data = enrich_steps_json(data)
-
-        events = data.get("events") or []
-        prev_kind: Optional[str] = None
-
-        for e in events:
-            if not isinstance(e, dict):
-                prev_kind = None
-                continue
-
-            kind = (e.get("kind") or "").lower()
-
-            if kind == "key_press":
-                detail = str(e.get("detail") or "").lower()
-                if "enter" in detail and prev_kind == "text_input":
-                    e["screenshot"] = None
+    def run_export(job_dir: str, data: Dict[str, Any], export_options: Dict[str, Any], docx: bool = False, pdf: bool = False, dedupe: bool = False):
+        def on_stage(stage: str, index: int, total: int):
+            send({"type": "export_progress", "out_dir": job_dir, "stage": stage, "index": index, "total": total})
 
-            prev_kind = kind
-
-        data["events"] = events
-
-        with open(p, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        try:
+            from exporters.html_exporter import export_html
+
+            export_docx = None
+            if docx:
+                from exporters.docx_exporter import export_docx
+            export_pdf = None
+            if pdf:
+                from exporters.pdf_exporter import export_pdf
+
+            pipe = build_postprocess_pipeline(
+                job_dir,
+                export_html=export_html,
+                export_options=export_options,
+                export_docx=export_docx,
+                export_pdf=export_pdf,
+                dedupe_images=dedupe,
+            )
+            result = pipe.run(data, on_stage=on_stage)
+            notify_changed(job_dir)
+
+            if "narrate" in result.errors:
+                send({"type": "error", "message": f"Narration failed: {result.errors['narrate']}"})
+            for fmt in ("docx", "pdf"):
+                if f"export_{fmt}" in result.errors:
+                    send({"type": "error", "message": f"{fmt.upper()} export failed: {result.errors[f'export_{fmt}']}"})
+
+            send(
+                {
+                    "type": "exported",
+                    "out_dir": job_dir,
+                    "out_path": result.outputs.get("export_html"),
+                    "format": "html",
+                    "outputs": {k[len("export_"):]: v for k, v in result.outputs.items() if k.startswith("export_") and v},
+                    "export_error": result.errors.get("save_steps") or result.errors.get("export_html"),
+                    "timings_ms": result.timings_ms,
+                }
+            )
+        except Exception as e:
+            send({"type": "exported", "out_dir": job_dir, "out_path": None, "format": "html", "export_error": str(e)})
+        finally:
+            export_done(job_dir)
 
     try:
+        t0 = time.perf_counter()
         ensure_recordings_root()
-        send({"type": "ready"})
+        warm_error = None
+        try:
+            _warm_up(config)
+        except Exception as e:
+            warm_error = str(e)
+        ready: Dict[str, Any] = {"type": "ready", "warmup_ms": (time.perf_counter() - t0) * 1000.0}
+        if config.get("spawned_at"):
+            ready["spawn_to_ready_ms"] = (time.time() - float(config["spawned_at"])) * 1000.0
+        if warm_error:
+            ready["warmup_error"] = warm_error
+        send(ready)
 
         while True:
             cmd = conn.recv()
@@ -100,7 +172,16 @@ def recorder_worker(conn, config: Dict[str, Any]):
                         rec.stop()
                 except Exception:
                     pass
-                send({"type": "quit_ack"})
+                exports.shutdown(wait=False, cancel_futures=True)
+                for fut, job_dir in export_jobs:
+                    if fut.cancelled():
+                        # Never started; its steps.json was written at stop, so it can be exported later.
+                        export_done(job_dir)
+                running = [fut for fut, _ in export_jobs if not fut.done()]
+                if running:
+                    send({"type": "quit_progress", "exporting": exporting(), "timeout_s": _QUIT_EXPORT_WAIT_S})
+                    wait(running, timeout=_QUIT_EXPORT_WAIT_S)
+                send({"type": "quit_ack", "unfinished": exporting()})
                 break
 
             if ctype == "set_exclude_rect":
@@ -109,11 +190,30 @@ def recorder_worker(conn, config: Dict[str, Any]):
                     exclude_rect = (int(rect[0]), int(rect[1]), int(rect[2]), int(rect[3]))
                 continue
 
+            if ctype == "reconfigure":
+                new_cfg = cmd.get("config") or {}
+                for k in _RECONFIGURABLE_KEYS:
+                    if k in new_cfg:
+                        config[k] = new_cfg[k]
+                if config.get("enable_video"):
+                    threading.Thread(target=_warm_up_video, daemon=True).start()
+                send(
+                    {
+                        "type": "reconfigured",
+                        "config": {k: config.get(k) for k in _RECONFIGURABLE_KEYS},
+                        "applies": "next_start" if (rec and rec.running) else "now",
+                    }
+                )
+                continue
+
             if ctype == "start":
+                t_start = time.perf_counter()
                 if rec and rec.running:
                     send({"type": "error", "message": "Recorder already running."})
                     continue
 
+                from psr.recorder import PSRLikeRecorder
+
                 raw_out_dir = cmd.get("out_dir")
                 out_dir = resolve_recording_dir(raw_out_dir)
                 os.makedirs(out_dir, exist_ok=True)
@@ -147,6 +247,7 @@ def recorder_worker(conn, config: Dict[str, Any]):
                             "video": rec.enable_video,
                             "delay_ms": rec.screenshot_delay_ms,
                             "record_text_input": rec.record_text_input,
+                            "start_ms": (time.perf_counter() - t_start) * 1000.0,
                         }
                     )
                 except Exception as e:
@@ -160,38 +261,41 @@ def recorder_worker(conn, config: Dict[str, Any]):
                     continue
 
                 try:
-                    rec.stop()
+                    rec.stop(save=False)
+                    data = rec.steps_payload()
                 except Exception as e:
                     send({"type": "error", "message": f"Stop failed: {e}"})
                     continue
 
-                try:
-                    if out_dir:
-                        apply_narration(out_dir)
-                except Exception as e:
-                    send({"type": "error", "message": f"Narration failed: {e}"})
+                if not data.get("monitors"):
+                    data["monitors"] = _monitors_to_jsonable()
 
-                out_path = None
-                export_error = None
+                job_dir = out_dir
+                # On disk before "stopped": if the worker dies before the export job runs, the recording
+                # can still be narrated and exported later. The pipeline rewrites it after narration.
                 try:
-                    if out_dir:
-                        out_path = export_html(out_dir)
+                    write_steps_json(job_dir, data)
+                    notify_changed(job_dir)
                 except Exception as e:
-                    export_error = str(e)
-
-                send(
-                    {
-                        "type": "stopped",
-                        "out_dir": out_dir,
-                        "out_path": out_path,
-                        "format": "html",
-                        "export_error": export_error,
-                    }
+                    send({"type": "error", "message": f"Saving steps.json failed: {e}"})
+                with pending_lock:
+                    pending_exports.add(job_dir)
+                send({"type": "stopped", "out_dir": job_dir, "export_pending": True})
+                export_jobs[:] = [job for job in export_jobs if not job[0].done()]
+                fut = exports.submit(
+                    run_export,
+                    job_dir,
+                    data,
+                    {"mode": str(config.get("export_mode") or "single")},
+                    bool(config.get("export_docx")),
+                    bool(config.get("export_pdf")),
+                    bool(config.get("dedupe_images")),
                 )
+                export_jobs.append((fut, job_dir))
                 continue
 
             if ctype == "ping":
-                send({"type": "pong", "running": bool(rec and rec.running), "out_dir": out_dir})
+                send({"type": "pong", "running": bool(rec and rec.running), "out_dir": out_dir, "exporting": exporting()})
                 continue
 
             send({"type": "error", "message": f"Unknown command: {ctype}"})
@@ -201,6 +305,7 @@ def recorder_worker(conn, config: Dict[str, Any]):
     except Exception:
         send({"type": "fatal", "trace": traceback.format_exc()})
     finally:
+        exports.shutdown(wait=False)
         try:
             conn.close()
         except Exception:
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import io
+import json
+import mmap
+import os
+import posixpath
+import shutil
+import struct
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from psr.layout import EXPORT_CACHE_DIR_NAME, HTML_HEAD_BYTES, HTML_NAME, META_NAME, STEPS_NAME, VARIANTS_DIR_NAME, is_external_html
+
+# A recording packed into one file: an uncompressed zip (screenshots and video are compressed
+# already), so any member is a contiguous byte range that can be sliced out of an mmap, and the
+# central directory at the end of the file is the index. Any zip tool can open it.
+ARCHIVE_EXT = ".psra"
+
+_COPY_CHUNK = 4 * 1024 * 1024
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_HEADER_SIG = b"PK\x03\x04"
+# Read first when a recording is opened, so they go to the front.
+_FIRST = (META_NAME, STEPS_NAME)
+
+Progress = Callable[[int, int], None]
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+# A file inside an archive; picklable, so it can be handed to worker processes like a path.
+class ArchiveMember(NamedTuple):
+    archive: str
+    name: str
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_EXT) and os.path.isfile(path)
+
+
+def member_name(rel: str) -> Optional[str]:
+    # Paths in steps.json are relative to the recording folder, with the OS separator.
+    if not rel or not isinstance(rel, str) or os.path.isabs(rel) or rel.startswith(("data:", "http://", "https://")):
+        return None
+    name = posixpath.normpath(rel.replace("\\", "/"))
+    if name.startswith("../") or name in ("..", "."):
+        return None
+    return name
+
+
+# Reads a packed recording in place: members are memoryviews into a read-only mmap of the file.
+class RecordingArchive:
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._file: Optional[BinaryIO] = None
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[str, Tuple[int, int, zipfile.ZipInfo]] = {}
+        self._open()
+
+    def _open(self) -> None:
+        f = open(self.path, "rb")
+        try:
+            infos = zipfile.ZipFile(f).infolist()
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except zipfile.BadZipFile as e:
+            f.close()
+            raise ArchiveError(f"{self.path}: {e}") from e
+        except BaseException:
+            f.close()
+            raise
+        index: Dict[str, Tuple[int, int, zipfile.ZipInfo]] = {}
+        for info in infos:
+            if info.is_dir():
+                continue
+            if info.compress_type != zipfile.ZIP_STORED:
+                m.close()
+                f.close()
+                raise ArchiveError(f"{self.path}: {info.filename} is compressed; archives must be stored")
+            header = _LOCAL_HEADER.unpack_from(m, info.header_offset)
+            if header[0] != _LOCAL_HEADER_SIG:
+                m.close()
+                f.close()
+                raise ArchiveError(f"{self.path}: bad local header for {info.filename}")
+            start = info.header_offset + _LOCAL_HEADER.size + header[-2] + header[-1]
+            index[info.filename] = (start, info.file_size, info)
+        self._file, self._map, self._index = f, m, index
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "RecordingArchive":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def names(self) -> List[str]:
+        return list(self._index)
+
+    def size(self, name: str) -> int:
+        return self._index[name][1]
+
+    def info(self, name: str) -> zipfile.ZipInfo:
+        return self._index[name][2]
+
+    def mtime_ns(self) -> int:
+        return os.stat(self.path).st_mtime_ns
+
+    def view(self, name: str) -> memoryview:
+        start, size, _ = self._index[name]
+        return memoryview(self._map)[start : start + size]
+
+    def read(self, name: str) -> bytes:
+        with self.view(name) as view:
+            return bytes(view)
+
+    def open(self, name: str) -> BinaryIO:
+        return io.BytesIO(self.read(name))
+
+    def read_json(self, name: str) -> Any:
+        return json.loads(self.read(name).decode("utf-8"))
+
+    def read_meta(self) -> Dict[str, Any]:
+        try:
+            meta = self.read_json(META_NAME)
+        except (KeyError, ValueError):
+            return {}
+        return meta if isinstance(meta, dict) else {}
+
+    def chunks(self, name: str, size: int = _COPY_CHUNK) -> Iterator[memoryview]:
+        # Callers must not keep a chunk beyond the loop: an exported view keeps the mmap open.
+        with self.view(name) as view:
+            for i in range(0, len(view), size):
+                with view[i : i + size] as chunk:
+                    yield chunk
+
+    def copy_to(
+        self,
+        name: str,
+        out: BinaryIO,
+        on_bytes: Optional[Callable[[int], None]] = None,
+        check: Optional[Callable[[], None]] = None,
+    ) -> None:
+        for chunk in self.chunks(name):
+            if check is not None:
+                check()
+            out.write(chunk)
+            if on_bytes is not None:
+                on_bytes(len(chunk))
+
+    # Members are bytes or the path of a file to copy in; the archive is rewritten and replaced.
+    def update(self, members: Dict[str, Union[bytes, str]]) -> None:
+        # This instance's and the shared mapping are closed before the replace. On Windows it still fails
+        # with PermissionError while any other RecordingArchive (or Recording) maps the file.
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+                for name, (_, size, info) in self._index.items():
+                    if name in members:
+                        continue
+                    with zf.open(_stored_info(info, size), "w") as dst:
+                        self.copy_to(name, dst)
+                for name, src in members.items():
+                    if isinstance(src, (bytes, bytearray)):
+                        zf.writestr(_stored_info(zipfile.ZipInfo(name, time.localtime()[:6]), len(src)), src)
+                    else:
+                        _write_file(zf, src, name)
+            release_archive(self.path)
+            self.close()
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if self._map is None:
+                self._open()
+
+
+_SHARED_KEPT = 4
+_shared: "OrderedDict[str, Tuple[Tuple[int, int], RecordingArchive]]" = OrderedDict()
+_shared_lock = threading.Lock()
+
+
+# One open instance per archive and process, so reading member after member does not re-parse the
+# central directory and map the file again each time. Reopened when the file is replaced.
+def shared_archive(path: str) -> RecordingArchive:
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _shared_lock:
+        hit = _shared.get(path)
+        if hit is not None and hit[0] == stamp:
+            _shared.move_to_end(path)
+            return hit[1]
+        ar = RecordingArchive(path)
+        if hit is not None:
+            hit[1].close()
+        _shared[path] = (stamp, ar)
+        while len(_shared) > _SHARED_KEPT:
+            _shared.popitem(last=False)[1][1].close()
+        return ar
+
+
+# Before the file is moved, deleted or replaced: Windows refuses while it is still mapped.
+def release_archive(path: str) -> None:
+    with _shared_lock:
+        hit = _shared.pop(os.path.abspath(path), None)
+    if hit is not None:
+        hit[1].close()
+
+
+def _stored_info(info: zipfile.ZipInfo, size: int) -> zipfile.ZipInfo:
+    out = zipfile.ZipInfo(info.filename, info.date_time)
+    out.compress_type = zipfile.ZIP_STORED
+    out.external_attr = info.external_attr
+    # Known up front, so zipfile picks zip64 headers for members over 2 GB.
+    out.file_size = size
+    return out
+
+
+def _write_file(
+    zf: zipfile.ZipFile,
+    path: str,
+    name: str,
+    on_bytes: Optional[Callable[[int], None]] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> None:
+    info = zipfile.ZipInfo.from_file(path, name, strict_timestamps=False)
+    info.compress_type = zipfile.ZIP_STORED
+    with open(path, "rb") as src, zf.open(info, "w") as dst:
+        while True:
+            if check is not None:
+                check()
+            chunk = src.read(_COPY_CHUNK)
+            if not chunk:
+                break
+            dst.write(chunk)
+            if on_bytes is not None:
+                on_bytes(len(chunk))
+
+
+def _skip_dirs(rec_dir: str) -> Set[str]:
+    # Caches are rebuilt on the next export; they would only make the archive bigger.
+    skip = {EXPORT_CACHE_DIR_NAME, VARIANTS_DIR_NAME}
+    try:
+        with open(os.path.join(rec_dir, HTML_NAME), "rb") as f:
+            if is_external_html(f.read(HTML_HEAD_BYTES)):
+                # Its srcset points into variants/, so they are part of the page, not a cache.
+                skip.discard(VARIANTS_DIR_NAME)
+    except FileNotFoundError:
+        pass
+    return skip
+
+
+def _pack_order(rec_dir: str) -> List[Tuple[str, str]]:
+    skip = _skip_dirs(rec_dir)
+    files: List[Tuple[str, str]] = []
+    for dirpath, dirnames, filenames in os.walk(rec_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip)
+        for f in sorted(filenames):
+            p = os.path.join(dirpath, f)
+            files.append((p, os.path.relpath(p, rec_dir).replace(os.sep, "/")))
+
+    def rank(item: Tuple[str, str]) -> Tuple[int, str]:
+        name = item[1]
+        if name in _FIRST:
+            return _FIRST.index(name), name
+        # Video last: screenshots stay together and close to steps.json.
+        return (3 if name.endswith(".mp4") else 2), name
+
+    return sorted(files, key=rank)
+
+
+# Default destination: <name>.psra next to the folder. `replace` holds member contents to use instead of the files.
+def pack_recording(
+    rec_dir: str,
+    dest: Optional[str] = None,
+    on_progress: Optional[Progress] = None,
+    check: Optional[Callable[[], None]] = None,
+    replace: Optional[Dict[str, bytes]] = None,
+) -> str:
+    rec_dir = os.path.abspath(rec_dir)
+    if not os.path.isdir(rec_dir):
+        raise FileNotFoundError(rec_dir)
+    if dest is None:
+        dest = rec_dir.rstrip("/\\") + ARCHIVE_EXT
+    if os.path.exists(dest):
+        raise FileExistsError(dest)
+
+    replace = replace or {}
+    files = [(p, name) for p, name in _pack_order(rec_dir) if name not in replace]
+    total = sum(os.path.getsize(p) for p, _ in files)
+    done = 0
+
+    def advance(n: int) -> None:
+        nonlocal done
+        done += n
+        if on_progress is not None:
+            on_progress(done, total)
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for path, name in files:
+                _write_file(zf, path, name, advance, check)
+            for name, data in replace.items():
+                zf.writestr(_stored_info(zipfile.ZipInfo(name, time.localtime()[:6]), len(data)), data)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return dest
+
+
+# Default destination: next to the archive, without the extension.
+def unpack_archive(
+    path: str,
+    dest: Optional[str] = None,
+    on_progress: Optional[Progress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> str:
+    path = os.path.abspath(path)
+    if dest is None:
+        dest = path[: -len(ARCHIVE_EXT)] if path.lower().endswith(ARCHIVE_EXT) else path + ".d"
+    if os.path.exists(dest):
+        raise FileExistsError(dest)
+
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    try:
+        with RecordingArchive(path) as ar:
+            total = sum(ar.size(n) for n in ar.names())
+            done = 0
+
+            def advance(n: int) -> None:
+                nonlocal done
+                done += n
+                if on_progress is not None:
+                    on_progress(done, total)
+
+            for name in ar.names():
+                rel = member_name(name)
+                if rel is None:
+                    continue
+                target = os.path.join(tmp, *rel.split("/"))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as out:
+                    ar.copy_to(name, out, advance, check)
+                # Keep mtimes: export up-to-date checks and retention go by them.
+                ts = time.mktime(ar.info(name).date_time + (0, 0, -1))
+                os.utime(target, (ts, ts))
+        os.rename(tmp, dest)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return dest
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from psr.paths import recordings_root_dir
+
+BLOBS_DIR_NAME = "_blobs"
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp")
+
+
+@dataclass
+class IngestResult:
+    files: int = 0
+    linked: int = 0
+    new_blobs: int = 0
+    bytes_saved: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class DedupReport:
+    blobs: int = 0
+    references: int = 0
+    physical_bytes: int = 0
+    logical_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.logical_bytes / self.physical_bytes if self.physical_bytes else 1.0
+
+
+def blob_store_dir() -> str:
+    return os.path.join(recordings_root_dir(), BLOBS_DIR_NAME)
+
+
+def pixel_hash(path: str) -> str:
+    # Hash of the decoded pixels: re-encoded copies of the same screen share one blob.
+    from PIL import Image
+
+    h = hashlib.sha1()
+    with Image.open(path) as img:
+        h.update(f"{img.mode}:{img.width}x{img.height}:".encode("ascii"))
+        h.update(img.tobytes())
+    return h.hexdigest()
+
+
+# Screenshots shared between recordings, stored once and hardlinked; the link count is the reference count.
+class BlobStore:
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or blob_store_dir()
+
+    def blob_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _iter_blobs(self) -> Iterator[Tuple[str, os.stat_result]]:
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    yield entry.path, entry.stat()
+
+    def ingest_recording(self, rec_dir: str, max_workers: Optional[int] = None) -> Tuple[IngestResult, Dict[str, str]]:
+        img_dir = os.path.join(rec_dir, "images")
+        result = IngestResult()
+        manifest: Dict[str, str] = {}
+        if not os.path.isdir(img_dir):
+            return result, manifest
+
+        files = sorted(
+            e.path for e in os.scandir(img_dir) if e.is_file() and os.path.splitext(e.name)[1].lower() in IMAGE_EXTS
+        )
+        result.files = len(files)
+        if not files:
+            return result, manifest
+
+        with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1)) as pool:
+            hashes = list(pool.map(_safe_pixel_hash, files))
+
+        for path, digest in zip(files, hashes):
+            if digest is None:
+                continue
+            key = digest + os.path.splitext(path)[1].lower()
+            blob = self.blob_path(key)
+            try:
+                if not os.path.exists(blob):
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.link(path, blob)
+                    result.new_blobs += 1
+                elif not os.path.samefile(path, blob):
+                    size = os.path.getsize(path)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    os.link(blob, tmp)
+                    os.replace(tmp, path)
+                    result.linked += 1
+                    result.bytes_saved += size
+            except OSError as e:
+                # No hardlinks here (FAT, some network shares, other volume): keep the plain copy.
+                result.error = str(e)
+                break
+            manifest[os.path.relpath(path, rec_dir).replace(os.sep, "/")] = key
+        return result, manifest
+
+    def _free(self, path: str) -> bool:
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass
+        return True
+
+    def release(self, keys: Iterable[str]) -> int:
+        freed = 0
+        for key in set(keys):
+            blob = self.blob_path(key)
+            try:
+                unused = os.stat(blob).st_nlink <= 1
+            except OSError:
+                continue
+            if unused and self._free(blob):
+                freed += 1
+        return freed
+
+    def collect_garbage(self) -> int:
+        return sum(1 for path, st in list(self._iter_blobs()) if st.st_nlink <= 1 and self._free(path))
+
+    def report(self) -> DedupReport:
+        rep = DedupReport()
+        for _, st in self._iter_blobs():
+            refs = max(0, st.st_nlink - 1)
+            rep.blobs += 1
+            rep.references += refs
+            rep.physical_bytes += st.st_size
+            rep.logical_bytes += st.st_size * refs
+        return rep
+
+
+def _safe_pixel_hash(path: str) -> Optional[str]:
+    try:
+        return pixel_hash(path)
+    except Exception:
+        return None
+
+
+def dedupe_recording(rec_dir: str, store: Optional[BlobStore] = None, max_workers: Optional[int] = None) -> IngestResult:
+    from psr.recordings_store import update_meta
+
+    result, manifest = (store or BlobStore()).ingest_recording(rec_dir, max_workers=max_workers)
+    if manifest:
+        update_meta(rec_dir, {"blobs": manifest})
+    return result
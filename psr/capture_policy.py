@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import os
+import posixpath
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional, Set
+
+from psr.recording import local_screenshot_path
+
+CAPTURE_NEW = "new"
+CAPTURE_SHARE = "share"
+CAPTURE_SKIP = "skip"
+
+
+@dataclass
+class CapturePlan:
+    action: str
+    screenshot: Optional[str] = None
+
+    @property
+    def needs_capture(self) -> bool:
+        return self.action == CAPTURE_NEW
+
+
+@dataclass
+class _Seen:
+    t: float
+    kind: str
+    key: Optional[str]
+    monitor_index: Optional[int]
+    screenshot: Optional[str]
+    # When `screenshot` was grabbed; shared screenshots keep the time of the original capture.
+    captured_at: float
+    # Drawn with a click marker, which would point at the wrong spot in any other step.
+    marked: bool
+
+
+class CapturePlanner:
+    # Called from the mouse and the keyboard listener threads; the lock keeps each decision and each
+    # update working on one consistent `_last`.
+
+    def __init__(self, share_window_ms: int = 250):
+        self.share_window_ms = max(0, int(share_window_ms))
+        self._last: Optional[_Seen] = None
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._last = None
+
+    def plan(self, kind: str, t: float, key: Optional[str] = None, monitor_index: Optional[int] = None) -> CapturePlan:
+        with self._lock:
+            return self._plan((kind or "").lower(), t, key, monitor_index)
+
+    def _plan(self, kind: str, t: float, key: Optional[str], monitor_index: Optional[int]) -> CapturePlan:
+        last = self._last
+
+        if kind != "key_press":
+            return CapturePlan(CAPTURE_NEW)
+
+        if last and last.kind == "text_input":
+            # Enter after text input shows the same state as the text step; the
+            # step itself is shown without an image.
+            if key == "enter":
+                return CapturePlan(CAPTURE_SKIP)
+            if last.screenshot and not last.marked and last.monitor_index == monitor_index:
+                return CapturePlan(CAPTURE_SHARE, last.screenshot)
+
+        # Measured from the capture, so a run of quick key presses cannot keep one image alive.
+        if (
+            last
+            and last.screenshot
+            and not last.marked
+            and last.monitor_index == monitor_index
+            and (t - last.captured_at) * 1000.0 <= self.share_window_ms
+        ):
+            return CapturePlan(CAPTURE_SHARE, last.screenshot)
+
+        return CapturePlan(CAPTURE_NEW)
+
+    def observe(
+        self,
+        kind: str,
+        t: float,
+        screenshot: Optional[str],
+        key: Optional[str] = None,
+        monitor_index: Optional[int] = None,
+        marked: bool = False,
+    ):
+        with self._lock:
+            last = self._last
+            shared = bool(screenshot) and last is not None and last.screenshot == screenshot
+            self._last = _Seen(
+                t=t,
+                kind=(kind or "").lower(),
+                key=key,
+                monitor_index=monitor_index,
+                screenshot=screenshot,
+                captured_at=last.captured_at if shared else t,
+                marked=last.marked if shared else marked,
+            )
+
+
+def _screenshot_refs(events: Iterable[Any]) -> Iterator[str]:
+    for e in events:
+        shot = e.get("screenshot") if isinstance(e, dict) else getattr(e, "screenshot", None)
+        if not shot or not isinstance(shot, str):
+            continue
+        if shot.startswith("data:") or shot.startswith("http://") or shot.startswith("https://"):
+            continue
+        yield shot
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def referenced_images(events: Iterable[Any], rec_dir: str) -> Set[str]:
+    # Resolved the way the exporters resolve them, as normalized absolute paths.
+    out: Set[str] = set()
+    for shot in _screenshot_refs(events):
+        p = local_screenshot_path(shot, rec_dir)
+        if p:
+            out.add(_norm(p))
+    return out
+
+
+def remove_orphaned_images(out_dir: str, events: Iterable[Any]) -> int:
+    img_dir = os.path.join(out_dir, "images")
+    if not os.path.isdir(img_dir):
+        return 0
+
+    keep: Set[str] = set()
+    # A reference that does not resolve here may still mean one of these files: keep anything with its name.
+    unresolved: Set[str] = set()
+    for shot in _screenshot_refs(events):
+        p = local_screenshot_path(shot, out_dir)
+        if p:
+            keep.add(_norm(p))
+        else:
+            unresolved.add(os.path.normcase(posixpath.basename(shot.replace("\\", "/"))))
+
+    removed = 0
+    for entry in os.listdir(img_dir):
+        p = os.path.join(img_dir, entry)
+        if not os.path.isfile(p):
+            continue
+        if _norm(p) in keep or os.path.normcase(entry) in unresolved:
+            continue
+        try:
+            os.remove(p)
+            removed += 1
+        except OSError:
+            pass
+    return removed
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from psr import search
+from psr.archive import ARCHIVE_EXT
+from psr.paths import recordings_root_dir
+from psr.layout import HTML_NAME, STEPS_NAME
+from psr.recording import Recording
+
+# In its own folder: SQLite's journal files would otherwise bump the root mtime on every write.
+CATALOG_DIR_NAME = "_catalog"
+CATALOG_NAME = "catalog.sqlite"
+SORT_COLUMNS = {"created": "mtime_ns", "name": "name COLLATE NOCASE"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS recordings (
+    entry TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    has_steps INTEGER NOT NULL,
+    has_html INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recordings_mtime ON recordings (mtime_ns);
+CREATE INDEX IF NOT EXISTS recordings_name ON recordings (name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER);
+"""
+
+Row = Tuple[str, str, int, int, int]
+
+
+def _is_recording_entry(name: str) -> bool:
+    return not name.startswith(("_", "."))
+
+
+def _is_archive_entry(e: os.DirEntry) -> bool:
+    return e.name.lower().endswith(ARCHIVE_EXT) and e.is_file()
+
+
+def read_recording_row(root: str, entry: str, mtime_ns: Optional[int] = None) -> Row:
+    p = os.path.join(root, entry)
+    if mtime_ns is None:
+        mtime_ns = os.stat(p).st_mtime_ns
+    with Recording(p) as rec:
+        return entry, rec.name, mtime_ns, int(rec.has(STEPS_NAME)), int(rec.has(HTML_NAME))
+
+
+# SQLite index of the recordings root (and the step search index); `refresh` picks up changes made elsewhere.
+class RecordingCatalog:
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or recordings_root_dir())
+        self.db_path = os.path.join(self.root, CATALOG_DIR_NAME, CATALOG_NAME)
+        self._local = threading.local()
+        self.search_available = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10.0)
+            conn.executescript(_SCHEMA)
+            self.search_available = search.ensure_schema(conn)
+            self._local.conn = conn
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        return self._conn()
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _entry(self, path: str) -> Optional[str]:
+        p = os.path.abspath(path)
+        if os.path.dirname(p.rstrip("/\\")) != self.root:
+            return None
+        entry = os.path.basename(p.rstrip("/\\"))
+        return entry if _is_recording_entry(entry) else None
+
+    def upsert(self, path: str) -> None:
+        entry = self._entry(path)
+        if entry is None:
+            return
+        if not os.path.exists(path):
+            self.remove(path)
+            return
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?, ?)", read_recording_row(self.root, entry))
+            if self.search_available:
+                search.index_entry(conn, self.root, entry)
+
+    def remove(self, path: str) -> None:
+        from psr.thumbnails import drop_thumbnails
+
+        entry = self._entry(path)
+        if entry is None:
+            return
+        drop_thumbnails(os.path.join(self.root, entry))
+        with self._conn() as conn:
+            conn.execute("DELETE FROM recordings WHERE entry = ?", (entry,))
+            if self.search_available:
+                search.drop_entry(conn, entry)
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        self.remove(old_path)
+        self.upsert(new_path)
+
+    def refresh(self, deep: bool = False) -> int:
+        from psr.thumbnails import drop_thumbnails
+
+        conn = self._conn()
+        if self.search_available and not deep and self._search_index_missing():
+            deep = True
+        root_mtime = os.stat(self.root).st_mtime_ns
+        stored = conn.execute("SELECT value FROM state WHERE key = 'root_mtime_ns'").fetchone()
+        rows: List[Row] = []
+        gone: List[Tuple[str]] = []
+        # Changes inside a folder (stop, export, rename of the title) arrive through notify_changed; a plain
+        # refresh only looks at the root, and lists it only when entries were added or removed.
+        if deep or stored is None or stored[0] != root_mtime:
+            known: Dict[str, int] = dict(conn.execute("SELECT entry, mtime_ns FROM recordings"))
+            seen = set()
+            with os.scandir(self.root) as it:
+                for e in it:
+                    if not _is_recording_entry(e.name) or not (e.is_dir() or _is_archive_entry(e)):
+                        continue
+                    seen.add(e.name)
+                    if e.name in known and not deep:
+                        continue
+                    try:
+                        mtime_ns = e.stat().st_mtime_ns
+                        if known.get(e.name) != mtime_ns:
+                            rows.append(read_recording_row(self.root, e.name, mtime_ns))
+                    except (OSError, ValueError):
+                        continue
+            gone = [(entry,) for entry in known if entry not in seen]
+            for (entry,) in gone:
+                drop_thumbnails(os.path.join(self.root, entry))
+        rows.extend(self._steps_appeared({r[0] for r in rows} | {entry for (entry,) in gone}))
+        reindex = {r[0] for r in rows}
+        if self.search_available and deep:
+            reindex.update(self._stale_search_entries(seen))
+
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?, ?)", rows)
+            conn.executemany("DELETE FROM recordings WHERE entry = ?", gone)
+            if self.search_available:
+                for (entry,) in gone:
+                    search.drop_entry(conn, entry)
+                for entry in sorted(reindex):
+                    search.index_entry(conn, self.root, entry)
+            conn.execute("INSERT OR REPLACE INTO state VALUES ('root_mtime_ns', ?)", (root_mtime,))
+        return len(rows) + len(gone)
+
+    def _steps_appeared(self, skip) -> List[Row]:
+        # A recording is registered when its folder is created, before steps.json exists. One stat per such
+        # row until the file appears: it can be written within the folder's mtime tick, and by a process
+        # that does not update the catalog.
+        rows = []
+        for (entry,) in self._conn().execute("SELECT entry FROM recordings WHERE NOT has_steps"):
+            if entry not in skip and os.path.isfile(os.path.join(self.root, entry, STEPS_NAME)):
+                try:
+                    rows.append(read_recording_row(self.root, entry))
+                except (OSError, ValueError):
+                    continue
+        return rows
+
+    def _search_index_missing(self) -> bool:
+        # Every recording with steps has a source row; none at all means the index was (re)created.
+        return bool(
+            self._conn()
+            .execute("SELECT EXISTS(SELECT 1 FROM recordings WHERE has_steps) AND NOT EXISTS(SELECT 1 FROM step_text_sources)")
+            .fetchone()[0]
+        )
+
+    def _stale_search_entries(self, entries) -> List[str]:
+        # steps.json is rewritten in place, which leaves the folder mtime alone.
+        indexed: Dict[str, int] = dict(self._conn().execute("SELECT entry, steps_mtime_ns FROM step_text_sources"))
+        stale = []
+        for entry in entries:
+            mtime_ns = search.steps_mtime_ns(os.path.join(self.root, entry))
+            if mtime_ns != indexed.get(entry):
+                stale.append(entry)
+        return stale
+
+    def search(self, query: str, limit: int = 50) -> List[search.SearchHit]:
+        conn = self._conn()
+        if not self.search_available:
+            return []
+        return search.search(conn, self.root, query, limit)
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+
+    def query(self, order: str = "created", descending: bool = True, offset: int = 0, limit: Optional[int] = None):
+        from psr.recordings_store import RecordingItem
+
+        column = SORT_COLUMNS.get(order)
+        if column is None:
+            raise ValueError(f"Unknown sort order: {order}")
+        sql = (
+            f"SELECT entry, name, mtime_ns, has_steps, has_html FROM recordings "
+            f"ORDER BY {column} {'DESC' if descending else 'ASC'}, entry LIMIT ? OFFSET ?"
+        )
+        rows = self._conn().execute(sql, (-1 if limit is None else limit, offset))
+        return [
+            RecordingItem(
+                name=name,
+                path=os.path.join(self.root, entry),
+                created_ts=mtime_ns / 1e9,
+                has_steps=bool(has_steps),
+                has_html=bool(has_html),
+            )
+            for entry, name, mtime_ns, has_steps, has_html in rows
+        ]
+
+
+_catalogs: Dict[Tuple[int, str], RecordingCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(root: Optional[str] = None) -> RecordingCatalog:
+    root = os.path.abspath(root or recordings_root_dir())
+    key = (os.getpid(), root)
+    with _catalogs_lock:
+        cat = _catalogs.get(key)
+        if cat is None:
+            cat = _catalogs[key] = RecordingCatalog(root)
+        return cat
+
+
+def notify_changed(path: str) -> None:
+    # The catalog is only a cache: a failed update is repaired by the next deep refresh.
+    try:
+        get_catalog().upsert(path)
+    except (OSError, ValueError, sqlite3.Error):
+        pass
+
+
+def notify_removed(path: str) -> None:
+    try:
+        get_catalog().remove(path)
+    except (OSError, sqlite3.Error):
+        pass
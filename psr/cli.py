@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from psr.archive import ARCHIVE_EXT, is_archive
+from psr.layout import STEPS_NAME
+from psr.recording import Recording
+from psr.recordings_store import (
+    archive_recording,
+    ensure_recordings_root,
+    extract_recording,
+    list_recordings,
+    list_recordings_page,
+    search_recordings,
+)
+from psr.tasks import EXPORT_FORMATS, TASKS, TaskResult, run_tasks
+
+
+def _has_steps(path: str) -> bool:
+    try:
+        with Recording(path) as rec:
+            return rec.has(STEPS_NAME)
+    except (OSError, ValueError):
+        return False
+
+
+def _resolve_targets(names: Sequence[str]) -> List[str]:
+    if not names:
+        # The catalog's has_steps can lag behind a steps.json written without notify_changed; ask the files.
+        return [it.path for it in list_recordings_page(deep=True)[0] if _has_steps(it.path)]
+
+    root = ensure_recordings_root()
+    out: List[str] = []
+    for n in names:
+        if os.path.isdir(n) or is_archive(n):
+            out.append(os.path.abspath(n))
+            continue
+        p = os.path.join(root, n)
+        if os.path.isdir(p) or is_archive(p):
+            out.append(p)
+            continue
+        if is_archive(p + ARCHIVE_EXT):
+            out.append(p + ARCHIVE_EXT)
+            continue
+        raise SystemExit(f"Recording nicht gefunden: {n}")
+    return out
+
+
+def run_batch(
+    paths: Sequence[str],
+    tasks: Sequence[str],
+    check: str,
+    force: bool,
+    jobs: Optional[int],
+    export_options: Optional[Dict[str, Any]] = None,
+    quiet: bool = False,
+) -> List[TaskResult]:
+    results: List[TaskResult] = []
+    t0 = time.perf_counter()
+
+    workers = jobs or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1 and export_options:
+        # Recordings are already processed in parallel; keep image work in-process.
+        export_options = {**export_options, "variant_workers": 1}
+    if workers <= 1 or len(paths) <= 1:
+        for p in paths:
+            r = run_tasks(p, tasks, check, force, export_options)
+            results.append(r)
+            if not quiet:
+                _print_result(r)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_tasks, p, tuple(tasks), check, force, export_options) for p in paths]
+            for fut in as_completed(futures):
+                r = fut.result()
+                results.append(r)
+                if not quiet:
+                    _print_result(r)
+
+    if not quiet:
+        _print_summary(results, time.perf_counter() - t0)
+    return results
+
+
+def _print_result(r: TaskResult):
+    name = os.path.basename(r.path.rstrip("/\\"))
+    status = ", ".join(f"{k} {v}" for k, v in r.status.items())
+    pages = f", {r.pages} PDF pages" if r.pages else ""
+    line = f"{name}: {status} ({r.steps} steps{pages}, {r.seconds:.2f} s)"
+    if r.error:
+        line += f" – {r.error}"
+    print(line, flush=True)
+
+
+def _print_summary(results: Sequence[TaskResult], elapsed: float):
+    done = sum(1 for r in results if "done" in r.status.values() and not r.error)
+    skipped = sum(1 for r in results if r.status and all(v == "skipped" for v in r.status.values()))
+    failed = sum(1 for r in results if r.error)
+    steps = sum(r.steps for r in results if "done" in r.status.values())
+    pages = sum(r.pages for r in results)
+    mb = sum(r.bytes_written for r in results) / (1024 * 1024)
+    elapsed = max(elapsed, 1e-9)
+    rates = f"{len(results) / elapsed:.1f} recordings/s, {steps / elapsed:.0f} steps/s"
+    if pages:
+        rates += f", {pages / elapsed:.0f} PDF pages/s"
+    print(
+        f"{len(results)} recordings: {done} processed, {skipped} up to date, {failed} failed in {elapsed:.2f} s "
+        f"({rates}, {mb / elapsed:.1f} MB/s written)"
+    )
+
+
+def run_dedupe(paths: Sequence[str], gc: bool = False, quiet: bool = False) -> int:
+    from psr.blob_store import BlobStore, dedupe_recording
+
+    store = BlobStore()
+    failed = 0
+    for p in paths:
+        r = dedupe_recording(p, store)
+        if r.error:
+            failed += 1
+        if not quiet:
+            name = os.path.basename(p.rstrip("/\\"))
+            line = f"{name}: {r.files} images, {r.new_blobs} new, {r.linked} linked, {r.bytes_saved / (1024 * 1024):.1f} MB saved"
+            print(line + (f" – {r.error}" if r.error else ""), flush=True)
+    if gc:
+        freed = store.collect_garbage()
+        if not quiet:
+            print(f"{freed} unused blobs removed")
+    rep = store.report()
+    print(
+        f"{rep.blobs} blobs, {rep.references} references: {rep.logical_bytes / (1024 * 1024):.1f} MB in recordings, "
+        f"{rep.physical_bytes / (1024 * 1024):.1f} MB on disk (dedup ratio {rep.ratio:.2f}x)"
+    )
+    return 1 if failed else 0
+
+
+def run_pack(names: Sequence[str], unpack: bool = False, keep: bool = False, quiet: bool = False) -> int:
+    if names:
+        paths = _resolve_targets(names)
+    else:
+        paths = [it.path for it in list_recordings()]
+    # Packing skips what is packed already, unpacking what is a folder.
+    paths = [p for p in paths if is_archive(p) == unpack]
+    failed = 0
+    t0 = time.perf_counter()
+    for p in paths:
+        t = time.perf_counter()
+        try:
+            out = extract_recording(p, keep=keep) if unpack else archive_recording(p, keep=keep)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"{os.path.basename(p)}: {e}", flush=True)
+            continue
+        if not quiet:
+            print(f"{os.path.basename(p)} -> {os.path.basename(out)} ({time.perf_counter() - t:.2f} s)", flush=True)
+    if not quiet:
+        print(f"{len(paths) - failed} {'unpacked' if unpack else 'packed'}, {failed} failed in {time.perf_counter() - t0:.2f} s")
+    return 1 if failed else 0
+
+
+def run_retention(args: argparse.Namespace) -> int:
+    from psr.retention import RetentionEngine, RetentionPolicy
+
+    root = ensure_recordings_root()
+    policy = RetentionPolicy.load(root)
+    for key in ("video_after_days", "video_action", "lossy_after_days", "quota_gb"):
+        value = getattr(args, key)
+        if value is not None:
+            setattr(policy, key, value)
+    if args.save:
+        print(f"Policy saved to {policy.save(root)}")
+    if not policy.enabled:
+        print("No retention policy configured (see --video-days, --lossy-days, --quota-gb).")
+        return 0
+
+    engine = RetentionEngine(policy)
+    mb = 1024 * 1024
+    while True:
+        report = engine.run(max_items=args.batch, dry_run=args.dry_run)
+        for a in report.actions:
+            line = f"{a.entry}: {a.action} ({a.reason})"
+            line += f" – {a.error}" if a.error else ("" if args.dry_run else f", {(a.bytes_before - a.bytes_after) / mb:.1f} MB freed")
+            print(line, flush=True)
+        if args.dry_run or not report.actions:
+            break
+    quota = f" of {report.quota_bytes / mb:.0f} MB quota" if report.quota_bytes else ""
+    print(f"Recordings use {report.total_bytes / mb:.1f} MB{quota}; disk {report.disk_percent:.0f}% full.")
+    if report.quota_exhausted and not args.dry_run:
+        print("Over quota with nothing left to compact. Retention does not delete recordings; delete or move some to get below it.")
+    return 0 if report.quota_met else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m psr", description="Batch narration and export of PSR recordings")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def common(p: argparse.ArgumentParser):
+        p.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+        p.add_argument("--check", choices=("mtime", "hash"), default="mtime", help="how to detect up-to-date outputs")
+        p.add_argument("-f", "--force", action="store_true", help="process even if outputs are up to date")
+        p.add_argument("-q", "--quiet", action="store_true")
+
+    def export_opts(p: argparse.ArgumentParser):
+        p.add_argument(
+            "--mode",
+            choices=("single", "external"),
+            default="single",
+            help="single: one self-contained HTML file; external: images and editor assets referenced as files",
+        )
+        p.add_argument("--no-variants", action="store_true", help="external mode: do not generate resized srcset variants")
+        p.add_argument(
+            "--max-size-mb",
+            type=float,
+            default=None,
+            help="single mode: re-encode screenshots so anleitung.html stays below this size",
+        )
+        p.add_argument(
+            "--format",
+            dest="formats",
+            action="append",
+            choices=EXPORT_FORMATS,
+            help="output format, may be repeated (default: html)",
+        )
+
+    p = sub.add_parser("narrate", help="regenerate step instructions in steps.json")
+    p.add_argument("recordings", nargs="*", help="recording folders or names (default: all)")
+    common(p)
+
+    p = sub.add_parser("export", help="regenerate anleitung.html (and other formats)")
+    p.add_argument("recordings", nargs="*", help="recording folders or names (default: all)")
+    common(p)
+    export_opts(p)
+
+    p = sub.add_parser("reexport-all", help="narrate and export every recording")
+    common(p)
+    export_opts(p)
+
+    p = sub.add_parser("retention", help="compact old recordings, earlier while over a disk quota")
+    p.add_argument("--video-days", dest="video_after_days", type=float, help="compact videos older than N days")
+    p.add_argument("--video-action", choices=("drop", "reencode"), help="drop videos or re-encode them small (needs OpenCV)")
+    p.add_argument("--lossy-days", dest="lossy_after_days", type=float, help="convert screenshots to WebP after N days")
+    p.add_argument("--quota-gb", type=float, help="compact oldest recordings early while the total exceeds this")
+    p.add_argument("--save", action="store_true", help="store the policy in recordings/_retention.json (used by the GUI)")
+    p.add_argument("--dry-run", action="store_true", help="only list what would be done")
+    p.add_argument("--batch", type=int, default=20, help=argparse.SUPPRESS)
+
+    p = sub.add_parser("pack", help=f"pack recording folders into single {ARCHIVE_EXT} files")
+    p.add_argument("recordings", nargs="*", help="recording folders or names (default: all folders)")
+    p.add_argument("--keep", action="store_true", help="keep the folders")
+    p.add_argument("-q", "--quiet", action="store_true")
+
+    p = sub.add_parser("unpack", help=f"extract {ARCHIVE_EXT} files back into recording folders")
+    p.add_argument("recordings", nargs="*", help="archives or names (default: all archives)")
+    p.add_argument("--keep", action="store_true", help="keep the archives")
+    p.add_argument("-q", "--quiet", action="store_true")
+
+    p = sub.add_parser("search", help="full-text search over the steps of all recordings")
+    p.add_argument("query", nargs="+")
+    p.add_argument("-n", "--limit", type=int, default=20)
+
+    p = sub.add_parser("dedupe", help="store identical screenshots once (hardlinks into recordings/_blobs)")
+    p.add_argument("recordings", nargs="*", help="recording folders or names (default: all)")
+    p.add_argument("--report", action="store_true", help="only print the deduplication report")
+    p.add_argument("--gc", action="store_true", help="remove blobs no recording links to anymore")
+    p.add_argument("-q", "--quiet", action="store_true")
+
+    return ap
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "retention":
+        return run_retention(args)
+    if args.command in ("pack", "unpack"):
+        return run_pack(args.recordings, unpack=args.command == "unpack", keep=args.keep, quiet=args.quiet)
+    if args.command == "search":
+        hits = search_recordings(" ".join(args.query), limit=args.limit, deep=True)
+        for hit in hits:
+            print(f"{hit.name} – Schritt {hit.step}: {hit.snippet}")
+        return 0 if hits else 1
+    if args.command == "dedupe":
+        return run_dedupe([] if args.report else _resolve_targets(args.recordings), gc=args.gc, quiet=args.quiet)
+    if args.command == "narrate":
+        tasks: Tuple[str, ...] = ("narrate",)
+        paths = _resolve_targets(args.recordings)
+    elif args.command == "export":
+        tasks = ("export",)
+        paths = _resolve_targets(args.recordings)
+    else:
+        tasks = TASKS
+        paths = _resolve_targets(())
+
+    export_options: Dict[str, Any] = {}
+    if "export" in tasks:
+        export_options = {"mode": args.mode, "responsive": not args.no_variants}
+        if args.max_size_mb:
+            if args.mode != "single":
+                raise SystemExit("--max-size-mb needs --mode single")
+            export_options["max_size_mb"] = args.max_size_mb
+        if args.formats and tuple(args.formats) != ("html",):
+            export_options["formats"] = tuple(dict.fromkeys(args.formats))
+    results = run_batch(
+        paths,
+        tasks,
+        check=args.check,
+        force=args.force,
+        jobs=args.jobs,
+        export_options=export_options,
+        quiet=args.quiet,
+    )
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
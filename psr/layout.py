@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import re
+
+# File and folder names inside a recording (and next to it), shared by psr and the exporters.
+# Nothing from psr is imported here, so the lowest layers (psr.archive) can use them as well.
+STEPS_NAME = "steps.json"
+META_NAME = "recording.meta.json"
+HTML_NAME = "anleitung.html"
+DOCX_NAME = "anleitung.docx"
+PDF_NAME = "anleitung.pdf"
+VIDEO_DIR_NAME = "video"
+# Beside the recordings, shared by every external-mode page: <root>/_static/.
+STATIC_DIR_NAME = "_static"
+# Resized copies of the screenshots for srcset; an external-mode page links them.
+VARIANTS_DIR_NAME = "variants"
+# Per-recording folder for derived files that exports rebuild on demand (print images, size budget).
+EXPORT_CACHE_DIR_NAME = ".export_cache"
+
+STATIC_REF = re.compile(rb'(?:href|src)="\.\./' + STATIC_DIR_NAME.encode("ascii") + rb'/([\w.-]+)"')
+# The stylesheet link is in the head, well before the step data.
+HTML_HEAD_BYTES = 64 * 1024
+
+
+# External mode: the page needs the files around it (images/, variants/, ../_static/). `head` is its start.
+def is_external_html(head: bytes) -> bool:
+    return bool(STATIC_REF.search(head[:HTML_HEAD_BYTES]))
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .capture_policy import remove_orphaned_images
+from .narrator import enrich_steps_json
+from .recording import Recording
+
+Stage = Callable[[Dict[str, Any]], Any]
+StageCallback = Callable[[str, int, int], None]
+
+
+@dataclass
+class PipelineResult:
+    data: Dict[str, Any]
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.timings_ms.values())
+
+
+class PostProcessPipeline:
+
+    def __init__(self):
+        self._stages: List[Tuple[str, Stage, bool]] = []
+
+    def add_stage(self, name: str, fn: Stage, required: bool = False) -> "PostProcessPipeline":
+        self._stages.append((name, fn, required))
+        return self
+
+    @property
+    def stage_names(self) -> List[str]:
+        return [name for name, _, _ in self._stages]
+
+    def run(self, data: Dict[str, Any], on_stage: Optional[StageCallback] = None) -> PipelineResult:
+        result = PipelineResult(data=data)
+        total = len(self._stages)
+        for i, (name, fn, required) in enumerate(self._stages):
+            if on_stage is not None:
+                try:
+                    on_stage(name, i, total)
+                except Exception:
+                    pass
+            t0 = time.perf_counter()
+            try:
+                result.outputs[name] = fn(result.data)
+            except Exception as e:
+                result.errors[name] = str(e)
+                if required:
+                    result.timings_ms[name] = (time.perf_counter() - t0) * 1000.0
+                    break
+            result.timings_ms[name] = (time.perf_counter() - t0) * 1000.0
+        return result
+
+
+def narrate_steps(data: Dict[str, Any]) -> Dict[str, Any]:
+    data = enrich_steps_json(data)
+
+    events = data.get("events") or []
+    prev_kind: Optional[str] = None
+
+    for e in events:
+        if not isinstance(e, dict):
+            prev_kind = None
+            continue
+
+        kind = (e.get("kind") or "").lower()
+
+        if kind == "key_press":
+            detail = str(e.get("detail") or "").lower()
+            if "enter" in detail and prev_kind == "text_input":
+                e["screenshot"] = None
+
+        prev_kind = kind
+
+    data["events"] = events
+    return data
+
+
+def read_steps_json(out_dir: str) -> Dict[str, Any]:
+    with Recording(out_dir) as rec:
+        return rec.data
+
+
+def write_steps_json(out_dir: str, data: Dict[str, Any]) -> str:
+    with Recording(out_dir) as rec:
+        return rec.write_steps(data)
+
+
+def build_postprocess_pipeline(
+    out_dir: str,
+    export_html: Optional[Callable[..., str]] = None,
+    export_options: Optional[Dict[str, Any]] = None,
+    export_docx: Optional[Callable[..., str]] = None,
+    export_pdf: Optional[Callable[..., str]] = None,
+    dedupe_images: bool = False,
+) -> PostProcessPipeline:
+    pipe = PostProcessPipeline()
+    pipe.add_stage("narrate", narrate_steps)
+    pipe.add_stage("save_steps", lambda d: write_steps_json(out_dir, d), required=True)
+    pipe.add_stage("cleanup_images", lambda d: remove_orphaned_images(out_dir, d.get("events") or []))
+    if export_html is not None:
+        opts = dict(export_options or {})
+        pipe.add_stage("export_html", lambda d: export_html(out_dir, data=d, **opts))
+    if export_docx is not None:
+        pipe.add_stage("export_docx", lambda d: export_docx(out_dir, data=d))
+    if export_pdf is not None:
+        pipe.add_stage("export_pdf", lambda d: export_pdf(out_dir, data=d))
+    if dedupe_images:
+        from .blob_store import dedupe_recording
+
+        pipe.add_stage("dedupe_images", lambda d: dedupe_recording(out_dir))
+    return pipe
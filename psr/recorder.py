@@ -4,18 +4,22 @@ import os
 import time
 import json
 from datetime import datetime
-from typing import Optional, Tuple, List, Set
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, List, Set
 
 import mss
 from PIL import Image
 from pynput import mouse, keyboard
 
 from .models import StepEvent, MonitorInfo
+from .layout import STEPS_NAME, VIDEO_DIR_NAME
 from .monitor import list_monitors, find_monitor_for_point
 from .annotate import mark_click
-from .video import MultiMonitorVideoWriter
+from .capture_policy import CapturePlanner
 from .window_info import get_active_window_info
 
+if TYPE_CHECKING:
+    from .video import MultiMonitorVideoWriter
+
 
 class PSRLikeRecorder:
     def __init__(
@@ -30,7 +34,7 @@ class PSRLikeRecorder:
     ):
         self.out_dir = out_dir
         self.img_dir = os.path.join(out_dir, "images")
-        self.video_dir = os.path.join(out_dir, "video")
+        self.video_dir = os.path.join(out_dir, VIDEO_DIR_NAME)
 
         os.makedirs(self.img_dir, exist_ok=True)
 
@@ -52,9 +56,14 @@ class PSRLikeRecorder:
         self._mouse_listener: Optional[mouse.Listener] = None
         self._keyboard_listener: Optional[keyboard.Listener] = None
 
-        self._video = MultiMonitorVideoWriter(self.video_dir, self.monitors, fps=self.video_fps, enabled=self.enable_video)
+        self._video: Optional["MultiMonitorVideoWriter"] = None
+        if self.enable_video:
+            from .video import MultiMonitorVideoWriter
+
+            self._video = MultiMonitorVideoWriter(self.video_dir, self.monitors, fps=self.video_fps, enabled=True)
 
         self._text_buf: str = ""
+        self._capture_planner = CapturePlanner()
 
     def _now_rel(self) -> float:
         assert self._start_time is not None
@@ -76,15 +85,17 @@ class PSRLikeRecorder:
         self.running = True
         self._start_time = time.time()
         self._text_buf = ""
+        self._capture_planner.reset()
 
         self.events.append(StepEvent(0.0, "start", "Recording started"))
         self._mouse_listener = mouse.Listener(on_click=self._on_click)
         self._keyboard_listener = keyboard.Listener(on_press=self._on_press)
         self._mouse_listener.start()
         self._keyboard_listener.start()
-        self._video.start()
+        if self._video:
+            self._video.start()
 
-    def stop(self):
+    def stop(self, save: bool = True):
         if not self.running:
             return
         self._flush_text_input(reason="stop", take_screenshot=False, monitor_for_screenshot=None)
@@ -96,22 +107,26 @@ class PSRLikeRecorder:
         if self._keyboard_listener:
             self._keyboard_listener.stop()
 
-        self._video.stop()
-        self._save_steps_json()
+        if self._video:
+            self._video.stop()
+        if save:
+            self._save_steps_json()
 
-    def _save_steps_json(self):
-        path = os.path.join(self.out_dir, "steps.json")
-        payload = {
+    def steps_payload(self) -> Dict[str, Any]:
+        return {
             "created_at": datetime.now().isoformat(timespec="seconds"),
             "monitors": [m.as_dict() for m in self.monitors],
-            "events": [e.__dict__ for e in self.events],
+            "events": [dict(e.__dict__) for e in self.events],
             "video_enabled": self.enable_video,
-            "video_dir": "video" if self.enable_video else None,
+            "video_dir": VIDEO_DIR_NAME if self.enable_video else None,
             "screenshot_delay_ms": self.screenshot_delay_ms,
             "record_text_input": self.record_text_input,
         }
+
+    def _save_steps_json(self):
+        path = os.path.join(self.out_dir, STEPS_NAME)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+            json.dump(self.steps_payload(), f, ensure_ascii=False, indent=2)
 
     def _capture_monitor_screenshot(self, mon: MonitorInfo, rel_xy: Optional[Tuple[int, int]], delay_ms: int = 0) -> str:
         if delay_ms and delay_ms > 0:
@@ -155,17 +170,25 @@ class PSRLikeRecorder:
             self._text_buf = ""
             return
 
+        t = self._now_rel()
+        mon_index = monitor_for_screenshot.index if monitor_for_screenshot else (self.monitors[0].index if self.monitors else None)
+
         ss = None
         if take_screenshot:
-            if monitor_for_screenshot:
-                ss = self._capture_monitor_screenshot(monitor_for_screenshot, rel_xy=None, delay_ms=self.screenshot_delay_ms)
+            plan = self._capture_planner.plan("text_input", t, monitor_index=mon_index)
+            if plan.needs_capture:
+                if monitor_for_screenshot:
+                    ss = self._capture_monitor_screenshot(monitor_for_screenshot, rel_xy=None, delay_ms=self.screenshot_delay_ms)
+                else:
+                    ss = self._capture_primary_no_marker()
             else:
-                ss = self._capture_primary_no_marker()
+                ss = plan.screenshot
 
         w = self._win()
+        self._capture_planner.observe("text_input", t, ss, monitor_index=mon_index)
         self.events.append(
             StepEvent(
-                t=self._now_rel(),
+                t=t,
                 kind="text_input",
                 detail=f"Text entered ({reason})",
                 screenshot=ss,
@@ -187,15 +210,21 @@ class PSRLikeRecorder:
 
         self._flush_text_input(reason="focus_change", take_screenshot=False, monitor_for_screenshot=None)
 
+        t = self._now_rel()
         ss = None
         if self.screenshot_on_click and mon:
-            ss = self._capture_monitor_screenshot(mon, (rel_x, rel_y), delay_ms=self.screenshot_delay_ms)
+            plan = self._capture_planner.plan("mouse_click", t, monitor_index=mon.index)
+            if plan.needs_capture:
+                ss = self._capture_monitor_screenshot(mon, (rel_x, rel_y), delay_ms=self.screenshot_delay_ms)
+            else:
+                ss = plan.screenshot
 
         w = self._win()
+        self._capture_planner.observe("mouse_click", t, ss, monitor_index=mon.index if mon else None, marked=True)
         detail = f"Click {button} at ({int(x)},{int(y)})"
         self.events.append(
             StepEvent(
-                t=self._now_rel(),
+                t=t,
                 kind="mouse_click",
                 detail=detail,
                 monitor_index=mon.index if mon else None,
@@ -250,16 +279,24 @@ class PSRLikeRecorder:
             if k == "tab":
                 self._flush_text_input(reason="tab", take_screenshot=True, monitor_for_screenshot=self.monitors[0] if self.monitors else None)
 
+        t = self._now_rel()
+        mon_index = self.monitors[0].index if self.monitors else None
+
         ss = None
         if k in self.screenshot_on_keys and self.monitors:
-            ss = self._capture_monitor_screenshot(self.monitors[0], rel_xy=None, delay_ms=self.screenshot_delay_ms)
+            plan = self._capture_planner.plan("key_press", t, key=k, monitor_index=mon_index)
+            if plan.needs_capture:
+                ss = self._capture_monitor_screenshot(self.monitors[0], rel_xy=None, delay_ms=self.screenshot_delay_ms)
+            else:
+                ss = plan.screenshot
 
         important = (k in self.screenshot_on_keys) or (k in ("ctrl_l", "ctrl_r", "alt_l", "alt_r"))
         if important:
             w = self._win()
+            self._capture_planner.observe("key_press", t, ss, key=k, monitor_index=mon_index)
             self.events.append(
                 StepEvent(
-                    self._now_rel(),
+                    t,
                     "key_press",
                     f"Key: {k}",
                     screenshot=ss,
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from psr.archive import ArchiveMember, RecordingArchive, is_archive, member_name, shared_archive
+from psr.layout import META_NAME, STEPS_NAME
+from psr.models import StepEvent
+
+# Events that become numbered steps in the guide (HTML editor, DOCX, PDF); the rest are bookkeeping.
+GUIDE_KINDS = ("mouse_click", "key_press", "text_input", "custom_step")
+THUMBNAIL_SIZE = (320, 200)
+
+_CHUNK = 1024 * 1024
+_THUMBNAIL_CACHE_SIZE = 256
+
+# A screenshot as a file path, or as a member of a packed recording.
+ImageSource = Union[str, ArchiveMember]
+
+_STEP_FIELDS = {f.name for f in fields(StepEvent)}
+
+
+# One entry of steps.json. Keys StepEvent does not know (monitors, custom fields) stay in `extra`.
+@dataclass
+class RecordingStep(StepEvent):
+    index: int = 0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_event(cls, index: int, e: Dict[str, Any]) -> "RecordingStep":
+        known = {k: v for k, v in e.items() if k in _STEP_FIELDS}
+        known.setdefault("t", 0.0)
+        known.setdefault("kind", "")
+        known.setdefault("detail", "")
+        extra = {k: v for k, v in e.items() if k not in _STEP_FIELDS}
+        return cls(**known, index=index, extra=extra)
+
+
+def guide_events(events: List[Any]) -> List[Dict[str, Any]]:
+    # Guide step N is element N - 1.
+    return [e for e in events if isinstance(e, dict) and (e.get("kind") or "") in GUIDE_KINDS]
+
+
+# The file behind a screenshot reference, if it exists and lies inside `rec_dir`.
+def local_screenshot_path(shot: Any, rec_dir: str) -> Optional[str]:
+    if not shot or not isinstance(shot, str):
+        return None
+    if shot.startswith("data:"):
+        return None
+    if shot.startswith("http://") or shot.startswith("https://"):
+        return None
+
+    # Recorded on Windows, read elsewhere: the separators still have to work.
+    p = shot.replace("\\", "/") if os.sep == "/" else shot
+    if not os.path.isabs(p):
+        p = os.path.join(rec_dir, p)
+    p = os.path.normpath(p)
+
+    try:
+        out_root = os.path.abspath(rec_dir)
+        if os.path.commonpath([out_root, os.path.abspath(p)]) != out_root:
+            return None
+    except Exception:
+        return None
+
+    if not os.path.exists(p):
+        return None
+    return p
+
+
+def open_image_source(src: ImageSource) -> BinaryIO:
+    if isinstance(src, ArchiveMember):
+        return shared_archive(src.archive).open(src.name)
+    return open(src, "rb")
+
+
+def _file_chunks(f: BinaryIO, size: int) -> Iterator[bytes]:
+    with f:
+        yield from iter(lambda: f.read(size), b"")
+
+
+# Decoded thumbnails, least recently used evicted first; shared by all Recording objects.
+class _ThumbnailCache:
+    def __init__(self, size: int):
+        self.size = size
+        self._items: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        with self._lock:
+            img = self._items.get(key)
+            if img is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return img
+
+    def put(self, key: Tuple[Any, ...], img: Any) -> None:
+        with self._lock:
+            self._items[key] = img
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+thumbnail_cache = _ThumbnailCache(_THUMBNAIL_CACHE_SIZE)
+
+
+# A folder or a packed .psra archive; steps.json, meta and screenshots are read on first use.
+class Recording:
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.packed = is_archive(self.path)
+        self._archive: Optional[RecordingArchive] = None
+        self._data: Optional[Dict[str, Any]] = None
+        self._meta: Optional[Dict[str, Any]] = None
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def archive(self) -> RecordingArchive:
+        if self._archive is None:
+            self._archive = RecordingArchive(self.path)
+        return self._archive
+
+    def has(self, name: str) -> bool:
+        if self.packed:
+            return name in self.archive
+        return os.path.exists(os.path.join(self.path, name))
+
+    def mtime_ns(self, name: str) -> Optional[int]:
+        # An archive is rewritten as a whole, so its own mtime stands in for its members'.
+        try:
+            if self.packed:
+                return os.stat(self.path).st_mtime_ns if name in self.archive else None
+            return os.stat(os.path.join(self.path, name)).st_mtime_ns
+        except OSError:
+            return None
+
+    def read_json(self, name: str) -> Any:
+        if self.packed:
+            if name not in self.archive:
+                raise FileNotFoundError(f"{name} not found in {self.path}")
+            return self.archive.read_json(name)
+        with open(os.path.join(self.path, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_json(self, name: str, value: Any) -> str:
+        if self.packed:
+            self.archive.update({name: json.dumps(value, ensure_ascii=False, indent=2).encode("utf-8")})
+            return self.path
+        path = os.path.join(self.path, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False, indent=2)
+        return path
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            if not self.has(STEPS_NAME):
+                raise FileNotFoundError(f"steps.json not found in {self.path}")
+            self._data = self.read_json(STEPS_NAME)
+        return self._data
+
+    @property
+    def events(self) -> List[Any]:
+        return self.data.get("events") or []
+
+    def steps(self) -> Iterator[RecordingStep]:
+        for i, e in enumerate(self.events):
+            if isinstance(e, dict):
+                yield RecordingStep.from_event(i, e)
+
+    def write_steps(self, data: Dict[str, Any]) -> str:
+        out = self.write_json(STEPS_NAME, data)
+        self._data = data
+        return out
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            try:
+                meta = self.read_json(META_NAME) if self.has(META_NAME) else {}
+            except (OSError, ValueError):
+                # Missing, unreadable or a broken archive: no meta, the folder name is used.
+                meta = {}
+            self._meta = meta if isinstance(meta, dict) else {}
+        return self._meta
+
+    def write_meta(self, meta: Dict[str, Any]) -> None:
+        self.write_json(META_NAME, meta)
+        self._meta = meta
+
+    @property
+    def name(self) -> str:
+        base = os.path.basename(self.path)
+        if self.packed:
+            base = os.path.splitext(base)[0]
+        return str(self.meta.get("name") or base)
+
+    def image_source(self, shot: Any) -> Optional[ImageSource]:
+        if not self.packed:
+            return local_screenshot_path(shot, self.path)
+        name = member_name(shot)
+        return ArchiveMember(self.path, name) if name and name in self.archive else None
+
+    def open_image(self, src: ImageSource) -> BinaryIO:
+        if isinstance(src, ArchiveMember):
+            return self.archive.open(src.name)
+        return open(src, "rb")
+
+    def image_chunks(self, src: ImageSource, size: int = _CHUNK) -> Iterator[Any]:
+        # Files are opened right away, so a missing one fails here rather than halfway through a stream.
+        if isinstance(src, ArchiveMember):
+            return self.archive.chunks(src.name, size)
+        return _file_chunks(open(src, "rb"), size)
+
+    # Decoded and downscaled, from a process-wide cache, so treat it as read-only.
+    def thumbnail(self, src: ImageSource, size: Tuple[int, int] = THUMBNAIL_SIZE) -> Any:
+        from PIL import Image
+
+        stamp = os.stat(self.path if isinstance(src, ArchiveMember) else src).st_mtime_ns
+        key = (src, stamp, size)
+        img = thumbnail_cache.get(key)
+        if img is not None:
+            return img
+        with self.open_image(src) as f, Image.open(f) as full:
+            # JPEG can decode at a fraction of the size directly.
+            full.draft("RGB", size)
+            img = full.convert("RGB")
+        img.thumbnail(size, Image.BILINEAR)
+        thumbnail_cache.put(key, img)
+        return img
@@ -1,14 +1,33 @@
 from __future__ import annotations
 
+import errno
+import itertools
 import json
 import os
+import queue
 import re
 import shutil
+import sqlite3
+import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
+from psr.archive import ARCHIVE_EXT, is_archive, pack_recording, release_archive, unpack_archive
+from psr.catalog import get_catalog, notify_changed, notify_removed
+from psr.layout import HTML_NAME, META_NAME, STATIC_DIR_NAME, STEPS_NAME
 from psr.paths import recordings_root_dir
+from psr.recording import Recording
+from psr.search import SearchHit
+
+
+TRASH_DIR_NAME = "_trash"
+
+_COPY_CHUNK = 4 * 1024 * 1024
+_PROGRESS_INTERVAL_S = 0.1
+
+Progress = Callable[[int, int], None]
 
 
 @dataclass
@@ -30,6 +49,7 @@ def _safe_name(name: str) -> str:
     n = (name or "").strip()
     n = re.sub(r"[^\w\s\-.()äöüÄÖÜß]", "", n, flags=re.UNICODE)
     n = re.sub(r"\s+", " ", n, flags=re.UNICODE).strip()
+    n = n.lstrip("_.").strip()
     return n[:80] if n else ""
 
 
@@ -37,21 +57,32 @@ def default_recording_name() -> str:
     return "Recording " + datetime.now().strftime("%Y-%m-%d %H-%M-%S")
 
 
-def create_recording_dir(name: Optional[str] = None) -> str:
-    root = ensure_recordings_root()
-    base = _safe_name(name) or default_recording_name()
-    candidate = base
+def _unique_name(parent: str, base: str, ext: str = "") -> str:
+    candidate = base + ext
     i = 2
-    while os.path.exists(os.path.join(root, candidate)):
-        candidate = f"{base} ({i})"
+    while os.path.exists(os.path.join(parent, candidate)):
+        candidate = f"{base} ({i}){ext}"
         i += 1
+    return candidate
+
+
+def _split_archive_name(name: str) -> Tuple[str, str]:
+    if name.lower().endswith(ARCHIVE_EXT):
+        return name[: -len(ARCHIVE_EXT)], name[-len(ARCHIVE_EXT) :]
+    return name, ""
+
+
+def create_recording_dir(name: Optional[str] = None) -> str:
+    root = ensure_recordings_root()
+    candidate = _unique_name(root, _safe_name(name) or default_recording_name())
     p = os.path.join(root, candidate)
     os.makedirs(p, exist_ok=True)
-    meta_path = os.path.join(p, "recording.meta.json")
+    meta_path = os.path.join(p, META_NAME)
     if not os.path.exists(meta_path):
         meta = {"name": candidate, "created": datetime.now().isoformat(timespec="seconds")}
         with open(meta_path, "w", encoding="utf-8") as f:
             json.dump(meta, f, ensure_ascii=False, indent=2)
+    notify_changed(p)
     return p
 
 
@@ -83,25 +114,58 @@ def resolve_recording_dir(raw: Any) -> str:
 
 
 def list_recordings() -> List[RecordingItem]:
+    return list_recordings_page()[0]
+
+
+def list_recordings_page(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    order: str = "created",
+    descending: bool = True,
+    deep: bool = False,
+) -> Tuple[List[RecordingItem], int]:
+    ensure_recordings_root()
+    try:
+        cat = get_catalog()
+        cat.refresh(deep=deep)
+        return cat.query(order, descending, offset, limit), cat.count()
+    except sqlite3.Error:
+        # Read-only share or locked database: fall back to scanning the folders.
+        items = _scan_recordings()
+        if order == "name":
+            items.sort(key=lambda x: x.name.lower(), reverse=descending)
+        elif not descending:
+            items.reverse()
+        return items[offset : None if limit is None else offset + limit], len(items)
+
+
+def search_recordings(query: str, limit: int = 50, deep: bool = False) -> List[SearchHit]:
+    ensure_recordings_root()
+    try:
+        cat = get_catalog()
+        # deep also re-indexes steps.json files rewritten in place, which a plain refresh cannot see.
+        cat.refresh(deep=deep)
+        return cat.search(query, limit)
+    except sqlite3.Error:
+        return []
+
+
+def _scan_recordings() -> List[RecordingItem]:
     root = ensure_recordings_root()
     items: List[RecordingItem] = []
     for entry in os.listdir(root):
+        if entry.startswith(("_", ".")):
+            continue
         p = os.path.join(root, entry)
-        if not os.path.isdir(p):
+        if not (os.path.isdir(p) or is_archive(p)):
+            continue
+        try:
+            with Recording(p) as rec:
+                has_steps, has_html = rec.has(STEPS_NAME), rec.has(HTML_NAME)
+                name = rec.name
+            created_ts = os.path.getmtime(p)
+        except (OSError, ValueError):
             continue
-        meta_path = os.path.join(p, "recording.meta.json")
-        name = entry
-        created_ts = os.path.getmtime(p)
-        if os.path.exists(meta_path):
-            try:
-                with open(meta_path, "r", encoding="utf-8") as f:
-                    meta = json.load(f)
-                if isinstance(meta, dict) and meta.get("name"):
-                    name = str(meta.get("name"))
-            except Exception:
-                pass
-        has_steps = os.path.exists(os.path.join(p, "steps.json"))
-        has_html = os.path.exists(os.path.join(p, "anleitung.html"))
         items.append(RecordingItem(name=name, path=p, created_ts=created_ts, has_steps=has_steps, has_html=has_html))
     items.sort(key=lambda x: x.created_ts, reverse=True)
     return items
@@ -113,39 +177,354 @@ def rename_recording(old_path: str, new_name: str) -> str:
     if not new_base:
         raise ValueError("Ungültiger Name")
 
-    new_path = os.path.join(root, new_base)
+    ext = ARCHIVE_EXT if is_archive(old_path) else ""
+    new_path = os.path.join(root, new_base + ext)
     if os.path.abspath(old_path) == os.path.abspath(new_path):
         _write_meta(old_path, new_base)
+        notify_changed(old_path)
         return old_path
 
-    candidate = new_base
-    i = 2
-    while os.path.exists(os.path.join(root, candidate)):
-        candidate = f"{new_base} ({i})"
-        i += 1
-
+    candidate = _unique_name(root, new_base, ext)
     new_path = os.path.join(root, candidate)
+    release_archive(old_path)
     shutil.move(old_path, new_path)
-    _write_meta(new_path, candidate)
+    _write_meta(new_path, _split_archive_name(candidate)[0])
+    notify_removed(old_path)
+    notify_changed(new_path)
+    return new_path
+
+
+def move_recording(
+    path: str,
+    dest_dir: str,
+    on_progress: Optional[Progress] = None,
+    check: Optional[Callable[[], None]] = None,
+) -> str:
+    os.makedirs(dest_dir, exist_ok=True)
+    name = os.path.basename(path.rstrip("/\\"))
+    new_path = os.path.join(dest_dir, _unique_name(dest_dir, *_split_archive_name(name)))
+    release_archive(path)
+    try:
+        os.rename(path, new_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Other drive or share: copy, then delete the original. Hardlinked blobs become plain copies.
+        blobs = read_meta(path).get("blobs") or {}
+        _copy_tree(path, new_path, on_progress, check)
+        _remove_tree(path)
+        if blobs:
+            from psr.blob_store import BlobStore
+
+            update_meta(new_path, {"blobs": {}})
+            BlobStore().release(blobs.values())
+    _restore_static_assets(new_path, os.path.dirname(os.path.abspath(path)))
+    notify_removed(path)
+    notify_changed(new_path)
     return new_path
 
 
-def delete_recording(path: str) -> None:
+# Packs into <name>.psra next to the folder, which is removed unless `keep`.
+def archive_recording(
+    path: str,
+    on_progress: Optional[Progress] = None,
+    check: Optional[Callable[[], None]] = None,
+    keep: bool = False,
+) -> str:
+    parent, name = os.path.split(os.path.abspath(path).rstrip("/\\"))
+    dest = os.path.join(parent, _unique_name(parent, name, ARCHIVE_EXT))
+    meta = read_meta(path)
+    # The archive holds copies; blob references stay with the folder (and are released with it).
+    meta.pop("blobs", None)
+    pack_recording(path, dest, on_progress, check, replace={META_NAME: json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8")})
+    notify_changed(dest)
+    if not keep:
+        delete_recording(path)
+    return dest
+
+
+# Unpacks into a folder next to the archive, which is removed unless `keep`.
+def extract_recording(
+    path: str,
+    on_progress: Optional[Progress] = None,
+    check: Optional[Callable[[], None]] = None,
+    keep: bool = False,
+) -> str:
+    parent, name = os.path.split(os.path.abspath(path))
+    dest = os.path.join(parent, _unique_name(parent, _split_archive_name(name)[0]))
+    unpack_archive(path, dest, on_progress, check)
+    _restore_static_assets(dest)
+    notify_changed(dest)
+    if not keep:
+        delete_recording(path)
+    return dest
+
+
+def _restore_static_assets(path: str, old_parent: Optional[str] = None) -> None:
+    # An external-mode anleitung.html links ../_static/ beside the recording, which may not exist at the new place.
     if not os.path.isdir(path):
         return
+    from exporters.html_exporter import restore_static_assets
+
+    try:
+        restore_static_assets(path, os.path.join(old_parent, STATIC_DIR_NAME) if old_parent else None)
+    except OSError:
+        # The recording itself is in place; only the page's styling is missing until the next export.
+        pass
+
+
+def delete_recording(path: str, on_progress: Optional[Progress] = None) -> None:
+    if not os.path.exists(path):
+        return
+    blobs = read_meta(path).get("blobs") or {}
+
+    # Out of the recordings list at once; the files are removed afterwards.
+    doomed = path
+    release_archive(path)
+    name = os.path.basename(path.rstrip("/\\"))
+    trash = os.path.join(ensure_recordings_root(), TRASH_DIR_NAME, f"{name}.{time.time_ns()}")
+    try:
+        os.makedirs(os.path.dirname(trash), exist_ok=True)
+        os.rename(path, trash)
+        doomed = trash
+    except OSError:
+        pass
+    notify_removed(path)
+    _remove_tree(doomed, on_progress)
+
+    if blobs:
+        from psr.blob_store import BlobStore
+
+        BlobStore().release(blobs.values())
+
+
+def purge_trash() -> None:
+    # Leftovers of deletes interrupted by closing the app.
+    trash = os.path.join(ensure_recordings_root(), TRASH_DIR_NAME)
+    if os.path.isdir(trash):
+        for entry in os.listdir(trash):
+            _remove_tree(os.path.join(trash, entry))
+
+
+def _remove_tree(path: str, on_progress: Optional[Progress] = None) -> None:
+    if os.path.isfile(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+    walk = list(os.walk(path, topdown=False))
+    total = sum(len(files) for _, _, files in walk)
+    done = 0
+    for dirpath, _, files in walk:
+        for f in files:
+            try:
+                os.remove(os.path.join(dirpath, f))
+            except OSError:
+                pass
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total)
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
     shutil.rmtree(path, ignore_errors=True)
 
 
+def _copy_tree(src: str, dst: str, on_progress: Optional[Progress], check: Optional[Callable[[], None]]) -> None:
+    if os.path.isfile(src):
+        # An archive: one file, no folder around it.
+        pairs = [(src, dst)]
+    else:
+        pairs = [(os.path.join(d, f), os.path.join(dst, os.path.relpath(d, src), f)) for d, _, names in os.walk(src) for f in names]
+    total = sum(os.path.getsize(s) for s, _ in pairs)
+    done = 0
+    try:
+        for source, target in pairs:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(source, "rb") as fin, open(target, "wb") as fout:
+                while True:
+                    if check is not None:
+                        check()
+                    chunk = fin.read(_COPY_CHUNK)
+                    if not chunk:
+                        break
+                    fout.write(chunk)
+                    done += len(chunk)
+                    if on_progress is not None:
+                        on_progress(done, total)
+            shutil.copystat(source, target)
+    except BaseException:
+        _remove_tree(dst)
+        raise
+
+
+def read_meta(path: str) -> Dict[str, Any]:
+    with Recording(path) as rec:
+        return rec.meta
+
+
+def update_meta(path: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    with Recording(path) as rec:
+        meta = {**rec.meta, **fields}
+        rec.write_meta(meta)
+    return meta
+
+
 def _write_meta(path: str, name: str) -> None:
-    meta_path = os.path.join(path, "recording.meta.json")
-    meta = {"name": name, "updated": datetime.now().isoformat(timespec="seconds")}
-    if os.path.exists(meta_path):
+    update_meta(path, {"name": name, "updated": datetime.now().isoformat(timespec="seconds")})
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobEvent:
+    job_id: int
+    kind: str
+    state: str  # queued, running, progress, done, failed, cancelled
+    done: int = 0
+    total: int = 0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+
+
+class RecordingJob:
+
+    def __init__(self, job_id: int, kind: str, run: Callable[["RecordingJob"], Any], total: int, emit: Callable[[JobEvent], None]):
+        self.id = job_id
+        self.kind = kind
+        self.total = total
+        self.state = "queued"
+        self._run = run
+        self._emit = emit
+        self._cancel = threading.Event()
+        self._last_report = 0.0
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self) -> None:
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, done: int, message: str = "", force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_report < _PROGRESS_INTERVAL_S:
+            return
+        self._last_report = now
+        self._emit(JobEvent(self.id, self.kind, "progress", done, self.total, message))
+
+
+# Deletes, moves and exports run one after another on a worker thread; state changes go to `on_event`.
+class JobQueue:
+    def __init__(self, on_event: Optional[Callable[[JobEvent], None]] = None):
+        self._on_event = on_event
+        self._queue: "queue.Queue[Optional[RecordingJob]]" = queue.Queue()
+        self._jobs: Dict[int, RecordingJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name="recording-jobs", daemon=True)
+        self._thread.start()
+
+    def _emit(self, event: JobEvent) -> None:
+        if self._on_event is not None:
+            try:
+                self._on_event(event)
+            except Exception:
+                pass
+
+    def submit(self, kind: str, run: Callable[[RecordingJob], Any], total: int = 1) -> RecordingJob:
+        job = RecordingJob(next(self._ids), kind, run, total, self._emit)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._emit(JobEvent(job.id, kind, "queued", 0, total))
+        self._queue.put(job)
+        return job
+
+    def active(self) -> List[RecordingJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: Optional[int] = None) -> None:
+        for job in self.active():
+            if job_id is None or job.id == job_id:
+                job.cancel()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._queue.put(None)
+
+    def _worker(self) -> None:
         try:
-            with open(meta_path, "r", encoding="utf-8") as f:
-                old = json.load(f)
-            if isinstance(old, dict):
-                meta = {**old, **meta}
-        except Exception:
+            purge_trash()
+        except OSError:
             pass
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump(meta, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                job.check()
+                job.state = "running"
+                self._emit(JobEvent(job.id, job.kind, "running", 0, job.total))
+                result = job._run(job)
+                job.state = "done"
+                self._emit(JobEvent(job.id, job.kind, "done", job.total, job.total, result=result))
+            except JobCancelled:
+                job.state = "cancelled"
+                self._emit(JobEvent(job.id, job.kind, "cancelled"))
+            except Exception as e:
+                job.state = "failed"
+                self._emit(JobEvent(job.id, job.kind, "failed", error=str(e)))
+            finally:
+                with self._lock:
+                    self._jobs.pop(job.id, None)
+
+    def delete(self, paths: Sequence[str]) -> RecordingJob:
+        paths = list(paths)
+
+        def run(job: RecordingJob) -> List[str]:
+            for i, p in enumerate(paths):
+                job.check()
+                name = os.path.basename(p.rstrip("/\\"))
+                job.report(i, name, force=True)
+                delete_recording(p, on_progress=lambda k, n: job.report(i, f"{name}: {k}/{n} Dateien"))
+            return paths
+
+        return self.submit("delete", run, len(paths))
+
+    def rename(self, path: str, new_name: str) -> RecordingJob:
+        return self.submit("rename", lambda job: rename_recording(path, new_name))
+
+    def move(self, path: str, dest_dir: str) -> RecordingJob:
+        def run(job: RecordingJob) -> str:
+            def progress(done: int, total: int) -> None:
+                job.report(0, f"{done / 2**20:.0f}/{total / 2**20:.0f} MB")
+
+            return move_recording(path, dest_dir, on_progress=progress, check=job.check)
+
+        return self.submit("move", run)
+
+    def export(self, paths: Sequence[str], export_options: Optional[Dict[str, Any]] = None) -> RecordingJob:
+        paths = list(paths)
+
+        def run(job: RecordingJob) -> List[Any]:
+            # psr.tasks imports this module.
+            from psr.tasks import run_tasks
+
+            results = []
+            for i, p in enumerate(paths):
+                job.check()
+                job.report(i, os.path.basename(p.rstrip("/\\")), force=True)
+                results.append(run_tasks(p, ("export",), force=True, export_options=export_options))
+            return results
+
+        return self.submit("export", run, len(paths))
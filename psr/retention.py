@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from psr.archive import ARCHIVE_EXT, is_archive
+from psr.catalog import RecordingCatalog, get_catalog, notify_changed
+from psr.layout import EXPORT_CACHE_DIR_NAME, STEPS_NAME, VARIANTS_DIR_NAME, VIDEO_DIR_NAME
+from psr.recording import Recording
+
+RETENTION_FILE = "_retention.json"
+VIDEO_ACTIONS = ("drop", "reencode")
+
+TIER_RAW = 0
+TIER_VIDEO = 1
+TIER_LOSSY = 2
+
+# Recordings finished within this window may still be exported or edited; leave them alone.
+_MIN_IDLE_S = 3600
+_MEASURE_PER_RUN = 200
+_REENCODE_FPS = 2.0
+_REENCODE_SCALE = 0.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS retention (
+    entry TEXT PRIMARY KEY,
+    created_ts REAL NOT NULL,
+    tier INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL,
+    measured_mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class RetentionPolicy:
+    video_after_days: Optional[float] = None
+    video_action: str = "drop"
+    lossy_after_days: Optional[float] = None
+    lossy_quality: int = 80
+    quota_gb: Optional[float] = None
+    min_free_percent: float = 10.0
+
+    @property
+    def enabled(self) -> bool:
+        return any(v is not None for v in (self.video_after_days, self.lossy_after_days, self.quota_gb))
+
+    @classmethod
+    def load(cls, root: str) -> "RetentionPolicy":
+        try:
+            with open(os.path.join(root, RETENTION_FILE), "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in raw.items() if k in known}) if isinstance(raw, dict) else cls()
+
+    def save(self, root: str) -> str:
+        if self.video_action not in VIDEO_ACTIONS:
+            raise ValueError(f"Unknown video action: {self.video_action}")
+        path = os.path.join(root, RETENTION_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+        return path
+
+
+@dataclass
+class RetentionAction:
+    entry: str
+    action: str  # video, lossy
+    reason: str  # age, quota, disk
+    bytes_before: int
+    bytes_after: int
+    error: Optional[str] = None
+
+
+@dataclass
+class RetentionReport:
+    actions: List[RetentionAction] = field(default_factory=list)
+    total_bytes: int = 0
+    unmeasured: int = 0
+    quota_bytes: Optional[int] = None
+    disk_percent: float = 0.0
+    pending: int = 0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return sum(a.bytes_before - a.bytes_after for a in self.actions if not a.error)
+
+    @property
+    def quota_met(self) -> bool:
+        return self.quota_bytes is None or self.total_bytes <= self.quota_bytes
+
+    @property
+    def quota_exhausted(self) -> bool:
+        # Over quota with nothing left to compact; retention never deletes recordings.
+        return not self.quota_met and self.pending <= 0
+
+
+def disk_usage_percent(path: str) -> float:
+    try:
+        import psutil
+
+        return float(psutil.disk_usage(path).percent)
+    except ImportError:
+        usage = shutil.disk_usage(path)
+        return 100.0 * usage.used / usage.total if usage.total else 0.0
+
+
+def tree_size(path: str) -> int:
+    if os.path.isfile(path):
+        # A packed recording.
+        return os.path.getsize(path)
+    # Screenshots shared through the blob store are hardlinks; each file counts once, like on disk.
+    total = 0
+    seen = set()
+    for dirpath, _, files in os.walk(path):
+        for f in files:
+            try:
+                st = os.lstat(os.path.join(dirpath, f))
+            except OSError:
+                continue
+            if st.st_nlink > 1:
+                if (st.st_dev, st.st_ino) in seen:
+                    continue
+                seen.add((st.st_dev, st.st_ino))
+            total += st.st_size
+    return total
+
+
+def _created_ts(rec_dir: str, fallback: float) -> float:
+    from psr.recordings_store import read_meta
+
+    created = read_meta(rec_dir).get("created")
+    try:
+        return datetime.fromisoformat(str(created)).timestamp()
+    except (TypeError, ValueError):
+        return fallback
+
+
+def video_files(rec_dir: str) -> List[str]:
+    # psr.recorder writes one file per monitor into <rec>/video/.
+    return sorted(glob.glob(os.path.join(glob.escape(rec_dir), VIDEO_DIR_NAME, "monitor_*.mp4")))
+
+
+def _has_video(rec_path: str) -> bool:
+    if not is_archive(rec_path):
+        return bool(video_files(rec_path))
+    with Recording(rec_path) as rec:
+        return any(n.startswith(f"{VIDEO_DIR_NAME}/") and n.endswith(".mp4") for n in rec.archive.names())
+
+
+def _compact_packed(path: str, compact: Callable[[str], object]) -> None:
+    # Unpacked next to the archive, compacted like a folder and packed again; needs the archive's size
+    # in free space for the duration.
+    from psr.archive import pack_recording, release_archive, unpack_archive
+
+    # Dot-prefixed, so the catalog does not list it; next to the archive, so ../_static still resolves.
+    work = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.compact")
+    packed = work + ARCHIVE_EXT
+    try:
+        unpack_archive(path, dest=work)
+        compact(work)
+        pack_recording(work, dest=packed)
+        release_archive(path)
+        os.replace(packed, path)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        if os.path.exists(packed):
+            os.remove(packed)
+
+
+def reencode_video(path: str, fps: float = _REENCODE_FPS, scale: float = _REENCODE_SCALE) -> None:
+    import cv2
+
+    src = cv2.VideoCapture(path)
+    if not src.isOpened():
+        raise RuntimeError(f"Video konnte nicht geöffnet werden: {path}")
+    src_fps = src.get(cv2.CAP_PROP_FPS) or fps
+    size = (max(2, int(src.get(cv2.CAP_PROP_FRAME_WIDTH) * scale)), max(2, int(src.get(cv2.CAP_PROP_FRAME_HEIGHT) * scale)))
+    step = max(1, round(src_fps / fps))
+    tmp = f"{path}.{os.getpid()}.tmp.mp4"
+    out = cv2.VideoWriter(tmp, cv2.VideoWriter_fourcc(*"mp4v"), float(src_fps / step), size)
+    try:
+        i = 0
+        while True:
+            ok, frame = src.read()
+            if not ok:
+                break
+            if i % step == 0:
+                out.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+            i += 1
+    finally:
+        src.release()
+        out.release()
+    os.replace(tmp, path)
+
+
+def compact_video(rec_dir: str, action: str) -> None:
+    for path in video_files(rec_dir):
+        if action == "drop":
+            os.remove(path)
+        else:
+            reencode_video(path)
+    if action == "drop":
+        try:
+            os.rmdir(os.path.join(rec_dir, VIDEO_DIR_NAME))
+        except OSError:
+            pass
+
+
+def compact_images(rec_dir: str, quality: int = 80) -> int:
+    # PNG screenshots -> WebP (JPEG without WebP support), then anleitung.html in external mode,
+    # which references the files instead of embedding them a second time.
+    from PIL import Image
+
+    from exporters.html_exporter import export_html
+    from exporters.image_variants import variant_format
+    from psr.postprocess import read_steps_json, write_steps_json
+    from psr.recordings_store import read_meta, update_meta
+
+    data = read_steps_json(rec_dir)
+    fmt, ext = variant_format()
+    converted: Dict[str, str] = {}
+    for e in data.get("events") or []:
+        shot = e.get("screenshot") if isinstance(e, dict) else None
+        if not isinstance(shot, str) or not shot.lower().endswith(".png") or os.path.isabs(shot):
+            continue
+        if shot not in converted:
+            src = os.path.join(rec_dir, shot)
+            if not os.path.isfile(src):
+                continue
+            rel = f"{shot[:-4]}.{ext}"
+            dst = os.path.join(rec_dir, rel)
+            with Image.open(src) as img:
+                img = img.convert("RGB")
+                tmp = f"{dst}.{os.getpid()}.tmp"
+                if fmt == "WEBP":
+                    img.save(tmp, format=fmt, quality=quality, method=4)
+                else:
+                    img.save(tmp, format=fmt, quality=quality, optimize=True, progressive=True)
+                os.replace(tmp, dst)
+            converted[shot] = rel
+        e["screenshot"] = converted[shot]
+
+    if not converted:
+        return 0
+    write_steps_json(rec_dir, data)
+    shutil.rmtree(os.path.join(rec_dir, EXPORT_CACHE_DIR_NAME), ignore_errors=True)
+    # The page is written without srcset, so the resized copies of the old PNGs are unused.
+    shutil.rmtree(os.path.join(rec_dir, VARIANTS_DIR_NAME), ignore_errors=True)
+    export_html(rec_dir, data=data, mode="external", responsive=False)
+
+    blobs = dict(read_meta(rec_dir).get("blobs") or {})
+    for shot in converted:
+        try:
+            os.remove(os.path.join(rec_dir, shot))
+        except OSError:
+            pass
+    released = [blobs.pop(rel) for rel in list(blobs) if rel in converted]
+    if released:
+        from psr.blob_store import BlobStore
+
+        update_meta(rec_dir, {"blobs": blobs})
+        BlobStore().release(released)
+    return len(converted)
+
+
+# Applies a RetentionPolicy a few recordings per `run`, resuming from the compaction state in the catalog.
+class RetentionEngine:
+    def __init__(self, policy: RetentionPolicy, catalog: Optional[RecordingCatalog] = None):
+        self.policy = policy
+        self.catalog = catalog or get_catalog()
+
+    def _conn(self):
+        conn = self.catalog.connection()
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _measure(self, now: float) -> Tuple[Dict[str, Tuple[float, int, int, int]], int]:
+        # entry -> (created_ts, tier, bytes, catalog mtime); sizes are refreshed when a folder changed.
+        conn = self._conn()
+        rows = conn.execute(
+            """
+            SELECT r.entry, r.mtime_ns, t.created_ts, t.tier, t.bytes, t.measured_mtime_ns
+            FROM recordings AS r LEFT JOIN retention AS t ON t.entry = r.entry
+            """
+        ).fetchall()
+        state: Dict[str, Tuple[float, int, int, int]] = {}
+        updates = []
+        unmeasured = 0
+        for entry, mtime_ns, created_ts, tier, size, measured in rows:
+            if measured != mtime_ns:
+                if len(updates) >= _MEASURE_PER_RUN:
+                    unmeasured += 1
+                    if created_ts is None:
+                        continue
+                else:
+                    rec_dir = os.path.join(self.catalog.root, entry)
+                    if created_ts is None:
+                        created_ts = _created_ts(rec_dir, mtime_ns / 1e9)
+                    size = tree_size(rec_dir)
+                    tier = tier or TIER_RAW
+                    updates.append((entry, created_ts, tier, size, mtime_ns))
+            state[entry] = (created_ts, tier, size, mtime_ns)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO retention VALUES (?, ?, ?, ?, ?)", updates)
+            conn.execute("DELETE FROM retention WHERE entry NOT IN (SELECT entry FROM recordings)")
+        return state, unmeasured
+
+    def _due(self, created_ts: float, tier: int, rec_dir: str, now: float, pressure: bool) -> Optional[str]:
+        # Pressure only brings enabled steps forward: without --lossy-days the screenshots stay lossless.
+        age_days = (now - created_ts) / 86400.0
+        p = self.policy
+        if tier < TIER_VIDEO and p.video_after_days is not None:
+            if pressure or age_days >= p.video_after_days:
+                if _has_video(rec_dir):
+                    return "video"
+        if tier < TIER_LOSSY and p.lossy_after_days is not None:
+            if pressure or age_days >= p.lossy_after_days:
+                return "lossy"
+        return None
+
+    def plan(self, now: Optional[float] = None) -> Tuple[List[Tuple[str, str]], RetentionReport, str]:
+        now = time.time() if now is None else now
+        self.catalog.refresh()
+        state, unmeasured = self._measure(now)
+        report = RetentionReport(
+            total_bytes=sum(s[2] for s in state.values()),
+            unmeasured=unmeasured,
+            quota_bytes=int(self.policy.quota_gb * 1024**3) if self.policy.quota_gb else None,
+            disk_percent=disk_usage_percent(self.catalog.root),
+        )
+        disk_pressure = 100.0 - report.disk_percent < self.policy.min_free_percent
+        pressure = not report.quota_met or disk_pressure
+
+        todo: List[Tuple[str, str, float, int]] = []
+        for entry, (created_ts, tier, size, _) in state.items():
+            rec_dir = os.path.join(self.catalog.root, entry)
+            action = self._due(created_ts, tier, rec_dir, now, pressure)
+            if not action:
+                continue
+            # steps.json is written when a recording stops: without it the recording may still be running.
+            with Recording(rec_dir) as rec:
+                steps_mtime_ns = rec.mtime_ns(STEPS_NAME)
+            if steps_mtime_ns is None or now - steps_mtime_ns / 1e9 < _MIN_IDLE_S:
+                continue
+            todo.append((entry, action, created_ts, size))
+        if pressure:
+            todo.sort(key=lambda t: -t[3])
+        else:
+            todo.sort(key=lambda t: t[2])
+        report.pending = len(todo)
+        reason = "quota" if not report.quota_met else ("disk" if disk_pressure else "age")
+        return [(entry, action) for entry, action, _, _ in todo], report, reason
+
+    def run(
+        self,
+        max_items: int = 5,
+        check: Optional[Callable[[], None]] = None,
+        dry_run: bool = False,
+        now: Optional[float] = None,
+    ) -> RetentionReport:
+        todo, report, reason = self.plan(now)
+        conn = self._conn()
+        for entry, action in todo[:max_items]:
+            if check is not None:
+                check()
+            rec_dir = os.path.join(self.catalog.root, entry)
+            before = conn.execute("SELECT bytes FROM retention WHERE entry = ?", (entry,)).fetchone()[0]
+            act = RetentionAction(entry, action, reason, before, before)
+            report.actions.append(act)
+            if dry_run:
+                continue
+            if action == "video":
+                compact = partial(compact_video, action=self.policy.video_action)
+                tier = TIER_VIDEO
+            else:
+                compact = partial(compact_images, quality=self.policy.lossy_quality)
+                tier = TIER_LOSSY
+            try:
+                if is_archive(rec_dir):
+                    _compact_packed(rec_dir, compact)
+                else:
+                    compact(rec_dir)
+            except Exception as e:
+                # Keep the tier so a broken recording is not retried on every run.
+                act.error = str(e)
+                tier = TIER_LOSSY if action == "lossy" else TIER_VIDEO
+            notify_changed(rec_dir)
+            act.bytes_after = tree_size(rec_dir)
+            mtime_ns = os.stat(rec_dir).st_mtime_ns
+            with conn:
+                conn.execute(
+                    "UPDATE retention SET tier = MAX(tier, ?), bytes = ?, measured_mtime_ns = ? WHERE entry = ?",
+                    (tier, act.bytes_after, mtime_ns, entry),
+                )
+            report.total_bytes -= act.bytes_before - act.bytes_after
+            report.pending -= 1
+        return report
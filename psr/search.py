@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import List, Optional
+
+from psr.layout import STEPS_NAME
+from psr.recording import Recording, guide_events
+
+SEARCH_FIELDS = ("instruction", "window_title", "app_name", "input_text")
+# bm25 weights per column; step is stored, not indexed.
+_WEIGHTS = (0.0, 4.0, 2.0, 1.0, 3.0)
+# A recording's steps get rowids id << 20 | step, so dropping them is a rowid range delete
+# (an UNINDEXED column would need a full scan of the index).
+_STEP_BITS = 20
+# Bumped when indexed rows change meaning; older indexes are dropped and rebuilt by the next deep refresh.
+_INDEX_VERSION = 2
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS step_text USING fts5(
+    step UNINDEXED,
+    instruction,
+    window_title,
+    app_name,
+    input_text,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS step_text_sources (
+    id INTEGER PRIMARY KEY,
+    entry TEXT NOT NULL UNIQUE,
+    steps_mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class SearchHit:
+    path: str
+    name: str
+    step: int
+    snippet: str
+    rank: float
+
+
+def ensure_schema(conn: sqlite3.Connection) -> bool:
+    # Some SQLite builds come without FTS5; listing keeps working, only search is off.
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _INDEX_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS step_text; DROP TABLE IF EXISTS step_text_sources;")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def steps_mtime_ns(rec_dir: str) -> Optional[int]:
+    try:
+        with Recording(rec_dir) as rec:
+            return rec.mtime_ns(STEPS_NAME)
+    except ValueError:
+        return None
+
+
+def index_entry(conn: sqlite3.Connection, root: str, entry: str) -> None:
+    rec_dir = os.path.join(root, entry)
+    mtime_ns = steps_mtime_ns(rec_dir)
+    drop_entry(conn, entry)
+    if mtime_ns is None:
+        return
+    try:
+        with Recording(rec_dir) as rec:
+            events = rec.events
+    except (OSError, ValueError, AttributeError):
+        events = []
+
+    source_id = conn.execute(
+        "INSERT INTO step_text_sources (entry, steps_mtime_ns) VALUES (?, ?)", (entry, mtime_ns)
+    ).lastrowid
+    rows = []
+    # Numbered like the guide, so a hit's step is the one the exported guide shows.
+    for i, e in enumerate(guide_events(events)[: (1 << _STEP_BITS) - 1]):
+        values = [str(e.get(k) or "") for k in SEARCH_FIELDS]
+        if any(values):
+            rows.append(((source_id << _STEP_BITS) | (i + 1), i + 1, *values))
+    conn.executemany(
+        "INSERT INTO step_text (rowid, step, instruction, window_title, app_name, input_text) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def drop_entry(conn: sqlite3.Connection, entry: str) -> None:
+    row = conn.execute("SELECT id FROM step_text_sources WHERE entry = ?", (entry,)).fetchone()
+    if row is None:
+        return
+    first = row[0] << _STEP_BITS
+    conn.execute("DELETE FROM step_text WHERE rowid BETWEEN ? AND ?", (first, first + (1 << _STEP_BITS) - 1))
+    conn.execute("DELETE FROM step_text_sources WHERE id = ?", (row[0],))
+
+
+def match_expression(query: str) -> str:
+    # Every word must match, as a prefix ("va0" finds "VA01"); FTS syntax in user input is neutralised.
+    words = re.findall(r"\w+", query, flags=re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def search(conn: sqlite3.Connection, root: str, query: str, limit: int = 50) -> List[SearchHit]:
+    expr = match_expression(query)
+    if not expr:
+        return []
+    sql = f"""
+        SELECT src.entry, COALESCE(r.name, src.entry), s.step,
+               snippet(step_text, -1, '[', ']', '…', 10), bm25(step_text, {', '.join(map(str, _WEIGHTS))}) AS rank
+        FROM step_text AS s
+        JOIN step_text_sources AS src ON src.id = (s.rowid >> {_STEP_BITS})
+        LEFT JOIN recordings AS r ON r.entry = src.entry
+        WHERE step_text MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """
+    return [
+        SearchHit(path=os.path.join(root, entry), name=name, step=int(step), snippet=snip, rank=rank)
+        for entry, name, step, snip, rank in conn.execute(sql, (expr, limit))
+    ]
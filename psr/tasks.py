@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from psr import narrator
+from psr.archive import is_archive
+from psr.capture_policy import referenced_images, remove_orphaned_images
+from psr.catalog import notify_changed
+from psr.postprocess import narrate_steps, read_steps_json, write_steps_json
+from psr.layout import DOCX_NAME, HTML_NAME, PDF_NAME, STEPS_NAME
+from psr.recording import Recording
+from psr.recordings_store import read_meta, update_meta
+
+TASKS = ("narrate", "export")
+EXPORT_FORMATS = ("html", "docx", "pdf")
+_OUTPUT_NAMES = {"html": HTML_NAME, "docx": DOCX_NAME, "pdf": PDF_NAME}
+# Export options that change how an export runs, not what it produces.
+_RUNTIME_OPTIONS = ("variant_workers",)
+
+
+@dataclass
+class TaskResult:
+    path: str
+    status: Dict[str, str] = field(default_factory=dict)
+    steps: int = 0
+    pages: int = 0
+    bytes_written: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _exporter_sources(formats: Sequence[str]) -> List[str]:
+    from exporters import html_exporter
+
+    files = [html_exporter.__file__]
+    if "docx" in formats or "pdf" in formats:
+        from exporters import guide
+
+        files.append(guide.__file__)
+    if "docx" in formats:
+        from exporters import docx_exporter
+
+        files.append(docx_exporter.__file__)
+    if "pdf" in formats:
+        from exporters import pdf_exporter, pdf_writer
+
+        files += [pdf_exporter.__file__, pdf_writer.__file__]
+    return files
+
+
+def _export_formats(export_options: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(export_options.get("formats") or ("html",))
+
+
+def _task_sources(task: str, formats: Sequence[str]) -> List[str]:
+    return [narrator.__file__] if task == "narrate" else _exporter_sources(formats)
+
+
+def _task_inputs(path: str, task: str, formats: Sequence[str] = ("html",)) -> List[str]:
+    steps_path = os.path.join(path, STEPS_NAME)
+    if task == "narrate":
+        return [steps_path] + _task_sources(task, formats)
+
+    files = [steps_path] + _task_sources(task, formats)
+    try:
+        data = read_steps_json(path)
+    except Exception:
+        return files
+    return files + sorted(referenced_images(data.get("events") or [], path))
+
+
+def _fingerprint(files: Iterable[str], check: str) -> str:
+    if check == "mtime":
+        stamp = 0
+        for p in files:
+            try:
+                stamp = max(stamp, os.stat(p).st_mtime_ns)
+            except OSError:
+                pass
+        return str(stamp)
+
+    h = hashlib.sha1()
+    for p in files:
+        h.update(os.path.basename(p).encode("utf-8", "replace"))
+        try:
+            with open(p, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+        except OSError:
+            h.update(b"-")
+    return h.hexdigest()
+
+
+def _archive_fingerprint(path: str, task: str, formats: Sequence[str], check: str) -> str:
+    # Every write rewrites the archive, stamps included, so its mtime says nothing about the inputs;
+    # the CRCs in the zip index identify their content for free.
+    h = hashlib.sha1()
+    with Recording(path) as rec:
+        names = [STEPS_NAME]
+        if task == "export" and rec.has(STEPS_NAME):
+            shots = (rec.image_source(e.get("screenshot")) for e in rec.events if isinstance(e, dict))
+            names += sorted({src.name for src in shots if src})
+        for n in names:
+            info = rec.archive.info(n) if rec.has(n) else None
+            h.update(f"{n}\0{info.CRC if info else '-'}\0{info.file_size if info else '-'}\0".encode("utf-8"))
+    return f"{h.hexdigest()}:{_fingerprint(_task_sources(task, formats), check)}"
+
+
+def _stamp_key(task: str, check: str) -> str:
+    return f"{task}:{check}"
+
+
+def _task_fingerprint(path: str, task: str, check: str, export_options: Dict[str, Any]) -> str:
+    formats = _export_formats(export_options)
+    if is_archive(path):
+        fp = _archive_fingerprint(path, task, formats, check)
+    else:
+        fp = _fingerprint(_task_inputs(path, task, formats), check)
+    if task == "export":
+        opts = ",".join(f"{k}={export_options[k]}" for k in sorted(export_options) if k not in _RUNTIME_OPTIONS)
+        return f"{opts}:{fp}"
+    return fp
+
+
+def _has_output(path: str, name: str) -> bool:
+    with Recording(path) as rec:
+        return rec.has(name)
+
+
+def _is_up_to_date(path: str, task: str, check: str, export_options: Dict[str, Any], stamps: Dict[str, Any]) -> bool:
+    if task == "export" and not all(_has_output(path, _OUTPUT_NAMES[f]) for f in _export_formats(export_options)):
+        return False
+    old = stamps.get(_stamp_key(task, check))
+    return bool(old) and old == _task_fingerprint(path, task, check, export_options)
+
+
+def _narrate(path: str) -> Tuple[int, int, int]:
+    data = narrate_steps(read_steps_json(path))
+    out = write_steps_json(path, data)
+    remove_orphaned_images(path, data.get("events") or [])
+    return len(data.get("events") or []), os.path.getsize(out), 0
+
+
+def _export(path: str, export_options: Dict[str, Any], dest_dir: Optional[str] = None) -> Tuple[int, int, int]:
+    from exporters.html_exporter import export_html
+
+    formats = _export_formats(export_options)
+    html_options = {k: v for k, v in export_options.items() if k != "formats"}
+    dest = {f: os.path.join(dest_dir, _OUTPUT_NAMES[f]) if dest_dir else None for f in formats}
+    data = read_steps_json(path)
+    written = 0
+    if "html" in formats:
+        written += os.path.getsize(export_html(path, data=data, dest=dest["html"], **html_options))
+    if "docx" in formats:
+        from exporters.docx_exporter import export_docx
+
+        written += os.path.getsize(export_docx(path, data=data, image_workers=export_options.get("variant_workers"), dest=dest["docx"]))
+    pages = 0
+    if "pdf" in formats:
+        from exporters.pdf_exporter import export_pdf
+
+        counter = [0]
+        out = export_pdf(
+            path,
+            data=data,
+            image_workers=export_options.get("variant_workers"),
+            on_page=lambda n: counter.__setitem__(0, n),
+            dest=dest["pdf"],
+        )
+        written += os.path.getsize(out)
+        pages = counter[0]
+    return len(data.get("events") or []), written, pages
+
+
+def _export_archive(path: str, export_options: Dict[str, Any]) -> Tuple[int, int, int]:
+    # Outputs are written beside the archive first, then put into it with a single rewrite.
+    with tempfile.TemporaryDirectory(prefix="_export.", dir=os.path.dirname(path)) as tmp:
+        result = _export(path, export_options, tmp)
+        with Recording(path) as rec:
+            rec.archive.update({name: os.path.join(tmp, name) for name in sorted(os.listdir(tmp)) if name in _OUTPUT_NAMES.values()})
+    return result
+
+
+def run_tasks(
+    path: str,
+    tasks: Sequence[str],
+    check: str = "mtime",
+    force: bool = False,
+    export_options: Optional[Dict[str, Any]] = None,
+) -> TaskResult:
+    export_options = dict(export_options or {})
+    t0 = time.perf_counter()
+    result = TaskResult(path=path)
+    try:
+        stamps = dict(read_meta(path).get("stamps") or {})
+        for task in tasks:
+            if not force and _is_up_to_date(path, task, check, export_options, stamps):
+                result.status[task] = "skipped"
+                continue
+
+            if task == "narrate":
+                steps, written, pages = _narrate(path)
+            elif is_archive(path):
+                steps, written, pages = _export_archive(path, export_options)
+            else:
+                steps, written, pages = _export(path, export_options)
+            result.steps = max(result.steps, steps)
+            result.pages += pages
+            result.bytes_written += written
+            result.status[task] = "done"
+
+            for c in ("mtime", "hash"):
+                stamps.pop(_stamp_key(task, c), None)
+            stamps[_stamp_key(task, check)] = _task_fingerprint(path, task, check, export_options)
+            update_meta(path, {"stamps": stamps})
+        if "done" in result.status.values():
+            notify_changed(path)
+    except Exception as e:
+        result.error = str(e)
+        for task in tasks:
+            result.status.setdefault(task, "failed")
+    result.seconds = time.perf_counter() - t0
+    return result
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import base64
+import io
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Tuple
+
+from psr.archive import ArchiveMember
+from psr.catalog import CATALOG_DIR_NAME
+from psr.recording import GUIDE_KINDS, Recording
+
+# Next to the catalog, keyed by entry: writing into the recording folder would bump its mtime, which the
+# list shows and sorts by. The catalog drops an entry's thumbnails when it drops the entry.
+THUMBS_DIR_NAME = "thumbs"
+PREVIEW_SIZE = (200, 125)
+
+
+@dataclass
+class StepThumbnail:
+    number: int
+    text: str
+    # Changes whenever the thumbnail does; callers can cache decoded images under it.
+    key: Tuple[Any, ...]
+    # PNG file next to the recording, or base64 PNG for packed recordings (Tk reads both directly).
+    path: Optional[str] = None
+    data: Optional[str] = None
+
+
+def thumbs_root(rec_dir: str) -> str:
+    rec_dir = os.path.abspath(rec_dir).rstrip("/\\")
+    return os.path.join(os.path.dirname(rec_dir), CATALOG_DIR_NAME, THUMBS_DIR_NAME, os.path.basename(rec_dir))
+
+
+def thumbs_dir(rec_dir: str, size: Tuple[int, int] = PREVIEW_SIZE) -> str:
+    return os.path.join(thumbs_root(rec_dir), f"{size[0]}x{size[1]}")
+
+
+def drop_thumbnails(rec_dir: str) -> None:
+    shutil.rmtree(thumbs_root(rec_dir), ignore_errors=True)
+
+
+def _thumb_name(src: str, rec_dir: str) -> str:
+    rel = os.path.relpath(src, rec_dir).replace(os.sep, "_").replace("/", "_")
+    return os.path.splitext(rel)[0] + ".png"
+
+
+def _write_png(img: Any, path: str) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        img.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# Made on first use: PNGs in the catalog folder for folders, in-memory only for packed recordings.
+def step_thumbnails(
+    rec_path: str,
+    size: Tuple[int, int] = PREVIEW_SIZE,
+) -> Iterator[StepThumbnail]:
+    with Recording(rec_path) as rec:
+        out_dir = None if rec.packed else thumbs_dir(rec.path, size)
+        # Numbered like the guide, so the preview matches the exported steps and search hits.
+        guide = (step for step in rec.steps() if step.kind in GUIDE_KINDS)
+        for number, step in enumerate(guide, start=1):
+            src = rec.image_source(step.screenshot)
+            if not src:
+                continue
+            text = str(step.instruction or step.detail or "").strip()
+            try:
+                if isinstance(src, ArchiveMember):
+                    item = _archived_thumbnail(rec, src, size, number, text)
+                else:
+                    item = _stored_thumbnail(rec, src, out_dir, size, number, text)
+            except (OSError, ValueError):
+                # Unreadable or broken screenshot: the step is just left out of the preview.
+                continue
+            yield item
+
+
+def _archived_thumbnail(rec: Recording, src: ArchiveMember, size: Tuple[int, int], number: int, text: str) -> StepThumbnail:
+    buf = io.BytesIO()
+    rec.thumbnail(src, size).save(buf, "PNG", compress_level=1)
+    data = base64.b64encode(buf.getvalue()).decode("ascii")
+    return StepThumbnail(number, text, (rec.path, src.name, rec.mtime_ns(src.name)), data=data)
+
+
+def _stored_thumbnail(rec: Recording, src: str, out_dir: str, size: Tuple[int, int], number: int, text: str) -> StepThumbnail:
+    thumb = os.path.join(out_dir, _thumb_name(src, rec.path))
+    try:
+        stamp = os.stat(thumb).st_mtime_ns
+    except FileNotFoundError:
+        stamp = None
+    if stamp is None or stamp < os.stat(src).st_mtime_ns:
+        os.makedirs(out_dir, exist_ok=True)
+        _write_png(rec.thumbnail(src, size), thumb)
+        stamp = os.stat(thumb).st_mtime_ns
+    return StepThumbnail(number, text, (thumb, stamp), path=thumb)
@@ -0,0 +1,56 @@
+import json
+import os
+import re
+import shutil
+
+from PIL import Image
+
+from exporters.html_exporter import export_html
+from psr.archive import pack_recording, release_archive, shared_archive
+from psr.recordings_store import archive_recording, extract_recording
+
+
+def _referenced_files(html_path):
+    with open(html_path, encoding="utf-8") as f:
+        html = f.read()
+    refs = set(re.findall(r'(?:href|src)="((?:\.\./|images/|variants/)[^"]+)"', html))
+    for srcset in re.findall(r'"screenshot_srcset":\s*"([^"]*)"', html) + re.findall(r'srcset="([^"]*)"', html):
+        refs.update(part.split()[0] for part in srcset.split(",") if part.strip())
+    refs.update(re.findall(r'"screenshot":\s*"([^"]+)"', html))
+    return {r for r in refs if not r.startswith(("data:", "http"))}
+
+
+def test_external_export_survives_pack_and_unpack(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = os.path.join(str(tmp_path), "recordings")
+    rec = os.path.join(root, "Demo")
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (1600, 1000), "white").save(os.path.join(rec, "images", "a.png"))
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"}]}, f)
+    export_html(rec, mode="external")
+    before = _referenced_files(os.path.join(rec, "anleitung.html"))
+    assert any(r.startswith("variants/") for r in before)
+
+    packed = archive_recording(rec)
+    shutil.rmtree(os.path.join(root, "_static"))
+    unpacked = extract_recording(packed)
+
+    assert _referenced_files(os.path.join(unpacked, "anleitung.html")) == before
+    assert [r for r in sorted(before) if not os.path.isfile(os.path.join(unpacked, r))] == []
+
+
+def test_shared_archive_is_reused_until_the_file_changes(tmp_path):
+    rec = os.path.join(str(tmp_path), "Demo")
+    os.makedirs(rec)
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": []}, f)
+    packed = pack_recording(rec)
+
+    first = shared_archive(packed)
+    assert shared_archive(packed) is first
+    first.update({"extra.txt": b"x"})
+    second = shared_archive(packed)
+    assert "extra.txt" in second
+    release_archive(packed)
+    assert shared_archive(packed) is not second
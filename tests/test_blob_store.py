@@ -0,0 +1,95 @@
+import errno
+import json
+import os
+
+from PIL import Image
+
+from psr import recordings_store
+from psr.blob_store import BlobStore, dedupe_recording
+from psr.recordings_store import delete_recording, move_recording, read_meta
+from psr.retention import compact_images
+
+
+def _root(tmp_path, monkeypatch):
+    # The default recordings root (cwd/recordings) is also where BlobStore() keeps its blobs.
+    monkeypatch.chdir(tmp_path)
+    root = os.path.join(str(tmp_path), "recordings")
+    os.makedirs(root)
+    return root
+
+
+def _recording(root, name, color="white"):
+    rec = os.path.join(root, name)
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (64, 48), color).save(os.path.join(rec, "images", "a.png"))
+    events = [{"t": 1.0, "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"}]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+    assert dedupe_recording(rec).error is None
+    return rec
+
+
+def _blob(rec):
+    return BlobStore().blob_path(read_meta(rec)["blobs"]["images/a.png"])
+
+
+def _links(path):
+    return os.stat(path).st_nlink
+
+
+def test_delete_keeps_screenshots_shared_with_another_recording(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    a = _recording(root, "A")
+    b = _recording(root, "B")
+    blob = _blob(a)
+    assert _blob(b) == blob
+    assert _links(blob) == 3
+
+    delete_recording(a)
+
+    assert not os.path.exists(a)
+    assert _links(blob) == 2
+    with Image.open(os.path.join(b, "images", "a.png")) as img:
+        assert img.size == (64, 48)
+
+    delete_recording(b)
+    assert not os.path.exists(blob)
+
+
+def test_move_to_another_volume_releases_the_blobs(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    a = _recording(root, "A")
+    b = _recording(root, "B")
+    blob = _blob(a)
+    real_rename = os.rename
+
+    def rename(src, dst):
+        if os.path.abspath(src) == os.path.abspath(a):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return real_rename(src, dst)
+
+    monkeypatch.setattr(recordings_store.os, "rename", rename)
+    moved = move_recording(a, os.path.join(str(tmp_path), "elsewhere"))
+
+    assert not os.path.exists(a)
+    assert _links(os.path.join(moved, "images", "a.png")) == 1
+    assert read_meta(moved)["blobs"] == {}
+    assert _links(blob) == 2
+    assert os.path.samefile(os.path.join(b, "images", "a.png"), blob)
+
+
+def test_compact_images_leaves_other_recordings_links_alone(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    a = _recording(root, "A")
+    b = _recording(root, "B")
+    blob = _blob(a)
+
+    assert compact_images(a) == 1
+
+    assert not os.path.exists(os.path.join(a, "images", "a.png"))
+    assert read_meta(a)["blobs"] == {}
+    assert _links(blob) == 2
+    assert os.path.samefile(os.path.join(b, "images", "a.png"), blob)
+
+    assert compact_images(b) == 1
+    assert not os.path.exists(blob)
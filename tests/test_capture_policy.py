@@ -0,0 +1,36 @@
+import os
+
+from psr.capture_policy import CAPTURE_NEW, CAPTURE_SHARE, CapturePlanner, remove_orphaned_images
+
+
+def test_share_window_starts_at_the_capture():
+    planner = CapturePlanner(share_window_ms=250)
+    planner.observe("key_press", 0.0, "a.png", key="tab", monitor_index=0)
+    for t in (0.1, 0.2):
+        plan = planner.plan("key_press", t, key="tab", monitor_index=0)
+        assert (plan.action, plan.screenshot) == (CAPTURE_SHARE, "a.png")
+        planner.observe("key_press", t, plan.screenshot, key="tab", monitor_index=0)
+    assert planner.plan("key_press", 0.3, key="tab", monitor_index=0).action == CAPTURE_NEW
+
+
+def test_click_marker_is_not_shared():
+    planner = CapturePlanner(share_window_ms=250)
+    planner.observe("mouse_click", 0.0, "click.png", monitor_index=0, marked=True)
+    assert planner.plan("key_press", 0.1, key="tab", monitor_index=0).action == CAPTURE_NEW
+
+
+def test_orphan_cleanup_keeps_every_referenced_image(tmp_path):
+    rec = str(tmp_path)
+    img_dir = os.path.join(rec, "images")
+    os.makedirs(img_dir)
+    for name in ("abs.png", "win.png", "moved.png", "orphan.png"):
+        open(os.path.join(img_dir, name), "wb").close()
+    events = [
+        {"kind": "mouse_click", "screenshot": os.path.join(img_dir, "abs.png")},
+        {"kind": "mouse_click", "screenshot": "images\\win.png"},
+        # Recorded on another machine: does not resolve here, but names a file that is here.
+        {"kind": "mouse_click", "screenshot": "C:\\Users\\x\\recordings\\Demo\\images\\moved.png"},
+    ]
+
+    assert remove_orphaned_images(rec, events) == 1
+    assert sorted(os.listdir(img_dir)) == ["abs.png", "moved.png", "win.png"]
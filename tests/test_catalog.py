@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+
+from psr import catalog
+from psr.catalog import get_catalog
+from psr.recordings_store import create_recording_dir, search_recordings
+
+
+def _write_steps(rec, text):
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick", "instruction": text}]}, f)
+
+
+def test_refresh_sees_steps_json_written_after_the_folder(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # The folder is registered (without steps) when it is created; steps.json only comes with the stop.
+    recs = [create_recording_dir("Eins"), create_recording_dir("Zwei")]
+    for rec in recs:
+        _write_steps(rec, "Klicken Sie auf Speichern")
+
+    cat = get_catalog()
+    cat.refresh()
+
+    assert sorted((it.name, it.has_steps) for it in cat.query()) == [("Eins", True), ("Zwei", True)]
+    assert sorted(hit.name for hit in search_recordings("speichern")) == ["Eins", "Zwei"]
+
+
+def test_plain_refresh_reads_only_what_changed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    done = create_recording_dir("Fertig")
+    _write_steps(done, "Klicken Sie auf OK")
+    running = create_recording_dir("Läuft")
+    cat = get_catalog()
+    cat.refresh(deep=True)
+
+    reads, scans = [], []
+    real_read, real_scandir = catalog.read_recording_row, os.scandir
+    monkeypatch.setattr(catalog, "read_recording_row", lambda root, entry, *a: reads.append(entry) or real_read(root, entry, *a))
+    monkeypatch.setattr(catalog.os, "scandir", lambda p: scans.append(p) or real_scandir(p))
+
+    # Nothing added or removed: no listing, and the recording without steps.json is only checked for it.
+    assert cat.refresh() == 0
+    assert (reads, scans) == ([], [])
+
+    _write_steps(running, "Klicken Sie auf Speichern")
+    assert cat.refresh() == 1
+    assert (reads, scans) == (["Läuft"], [])
+
+    # An export that did not tell the catalog: only a deep refresh looks inside the folders.
+    with open(os.path.join(done, "anleitung.html"), "w", encoding="utf-8") as f:
+        f.write("<html></html>")
+    os.utime(done, ns=(1, 1))
+    cat.refresh()
+    assert not [it for it in cat.query() if it.has_html]
+    cat.refresh(deep=True)
+    assert [it.name for it in cat.query() if it.has_html] == ["Fertig"]
+
+
+def test_plain_refresh_sees_added_and_removed_recordings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gone = create_recording_dir("Alt")
+    cat = get_catalog()
+    cat.refresh()
+
+    shutil.rmtree(gone)
+    os.makedirs(os.path.join(cat.root, "Neu"))
+    cat.refresh()
+
+    assert [it.name for it in cat.query()] == ["Neu"]
@@ -0,0 +1,43 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from psr.archive import pack_recording
+from psr.cli import _resolve_targets
+from psr.recordings_store import create_recording_dir
+
+
+def _recording(name, steps=True):
+    rec = create_recording_dir(name)
+    if steps:
+        with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+            json.dump({"events": []}, f)
+    return rec
+
+
+def _packed(name):
+    rec = _recording(name)
+    packed = pack_recording(rec)
+    shutil.rmtree(rec)
+    return packed
+
+
+def test_default_targets_are_the_recordings_with_steps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rec = _recording("Mit")
+    _recording("Ohne", steps=False)
+    packed = _packed("Gepackt")
+
+    assert sorted(_resolve_targets(())) == sorted([rec, packed])
+
+
+def test_named_targets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    rec = _recording("Demo")
+    packed = _packed("Archiv")
+
+    assert _resolve_targets(["Demo", "Archiv", os.path.relpath(rec)]) == [rec, packed, rec]
+    with pytest.raises(SystemExit):
+        _resolve_targets(["Fehlt"])
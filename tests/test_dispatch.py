@@ -0,0 +1,46 @@
+import multiprocessing as mp
+import threading
+
+from gui.dispatch import TkDispatcher, read_connection
+
+
+class _Root:
+    # Stands in for Tk: `after` fails until mainloop "runs", then hands the callback over.
+    def __init__(self):
+        self.running = False
+        self.refused = threading.Event()
+        self.scheduled = threading.Event()
+        self.callback = None
+
+    def after(self, ms, fn):
+        if not self.running:
+            self.refused.set()
+            raise RuntimeError("main thread is not in main loop")
+        self.callback = fn
+        self.scheduled.set()
+
+
+def test_reader_keeps_going_when_tk_is_not_ready():
+    root = _Root()
+    dispatcher = TkDispatcher(root)
+    received = []
+    parent, child = mp.Pipe()
+    reader = read_connection(parent, dispatcher, received.append)
+
+    child.send({"type": "ready"})
+    assert root.refused.wait(5)
+    root.running = True
+    # No further message: the reader itself has to retry the wake-up.
+    assert root.scheduled.wait(5)
+    root.scheduled.clear()
+    root.callback()
+    assert received == [{"type": "ready"}]
+
+    child.send({"type": "pong"})
+    assert root.scheduled.wait(5)
+    root.callback()
+    assert received == [{"type": "ready"}, {"type": "pong"}]
+
+    child.close()
+    reader.join(5)
+    assert not reader.is_alive()
@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+from docx import Document
+from PIL import Image
+
+from exporters import docx_exporter
+
+
+class _ChangedInline:
+    # A python-docx release where new_pic_inline takes other arguments.
+    @staticmethod
+    def new_pic_inline(shape_id, r_id, filename, cx, cy, extra):
+        raise AssertionError("not called with the old arguments")
+
+
+@pytest.mark.parametrize("internals", ["current", "missing", "changed"])
+def test_pictures_with_and_without_docx_internals(tmp_path, monkeypatch, internals):
+    if internals == "missing":
+        monkeypatch.setattr(docx_exporter, "CT_Inline", None)
+    elif internals == "changed":
+        monkeypatch.setattr(docx_exporter, "CT_Inline", _ChangedInline)
+    rec = str(tmp_path)
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (320, 200), "white").save(os.path.join(rec, "images", "a.png"))
+    events = [{"t": float(i), "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"} for i in range(3)]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+
+    doc = Document(docx_exporter.export_docx(rec))
+
+    assert len(doc.inline_shapes) == 3
+    assert len([p for p in doc.part.package.parts if p.partname.startswith("/word/media/")]) == 1
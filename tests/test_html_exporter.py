@@ -0,0 +1,133 @@
+import base64
+import json
+import os
+import re
+import shutil
+
+from exporters import html_exporter
+from exporters.html_exporter import export_html
+from psr.layout import EXPORT_CACHE_DIR_NAME, VARIANTS_DIR_NAME
+from psr.recording import Recording
+
+_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de"
+    "0000000c4944415408d763f8cfc0000003010100c9fe92ef0000000049454e44ae426082"
+)
+
+
+def _recording(root, steps):
+    os.makedirs(os.path.join(root, "images"))
+    events = []
+    for i in range(steps):
+        rel = f"images/s{i}.png"
+        with open(os.path.join(root, rel), "wb") as f:
+            f.write(_PNG + bytes([i]))
+        events.append({"t": float(i), "kind": "mouse_click", "detail": "Klick", "instruction": f"Schritt {i}", "screenshot": rel})
+    data = {"events": events}
+    with open(os.path.join(root, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return data
+
+
+def _embedded_data(html_path):
+    with open(html_path, encoding="utf-8") as f:
+        html = f.read()
+    return re.search(r'<script id="initialData" type="application/json">(.*?)</script>', html, re.S).group(1)
+
+
+def test_reexport_encodes_only_the_changed_step(tmp_path, monkeypatch):
+    rec = os.path.join(str(tmp_path), "Demo")
+    data = _recording(rec, 5)
+    export_html(rec, data=data)
+
+    encoded = []
+    real_chunks = Recording.image_chunks
+    monkeypatch.setattr(Recording, "image_chunks", lambda self, src, size: encoded.append(src) or real_chunks(self, src, size))
+    data["events"][2]["instruction"] = "Geändert"
+    os.utime(os.path.join(rec, "images", "s4.png"), ns=(1, 1))
+    html = export_html(rec, data=data)
+
+    assert sorted(os.path.basename(p) for p in encoded) == ["s2.png", "s4.png"]
+    cached = _embedded_data(html)
+    shutil.rmtree(os.path.join(rec, EXPORT_CACHE_DIR_NAME))
+    assert _embedded_data(export_html(rec, data=data)) == cached
+
+
+def test_streamed_screenshot_decodes_to_the_original_bytes(tmp_path, monkeypatch):
+    rec = os.path.join(str(tmp_path), "Demo")
+    data = _recording(rec, 1)
+    png = _PNG + os.urandom(10_000)
+    with open(os.path.join(rec, "images", "s0.png"), "wb") as f:
+        f.write(png)
+    data["events"][0]["instruction"] = 'Eingabe "</script><script>alert(1)</script>"'
+    # Several chunks per image, so the test covers the seams between them.
+    monkeypatch.setattr(html_exporter, "_B64_CHUNK", 3 * 1000)
+
+    raw = _embedded_data(export_html(rec, data=data))
+
+    assert "</" not in raw
+    event = json.loads(raw)["events"][0]
+    assert event["instruction"] == data["events"][0]["instruction"]
+    prefix = "data:image/png;base64,"
+    assert event["screenshot"].startswith(prefix)
+    assert base64.b64decode(event["screenshot"][len(prefix):], validate=True) == png
+
+
+def _noisy_recording(root, steps):
+    # Random pixels barely compress, so the originals are far over any small budget.
+    from PIL import Image
+
+    data = _recording(root, steps)
+    for i in range(steps):
+        Image.frombytes("RGB", (320, 240), os.urandom(320 * 240 * 3)).save(os.path.join(root, "images", f"s{i}.png"))
+    return data
+
+
+def test_size_budget_is_met(tmp_path):
+    rec = os.path.join(str(tmp_path), "Demo")
+    data = _noisy_recording(rec, 4)
+    budget_mb = 0.4
+
+    html = export_html(rec, data=data, max_size_mb=budget_mb, variant_workers=1)
+
+    assert os.path.getsize(html) <= budget_mb * 1024 * 1024
+    settings = json.loads(_embedded_data(html))["export_settings"]
+    assert settings["budget_met"] is True
+    assert settings["image_format"] == "JPEG"
+
+
+def test_size_budget_out_of_reach_is_reported(tmp_path):
+    rec = os.path.join(str(tmp_path), "Demo")
+    data = _noisy_recording(rec, 4)
+
+    html = export_html(rec, data=data, max_size_mb=0.02, variant_workers=1)
+
+    settings = json.loads(_embedded_data(html))["export_settings"]
+    assert settings["budget_met"] is False
+    assert os.path.getsize(html) > 0.02 * 1024 * 1024
+
+
+def test_external_export_writes_srcset_variants_and_prunes_stale_ones(tmp_path):
+    from PIL import Image
+
+    root = os.path.join(str(tmp_path), "recordings")
+    rec = os.path.join(root, "Demo")
+    data = _recording(rec, 1)
+    shot = os.path.join(rec, "images", "s0.png")
+    Image.new("RGB", (1600, 900), "white").save(shot)
+
+    event = json.loads(_embedded_data(export_html(rec, data=data, mode="external", variant_workers=1)))["events"][0]
+    first = sorted(os.listdir(os.path.join(rec, VARIANTS_DIR_NAME)))
+    by_width = {int(name.rsplit("_", 1)[1].split(".")[0]): name for name in first}
+
+    assert sorted(by_width) == [640, 1120]
+    assert event["screenshot_srcset"] == (
+        f"{VARIANTS_DIR_NAME}/{by_width[640]} 640w, {VARIANTS_DIR_NAME}/{by_width[1120]} 1120w, images/s0.png 1600w"
+    )
+
+    Image.new("RGB", (1600, 900), "black").save(shot)
+    export_html(rec, data=data, mode="external", variant_workers=1)
+    second = sorted(os.listdir(os.path.join(rec, VARIANTS_DIR_NAME)))
+
+    assert len(second) == 2
+    assert not set(first) & set(second)
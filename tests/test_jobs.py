@@ -0,0 +1,36 @@
+import threading
+
+from psr.recordings_store import JobQueue
+
+
+def test_cancel_stops_the_running_job_and_skips_queued_ones(tmp_path, monkeypatch):
+    # The worker empties the trash of the default recordings root (cwd/recordings) on start.
+    monkeypatch.chdir(tmp_path)
+    events = []
+    done = threading.Event()
+    started = threading.Event()
+
+    def on_event(ev):
+        events.append((ev.job_id, ev.state))
+        if ev.job_id == 2 and ev.state in ("done", "cancelled", "failed"):
+            done.set()
+
+    def long_job(job):
+        started.set()
+        while True:
+            job.check()
+            job.report(0, "läuft")
+
+    ran = []
+    jobs = JobQueue(on_event=on_event)
+    running = jobs.submit("export", long_job)
+    queued = jobs.submit("export", lambda job: ran.append(job.id))
+    assert started.wait(5)
+
+    jobs.cancel()
+    assert done.wait(5)
+    jobs.shutdown()
+
+    assert (running.id, "cancelled") in events
+    assert [s for i, s in events if i == queued.id] == ["queued", "cancelled"]
+    assert ran == []
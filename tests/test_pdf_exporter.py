@@ -0,0 +1,51 @@
+import json
+import os
+
+from PIL import Image
+from reportlab import rl_config
+
+from exporters.pdf_exporter import export_pdf
+
+
+def test_export_leaves_reportlab_settings_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(rl_config, "useA85", 1)
+    rec = str(tmp_path)
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (320, 200), "white").save(os.path.join(rec, "images", "a.png"))
+    events = [{"t": float(i), "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"} for i in range(3)]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+
+    with open(export_pdf(rec), "rb") as f:
+        pdf = f.read()
+
+    assert b"/ASCII85Decode" not in pdf
+    assert rl_config.useA85 == 1
+
+
+def test_pages_are_written_as_they_finish(tmp_path):
+    rec = str(tmp_path)
+    os.makedirs(os.path.join(rec, "images"))
+    for name, color in (("a.png", "white"), ("b.png", "black")):
+        Image.new("RGB", (1600, 1000), color).save(os.path.join(rec, "images", name))
+    events = [
+        {"t": float(i), "kind": "mouse_click", "detail": "Klick (links)", "screenshot": f"images/{'ab'[i % 2]}.png"}
+        for i in range(6)
+    ]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+
+    sizes = []
+    tmp = os.path.join(rec, "anleitung.pdf.%d.tmp" % os.getpid())
+    path = export_pdf(rec, on_page=lambda n: sizes.append(os.path.getsize(tmp)))
+    with open(path, "rb") as f:
+        pdf = f.read()
+
+    # Each finished page is already in the file before the next one is laid out.
+    assert len(sizes) >= 3 and sizes == sorted(sizes) and sizes[0] > 0
+    assert pdf.count(b"/Subtype /Image") == 2
+    xref = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n", 1)[0])
+    entries = pdf[xref:].split(b"trailer", 1)[0].splitlines()[3:]
+    for num, entry in enumerate(entries, start=1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj" % num)
@@ -0,0 +1,64 @@
+import json
+import os
+
+from psr.postprocess import PostProcessPipeline, build_postprocess_pipeline
+
+
+def _data():
+    return {"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick bei (10, 20)"}], "monitors": []}
+
+
+def test_stages_run_in_order_on_the_narrated_data(tmp_path):
+    rec = str(tmp_path)
+    seen = []
+
+    def exporter(name):
+        def export(out_dir, data=None, **opts):
+            # steps.json is already written, narrated, when the exports run.
+            with open(os.path.join(out_dir, "steps.json"), encoding="utf-8") as f:
+                seen.append((name, data["events"][0]["instruction"], json.load(f)["events"][0]["instruction"]))
+            return name
+
+        return export
+
+    pipe = build_postprocess_pipeline(rec, export_html=exporter("html"), export_docx=exporter("docx"), export_pdf=exporter("pdf"))
+    stages = []
+    result = pipe.run(_data(), on_stage=lambda name, i, total: stages.append((name, i, total)))
+
+    names = ["narrate", "save_steps", "cleanup_images", "export_html", "export_docx", "export_pdf"]
+    assert pipe.stage_names == names
+    assert stages == [(name, i, len(names)) for i, name in enumerate(names)]
+    assert [name for name, _, _ in seen] == ["html", "docx", "pdf"]
+    assert all(instruction and instruction == saved for _, instruction, saved in seen)
+    assert result.errors == {}
+    assert list(result.timings_ms) == names
+    assert result.outputs["export_pdf"] == "pdf"
+
+
+def test_failed_stage_is_reported_and_the_rest_still_runs():
+    ran = []
+
+    def fail(data):
+        raise RuntimeError("kaputt")
+
+    pipe = PostProcessPipeline().add_stage("a", fail).add_stage("b", lambda d: ran.append("b"))
+    result = pipe.run({})
+
+    assert result.errors == {"a": "kaputt"}
+    assert ran == ["b"]
+    assert set(result.timings_ms) == {"a", "b"}
+
+
+def test_failed_required_stage_stops_the_pipeline():
+    ran = []
+
+    def fail(data):
+        raise OSError("Datenträger voll")
+
+    pipe = PostProcessPipeline().add_stage("save", fail, required=True).add_stage("export", lambda d: ran.append("export"))
+    result = pipe.run({})
+
+    assert result.errors == {"save": "Datenträger voll"}
+    assert ran == []
+    assert list(result.timings_ms) == ["save"]
+    assert "export" not in result.outputs
@@ -0,0 +1,118 @@
+import json
+import multiprocessing as mp
+import os
+import sys
+import threading
+import types
+
+import gui.recorder_process as recorder_process
+
+
+class _Recorder:
+    # Stands in for PSRLikeRecorder, which needs a display and input hooks.
+    created = []
+
+    def __init__(self, out_dir, **kwargs):
+        self.created.append(kwargs)
+        self.out_dir = out_dir
+        self.running = False
+        self.monitors = []
+        self.enable_video = bool(kwargs.get("enable_video"))
+        self.screenshot_delay_ms = int(kwargs.get("screenshot_delay_ms", 0))
+        self.record_text_input = bool(kwargs.get("record_text_input", True))
+
+    def _on_click(self, x, y, button, pressed):
+        pass
+
+    def start(self):
+        self.running = True
+
+    def stop(self, save=True):
+        self.running = False
+
+    def steps_payload(self):
+        return {"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick"}], "monitors": []}
+
+
+def _recv(conn, kind):
+    while True:
+        msg = conn.recv()
+        if msg.get("type") == kind:
+            return msg
+
+
+def test_steps_json_is_on_disk_before_the_export_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(sys.modules, "psr.recorder", types.SimpleNamespace(PSRLikeRecorder=_Recorder))
+    release = threading.Event()
+
+    def blocked_pipeline(*args, **kwargs):
+        release.wait(10)
+        raise RuntimeError("export not wanted here")
+
+    monkeypatch.setattr(recorder_process, "build_postprocess_pipeline", blocked_pipeline)
+    parent, child = mp.Pipe()
+    worker = threading.Thread(target=recorder_process.recorder_worker, args=(child, {}), daemon=True)
+    worker.start()
+    _recv(parent, "ready")
+
+    parent.send({"type": "start", "out_dir": "Demo"})
+    out_dir = _recv(parent, "started")["out_dir"]
+    parent.send({"type": "stop"})
+    _recv(parent, "stopped")
+
+    with open(os.path.join(out_dir, "steps.json"), encoding="utf-8") as f:
+        assert json.load(f)["events"][0]["detail"] == "Klick"
+    release.set()
+    parent.send({"type": "quit"})
+    _recv(parent, "quit_ack")
+    worker.join(10)
+    assert not worker.is_alive()
+
+
+def test_reconfigure_applies_to_the_next_start(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(sys.modules, "psr.recorder", types.SimpleNamespace(PSRLikeRecorder=_Recorder))
+    monkeypatch.setattr(_Recorder, "created", [])
+
+    def no_export(*args, **kwargs):
+        raise RuntimeError("export not wanted here")
+
+    monkeypatch.setattr(recorder_process, "build_postprocess_pipeline", no_export)
+    config = {"video_fps": 8, "screenshot_delay_ms": 0, "record_text_input": True}
+    parent, child = mp.Pipe()
+    worker = threading.Thread(target=recorder_process.recorder_worker, args=(child, config), daemon=True)
+    worker.start()
+    _recv(parent, "ready")
+
+    parent.send({"type": "start", "out_dir": "Eins"})
+    _recv(parent, "started")
+    parent.send({"type": "reconfigure", "config": {"video_fps": 4, "screenshot_delay_ms": 250, "bogus": 1}})
+    while_running = _recv(parent, "reconfigured")
+    parent.send({"type": "stop"})
+    _recv(parent, "stopped")
+    parent.send({"type": "reconfigure", "config": {"record_text_input": False, "screenshot_on_keys": ["enter"]}})
+    while_stopped = _recv(parent, "reconfigured")
+
+    assert while_running["applies"] == "next_start"
+    assert while_stopped["applies"] == "now"
+    assert set(while_running["config"]) == set(recorder_process._RECONFIGURABLE_KEYS)
+    assert (while_running["config"]["video_fps"], while_running["config"]["screenshot_delay_ms"]) == (4, 250)
+    assert "bogus" not in config
+
+    parent.send({"type": "start", "out_dir": "Zwei"})
+    started = _recv(parent, "started")
+    first, second = _Recorder.created
+    assert (first["video_fps"], first["screenshot_delay_ms"], first["record_text_input"]) == (8, 0, True)
+    assert second["video_fps"] == 4
+    assert second["screenshot_delay_ms"] == 250
+    assert second["record_text_input"] is False
+    assert second["screenshot_on_keys"] == ("enter",)
+    assert (started["delay_ms"], started["record_text_input"]) == (250, False)
+
+    parent.send({"type": "stop"})
+    _recv(parent, "stopped")
+    parent.send({"type": "quit"})
+    _recv(parent, "quit_ack")
+    worker.join(10)
+    assert not worker.is_alive()
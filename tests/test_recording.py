@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from psr.archive import pack_recording
+from psr.recording import Recording, thumbnail_cache
+
+
+def _recording(root):
+    rec = os.path.join(root, "Demo")
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (800, 500), "white").save(os.path.join(rec, "images", "a.png"))
+    events = [
+        {"t": 1.0, "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png", "bounds": [0, 0, 800, 500]},
+        "kaputt",
+        {"t": 2.0, "kind": "text_input", "detail": "Text", "input_text": "hallo"},
+    ]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+    with open(os.path.join(rec, "recording.meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": "Meine Anleitung"}, f)
+    return rec
+
+
+def test_files_are_read_on_first_use(tmp_path):
+    rec = _recording(str(tmp_path))
+    with Recording(rec) as r:
+        os.remove(os.path.join(rec, "steps.json"))
+        # Nothing was read yet, so the meta still loads and steps.json is missed only when asked for.
+        assert r.name == "Meine Anleitung"
+        with pytest.raises(FileNotFoundError):
+            r.data
+
+
+def test_steps_are_typed_and_keep_unknown_keys(tmp_path):
+    with Recording(_recording(str(tmp_path))) as r:
+        steps = list(r.steps())
+
+    assert [(s.index, s.kind) for s in steps] == [(0, "mouse_click"), (2, "text_input")]
+    assert steps[0].screenshot == "images/a.png"
+    assert steps[0].extra == {"bounds": [0, 0, 800, 500]}
+    assert steps[1].input_text == "hallo"
+
+
+def test_screenshots_outside_the_recording_are_not_resolved(tmp_path):
+    rec = _recording(str(tmp_path))
+    Image.new("RGB", (8, 8)).save(os.path.join(str(tmp_path), "outside.png"))
+    with Recording(rec) as r:
+        assert r.image_source("images/a.png") == os.path.join(rec, "images", "a.png")
+        assert r.image_source("../outside.png") is None
+        assert r.image_source("images/missing.png") is None
+
+
+def test_packed_images_stream_the_same_bytes(tmp_path):
+    rec = _recording(str(tmp_path))
+    with open(os.path.join(rec, "images", "a.png"), "rb") as f:
+        original = f.read()
+    packed = pack_recording(rec)
+
+    with Recording(packed) as r:
+        assert r.packed
+        assert [s.kind for s in r.steps()] == ["mouse_click", "text_input"]
+        src = r.image_source("images/a.png")
+        # Archive chunks are views into the mapping, valid only inside the loop.
+        assert b"".join(bytes(chunk) for chunk in r.image_chunks(src, 1000)) == original
+        assert r.image_source("images/missing.png") is None
+
+
+def test_thumbnails_are_cached_until_the_file_changes(tmp_path):
+    rec = _recording(str(tmp_path))
+    shot = os.path.join(rec, "images", "a.png")
+    thumbnail_cache.clear()
+    with Recording(rec) as r:
+        first = r.thumbnail(shot)
+        assert max(first.size) <= 320
+        assert r.thumbnail(shot) is first
+
+        Image.new("RGB", (800, 500), "black").save(shot)
+        os.utime(shot, ns=(1, 1))
+        second = r.thumbnail(shot)
+
+    assert second is not first
+    assert second.getpixel((0, 0)) == (0, 0, 0)
@@ -0,0 +1,176 @@
+import queue
+import threading
+
+import gui.app as app
+from psr.recordings_store import RecordingItem
+
+
+class _Tree:
+    # Stands in for the ttk.Treeview: rows in order, values by iid, and a count of inserts.
+    def __init__(self):
+        self.rows = []
+        self.values = {}
+        self.inserts = 0
+        self.selected = ()
+
+    def insert(self, parent, index, iid=None, values=(), tags=()):
+        self.inserts += 1
+        self.rows.insert(len(self.rows) if index == "end" else index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+
+    def exists(self, iid):
+        return iid in self.values
+
+    def item(self, iid, option=None, values=None):
+        if values is not None:
+            self.values[iid] = tuple(values)
+        return self.values[iid]
+
+    def index(self, iid):
+        return self.rows.index(iid)
+
+    def move(self, iid, parent, index):
+        self.rows.remove(iid)
+        self.rows.insert(index, iid)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.rows.remove(iid)
+            del self.values[iid]
+
+    def get_children(self, item=""):
+        return tuple(self.rows)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+    def see(self, iid):
+        pass
+
+
+class _Var:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class _Dispatch:
+    def __init__(self):
+        self.posted = []
+        self.done = threading.Event()
+
+    def post(self, fn, *args):
+        self.posted.append((fn.__name__, args))
+        if fn.__name__ != "_apply_listing_batch" or args[-1]:
+            self.done.set()
+
+
+def _gui():
+    # The listing state of RecorderGUI.__init__, without a Tk root.
+    gui = app.RecorderGUI.__new__(app.RecorderGUI)
+    gui.tree = _Tree()
+    gui.status_var = _Var()
+    gui.var_search = _Var()
+    gui._search_after = None
+    gui._dispatch = _Dispatch()
+    gui._list_requests = queue.Queue()
+    gui._list_generation = 0
+    gui._list_wanted = app._LIST_PAGE_SIZE
+    gui._list_loaded = 0
+    gui._list_total = 0
+    gui._list_loading = False
+    gui._list_seen = set()
+    gui._list_reload = False
+    gui._pending_select = None
+    gui._tree_mode = "list"
+    return gui
+
+
+def _item(name, ts=0.0):
+    return RecordingItem(name=name, path=f"/rec/{name}", created_ts=ts, has_steps=True, has_html=False)
+
+
+def test_loader_reads_the_page_in_batches_off_the_tk_thread(monkeypatch):
+    items = [_item(f"R{i:03}") for i in range(120)]
+    calls = []
+
+    def page(offset, limit, deep=False):
+        calls.append((offset, limit, threading.current_thread().name))
+        return items[offset : offset + limit], len(items)
+
+    monkeypatch.setattr(app, "list_recordings_page", page)
+    gui = _gui()
+    threading.Thread(target=gui._list_loader, name="recordings-list", daemon=True).start()
+
+    gui.refresh_recordings()
+
+    assert gui._dispatch.done.wait(5)
+    assert [(o, n) for o, n, _ in calls] == [(0, 50), (50, 50), (100, 50)]
+    assert {name for _, _, name in calls} == {"recordings-list"}
+    batches = [args for fn, args in gui._dispatch.posted]
+    assert [(offset, len(batch), last) for _, offset, batch, _, last in batches] == [(0, 50, False), (50, 50, False), (100, 20, True)]
+    assert gui.tree.rows == []
+
+
+def test_batches_are_applied_as_a_diff():
+    gui = _gui()
+    for name in ("A", "B", "C"):
+        gui.tree.insert("", "end", iid=f"/rec/{name}", values=(name, "", "", ""))
+    gui.tree.inserts = 0
+
+    gui._request_listing(0, app._LIST_PAGE_SIZE, False)
+    gui._apply_listing_batch(gui._list_generation, 0, [_item("C"), _item("A")], 2, False)
+    gui._apply_listing_batch(gui._list_generation, 2, [_item("D")], 3, True)
+
+    assert gui.tree.rows == ["/rec/C", "/rec/A", "/rec/D"]
+    assert gui.tree.inserts == 1
+    assert gui.tree.values["/rec/C"][2] == "✓"
+    assert gui._list_loaded == 3
+    assert not gui._list_loading
+
+
+def test_outdated_batches_are_dropped():
+    gui = _gui()
+    gui._request_listing(0, app._LIST_PAGE_SIZE, False)
+    old = gui._list_generation
+    gui._request_listing(0, app._LIST_PAGE_SIZE, False)
+
+    gui._apply_listing_batch(old, 0, [_item("A")], 1, True)
+    assert gui.tree.rows == []
+
+    gui._apply_listing_batch(gui._list_generation, 0, [_item("B")], 1, True)
+    assert gui.tree.rows == ["/rec/B"]
+
+
+def test_next_page_is_requested_after_the_first_one():
+    gui = _gui()
+    gui._request_listing(0, app._LIST_PAGE_SIZE, False)
+    gui._list_requests.get_nowait()
+    page = [_item(f"R{i:03}") for i in range(app._LIST_PAGE_SIZE)]
+    gui._apply_listing_batch(gui._list_generation, 0, page, 500, True)
+
+    gui._load_more_recordings()
+
+    _, offset, limit, _, query = gui._list_requests.get_nowait()
+    assert (offset, limit, query) == (app._LIST_PAGE_SIZE, app._LIST_PAGE_SIZE, None)
+    assert len(gui.tree.rows) == app._LIST_PAGE_SIZE
+
+
+def test_selection_waits_for_its_row():
+    gui = _gui()
+    gui._pending_select = "/rec/B"
+    gui._request_listing(0, app._LIST_PAGE_SIZE, False)
+
+    gui._apply_listing_batch(gui._list_generation, 0, [_item("A"), _item("B")], 2, True)
+
+    assert gui.tree.selected == ("/rec/B",)
+    assert gui._pending_select is None
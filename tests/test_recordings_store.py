@@ -0,0 +1,25 @@
+import json
+import os
+
+from exporters.html_exporter import export_html, static_assets_dir
+from psr.recordings_store import move_recording
+
+
+def test_moved_external_export_keeps_its_assets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = os.path.join(str(tmp_path), "recordings")
+    rec = os.path.join(root, "Demo")
+    os.makedirs(rec)
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick"}]}, f)
+    export_html(rec, mode="external")
+    old_assets = sorted(os.listdir(static_assets_dir(rec)))
+    # Left by an older editor version: only a copy from the old place can bring it back.
+    with open(os.path.join(static_assets_dir(rec), "psr-editor-v0.old.css"), "w", encoding="utf-8") as f:
+        f.write("body {}")
+    with open(os.path.join(rec, "anleitung.html"), "a", encoding="utf-8") as f:
+        f.write('<link rel="stylesheet" href="../_static/psr-editor-v0.old.css"/>')
+
+    moved = move_recording(rec, os.path.join(str(tmp_path), "elsewhere"))
+
+    assert sorted(os.listdir(static_assets_dir(moved))) == sorted(old_assets + ["psr-editor-v0.old.css"])
@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+from PIL import Image
+
+from exporters.html_exporter import export_html
+from psr.archive import RecordingArchive, pack_recording
+from psr.catalog import RecordingCatalog
+from psr.layout import VARIANTS_DIR_NAME
+from psr.retention import RetentionEngine, RetentionPolicy, compact_images, tree_size
+
+
+def _old_recording(root, name, days):
+    # Same layout as psr.recorder: screenshots in images/, one video per monitor in video/.
+    rec = os.path.join(root, name)
+    os.makedirs(os.path.join(rec, "images"))
+    os.makedirs(os.path.join(rec, "video"))
+    with open(os.path.join(rec, "video", "monitor_0.mp4"), "wb") as f:
+        f.write(b"\0" * 4096)
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": [], "video_enabled": True, "video_dir": "video"}, f)
+    created = datetime.fromtimestamp(time.time() - days * 86400).isoformat(timespec="seconds")
+    with open(os.path.join(rec, "recording.meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"name": name, "created": created}, f)
+    return rec
+
+
+def _root(tmp_path, monkeypatch):
+    # The default recordings root (cwd/recordings) is also what notify_changed updates.
+    monkeypatch.chdir(tmp_path)
+    root = os.path.join(str(tmp_path), "recordings")
+    os.makedirs(root)
+    return root
+
+
+def test_old_video_is_dropped(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    rec = _old_recording(root, "Old", days=400)
+    catalog = RecordingCatalog(root)
+    engine = RetentionEngine(RetentionPolicy(video_after_days=30), catalog)
+    later = time.time() + 2 * 3600
+
+    todo, _, reason = engine.plan(now=later)
+    assert todo == [("Old", "video")]
+    assert reason == "age"
+
+    report = engine.run(now=later)
+    assert [a.error for a in report.actions] == [None]
+    assert not os.path.exists(os.path.join(rec, "video"))
+    assert engine.plan(now=later)[0] == []
+    catalog.close()
+
+
+def test_recent_video_is_kept(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    rec = _old_recording(root, "New", days=3)
+    catalog = RecordingCatalog(root)
+    engine = RetentionEngine(RetentionPolicy(video_after_days=30), catalog)
+
+    assert engine.plan(now=time.time() + 2 * 3600)[0] == []
+    assert os.path.exists(os.path.join(rec, "video", "monitor_0.mp4"))
+    catalog.close()
+
+
+def test_packed_recording_is_compacted(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    packed = pack_recording(_old_recording(root, "Old", days=400))
+    shutil.rmtree(os.path.join(root, "Old"))
+    catalog = RecordingCatalog(root)
+    engine = RetentionEngine(RetentionPolicy(video_after_days=30), catalog)
+    later = time.time() + 2 * 3600
+
+    report = engine.run(now=later)
+
+    assert [(a.entry, a.action, a.error) for a in report.actions] == [("Old.psra", "video", None)]
+    with RecordingArchive(packed) as ar:
+        assert "steps.json" in ar
+        assert not [n for n in ar.names() if n.startswith("video/")]
+    assert sorted(os.listdir(root)) == sorted(["Old.psra", "_catalog"])
+    catalog.close()
+
+
+def test_lossy_compaction_drops_stale_variants(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    rec = _old_recording(root, "Old", days=400)
+    Image.new("RGB", (1600, 900), "white").save(os.path.join(rec, "images", "a.png"))
+    events = [{"t": 1.0, "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"}]
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": events}, f)
+    export_html(rec, mode="external")
+    assert os.path.isdir(os.path.join(rec, VARIANTS_DIR_NAME))
+
+    assert compact_images(rec) == 1
+    assert not os.path.exists(os.path.join(rec, VARIANTS_DIR_NAME))
+
+
+def test_quota_that_compaction_cannot_meet_is_reported(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    _old_recording(root, "Old", days=400)
+    catalog = RecordingCatalog(root)
+    engine = RetentionEngine(RetentionPolicy(quota_gb=1e-9), catalog)
+    later = time.time() + 2 * 3600
+
+    while engine.run(now=later).actions:
+        pass
+    report = engine.run(now=later)
+
+    assert report.quota_exhausted
+    catalog.close()
+
+
+def test_pressure_only_applies_enabled_steps(tmp_path, monkeypatch):
+    root = _root(tmp_path, monkeypatch)
+    _old_recording(root, "Old", days=3)
+    catalog = RecordingCatalog(root)
+    engine = RetentionEngine(RetentionPolicy(video_after_days=30, quota_gb=1e-9), catalog)
+    later = time.time() + 2 * 3600
+
+    assert engine.plan(now=later)[0] == [("Old", "video")]
+    engine.run(now=later)
+    todo, report, _ = engine.plan(now=later)
+
+    assert todo == []
+    assert report.quota_exhausted
+    catalog.close()
+
+
+def test_tree_size_counts_hardlinked_files_once(tmp_path):
+    rec = os.path.join(str(tmp_path), "Rec")
+    os.makedirs(os.path.join(rec, "images"))
+    with open(os.path.join(rec, "images", "a.png"), "wb") as f:
+        f.write(b"\0" * 1000)
+    os.link(os.path.join(rec, "images", "a.png"), os.path.join(rec, "images", "b.png"))
+    with open(os.path.join(rec, "steps.json"), "wb") as f:
+        f.write(b"\0" * 10)
+
+    assert tree_size(rec) == 1010
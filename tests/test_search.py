@@ -0,0 +1,30 @@
+import json
+import os
+
+from exporters.guide import guide_steps
+from psr.catalog import RecordingCatalog
+from psr.recording import Recording
+
+EVENTS = [
+    {"t": 0.0, "kind": "start", "detail": "Aufnahme gestartet"},
+    {"t": 1.0, "kind": "mouse_click", "detail": "Klick", "instruction": "Klicken Sie auf Anmelden"},
+    {"t": 1.5, "kind": "window_change", "detail": "Fenster", "window_title": "Kundenstamm"},
+    {"t": 2.0, "kind": "text_input", "detail": "Eingabe", "instruction": "Geben Sie Mustermann ein", "input_text": "Mustermann"},
+]
+
+
+def test_hit_step_matches_guide_step(tmp_path):
+    root = str(tmp_path)
+    rec = os.path.join(root, "Demo")
+    os.makedirs(rec)
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": EVENTS}, f)
+
+    catalog = RecordingCatalog(root)
+    catalog.refresh()
+    hits = catalog.search("mustermann")
+    catalog.close()
+
+    with Recording(rec) as r:
+        guide = {s.text: s.number for s in guide_steps(r.data, r)}
+    assert [h.step for h in hits] == [guide["Geben Sie Mustermann ein"]] == [2]
@@ -0,0 +1,40 @@
+import json
+import os
+
+from PIL import Image
+
+from psr.catalog import get_catalog
+from psr.recordings_store import delete_recording
+from psr.thumbnails import step_thumbnails, thumbs_root
+
+
+def _recording(root, name, mtime):
+    rec = os.path.join(root, name)
+    os.makedirs(os.path.join(rec, "images"))
+    Image.new("RGB", (320, 200), "white").save(os.path.join(rec, "images", "a.png"))
+    with open(os.path.join(rec, "steps.json"), "w", encoding="utf-8") as f:
+        json.dump({"events": [{"t": 1.0, "kind": "mouse_click", "detail": "Klick", "screenshot": "images/a.png"}]}, f)
+    os.utime(rec, (mtime, mtime))
+    return rec
+
+
+def test_preview_leaves_the_recording_and_its_list_position_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = os.path.join(str(tmp_path), "recordings")
+    a = _recording(root, "A", 1_700_000_000)
+    b = _recording(root, "B", 1_700_000_100)
+    cat = get_catalog()
+    cat.refresh()
+    assert [it.name for it in cat.query()] == ["B", "A"]
+
+    thumbs = list(step_thumbnails(a))
+
+    assert [t.number for t in thumbs] == [1]
+    assert os.path.isfile(thumbs[0].path)
+    assert os.stat(a).st_mtime == 1_700_000_000
+    cat.refresh()
+    assert [it.name for it in cat.query()] == ["B", "A"]
+
+    delete_recording(a)
+    assert not os.path.exists(thumbs_root(a))
+    assert os.path.isdir(b)